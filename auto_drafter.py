@@ -1,64 +1,33 @@
-import time
-import re
 import os
-import pyperclip
-import subprocess
 import json
+from transport import get_transport
+from clipboard_source import get_clipboard_source, extract_emails
+from email_templates import get_template
+from instrumentation import start_run, finish_run, timer, count
 
 # Load Configuration
 def load_config():
     with open('config.json', 'r') as f:
         return json.load(f)
 
-def is_email(text):
-    return re.match(r"[^@]+@[^@]+\.[^@]+", text)
-
-def get_body(config, greeting):
-    return f"""{greeting}
-
-I hope you're having a great week!
-
-I’m Sai Vineeth, and I’m reaching out to express my strong interest in a Data Analyst role at your company.
-
-I have 5+ years of professional experience working across finance, payroll, and workforce analytics, with hands-on expertise in SQL, Snowflake, Power BI (DAX), Python, and Excel. I’ve built end-to-end dashboards, automated reporting workflows, and supported leadership teams with clear, decision-ready insights.
-
-Most recently, I’ve been working on Power BI and Snowflake-based reporting solutions, owning data extraction, modeling, DAX development, and dashboard delivery. I’m actively seeking {config['job_title']} roles where I can contribute immediately.
-
-I’ve included my resume and links below for quick reference:
-• Resume: Attached
-• Portfolio: {config['portfolio_url']}
-• GitHub: {config['github_url']}
-• LinkedIn: {config['linkedin_url']}
-
-If there’s a role that aligns, I’d really appreciate the opportunity to connect. Even a short conversation would be valuable.
-
-Thank you for your time, and I look forward to hearing from you.
-
-Best regards,
-{config['candidate_name']}
-{config['job_title']}
-📞 {config['phone']}
-📧 {config['email']}
-"""
-
-def create_mac_mail_draft(recipient, subject, body, attachment_path):
-    apple_script = f'''
-    tell application "Mail"
-        set newMessage to make new outgoing message with properties {{subject:"{subject}", content:"{body}", visible:true}}
-        tell newMessage
-            make new to recipient at end of to recipients with properties {{address:"{recipient}"}}
-            make new attachment with properties {{file name:POSIX file "{attachment_path}"}} at after the last paragraph
-        end tell
-        activate
-    end tell
-    '''
-    try:
-        subprocess.run(["osascript", "-e", apple_script], check=True)
-        print(f"✅ Draft created for {recipient}")
-    except subprocess.CalledProcessError as e:
-        print(f"❌ Error: {e}")
-
-def main():
+def draft_batch(transport, template, emails, resume_path):
+    # One batch per clipboard change, so a pasted list of 20 addresses
+    # becomes 20 drafts in a single transport call
+    drafts = []
+    with timer("render"):
+        for email in emails:
+            subject, body = template.render(greeting="Hi,", recipient=email)
+            drafts.append((email, subject, body, resume_path))
+    with timer("draft", histogram=True):
+        results = transport.draft_many(drafts)
+    count("drafts_created", sum(results))
+    count("drafts_failed", len(results) - sum(results))
+    for email, ok in zip(emails, results):
+        if ok:
+            print(f"✅ Draft created for {email}")
+    return results
+
+def main(source=None):
     if not os.path.exists('config.json'):
         print("❌ Error: config.json not found. Rename config.json.template to config.json and fill it out.")
         return
@@ -69,18 +38,24 @@ def main():
     print("🚀 Auto-Drafter (Portfolio Edition) Running...")
     print("📋 Copy an email address to launch a drafted email!")
 
-    last_clipboard = ""
+    transport = get_transport(config)
+    template = get_template(config, "draft")
+    source = source or get_clipboard_source()
     try:
-        while True:
-            clipboard_content = pyperclip.paste().strip()
-            if clipboard_content != last_clipboard:
-                last_clipboard = clipboard_content
-                if is_email(clipboard_content):
-                    print(f"✨ Detected: {clipboard_content}")
-                    create_mac_mail_draft(clipboard_content, config['email_subject'], get_body(config, "Hi,"), resume_path)
-            time.sleep(1)
+        for clipboard_content in source.changes():
+            emails = extract_emails(clipboard_content)
+            if emails:
+                print(f"✨ Detected: {', '.join(emails)}")
+                draft_batch(transport, template, emails, resume_path)
     except KeyboardInterrupt:
         print("\nStopping...")
+    finally:
+        source.close()
+        transport.close()
 
 if __name__ == "__main__":
-    main()
+    start_run("auto_drafter")
+    try:
+        main()
+    finally:
+        finish_run()
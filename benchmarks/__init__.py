@@ -0,0 +1,2 @@
+# Benchmarks for the outreach scripts: synthetic fixtures, a loopback transport
+# and a per-stage runner. Run from the repository root with `python -m benchmarks`.
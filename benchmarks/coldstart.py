@@ -0,0 +1,81 @@
+import os
+import sys
+import argparse
+import statistics
+import subprocess
+import tempfile
+import time
+
+# Cold-start budget for cli.py. Each command is started in a fresh interpreter
+# a few times; the median time on top of a bare `python -c pass` must stay
+# within its budget, and the fast paths must not import pandas (or any other
+# heavy dependency). Exits 1 on a regression, so it can gate cron/CI:
+#
+#   python -m benchmarks.coldstart
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ("pandas", "numpy", "requests", "jobspy", "pyperclip")
+
+# (args, budget in ms over bare interpreter startup)
+BUDGETS = [
+    (["--help"], 60),
+    (["check", "someone@example.com"], 120),
+    (["due"], 120),
+    (["status", "--path", "{master}"], 150),
+    (["send", "--help"], 200),
+    (["follow-up", "--help"], 200),
+]
+
+def _time(cmd, cwd, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(cmd, cwd=cwd, capture_output=True, check=True)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+def _heavy_imports(cmd, cwd):
+    # -X importtime lists every imported module on stderr
+    result = subprocess.run([sys.executable, "-X", "importtime"] + cmd[1:], cwd=cwd,
+                            capture_output=True, text=True, check=True)
+    loaded = {line.rsplit("|", 1)[-1].strip().split(".")[0] for line in result.stderr.splitlines() if "|" in line}
+    return sorted(loaded & set(HEAVY_MODULES))
+
+def check_budgets(runs=5, slack=1.0):
+    workdir = tempfile.mkdtemp(prefix="outreach-coldstart-")
+    master = os.path.join(workdir, "Master_Outreach_List.csv")
+    with open(master, "w") as f:
+        f.write("Email,Company,Status\n")
+        f.writelines(f"p{i}@c{i}.com,C{i},{'SENT' if i % 5 == 0 else 'Pending'}\n" for i in range(1000))
+
+    baseline = _time([sys.executable, "-c", "pass"], workdir, runs)
+    print(f"⏱️  Bare interpreter: {baseline:.0f} ms")
+    failures = 0
+    for args, budget in BUDGETS:
+        args = [a.format(master=master) for a in args]
+        cmd = [sys.executable, os.path.join(REPO_DIR, "cli.py")] + args
+        overhead = _time(cmd, workdir, runs) - baseline
+        heavy = _heavy_imports(cmd, workdir)
+        over = overhead > budget * slack
+        # Script --help runs the script's own parser; heavy imports are only a
+        # failure for cli.py's own fast paths
+        bad_import = heavy and args[0] not in ("send", "follow-up")
+        ok = not over and not bad_import
+        failures += not ok
+        note = f" (imports {', '.join(heavy)})" if heavy else ""
+        print(f"{'✅' if ok else '❌'} cli.py {' '.join(args[:2])[:40]:<40} +{overhead:5.0f} ms (budget {budget} ms){note}")
+    return failures
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check cli.py cold-start time against its budget.")
+    parser.add_argument("--runs", type=int, default=5, help="Runs per command (median is used).")
+    parser.add_argument("--slack", type=float, default=1.0, help="Multiply every budget, e.g. 1.5 on slow machines.")
+    args = parser.parse_args(argv)
+    failures = check_budgets(args.runs, args.slack)
+    if failures:
+        print(f"❌ {failures} command(s) over budget.")
+        sys.exit(1)
+    print("✅ Cold start within budget.")
+
+if __name__ == "__main__":
+    main()
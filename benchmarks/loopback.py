@@ -0,0 +1,43 @@
+import time
+import threading
+from transport import Transport
+from message_builder import build_parts, dot_stuff
+
+# In-process stand-in for a mail server: every message is fully built (headers,
+# body, cached attachment part) and dot-stuffed like SMTPTransport would send it,
+# then discarded. latency simulates a server round trip per message.
+
+class LoopbackTransport(Transport):
+    def __init__(self, sender="bench@example.com", latency=0.0, fail_every=0):
+        self.sender = sender
+        self.latency = latency
+        self.fail_every = fail_every
+        self.sent = 0
+        self.drafted = 0
+        self.bytes = 0
+        self.attempts = 0
+        self._lock = threading.Lock()
+
+    def _consume(self, recipient, subject, body, attachment_path):
+        size = sum(len(dot_stuff(chunk)) for chunk in build_parts(self.sender, recipient, subject, body, attachment_path))
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            self.bytes += size
+            self.attempts += 1
+            attempt = self.attempts
+        return not (self.fail_every and attempt % self.fail_every == 0)
+
+    def send(self, recipient, subject, body, attachment_path=None):
+        ok = self._consume(recipient, subject, body, attachment_path)
+        if ok:
+            with self._lock:
+                self.sent += 1
+        return ok
+
+    def draft(self, recipient, subject, body, attachment_path=None):
+        ok = self._consume(recipient, subject, body, attachment_path)
+        if ok:
+            with self._lock:
+                self.drafted += 1
+        return ok
@@ -0,0 +1,307 @@
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import resource
+import tempfile
+import contextlib
+import subprocess
+import multiprocessing
+from datetime import datetime
+
+# Per-stage benchmarks over synthetic data. Each stage runs in a fresh process
+# (so peak RSS is that stage's own) against its own copy of the fixture, and
+# reports wall time, peak RSS and rows/s. Results are written as JSON under
+# benchmarks/results/ and can be diffed with --compare.
+#
+#   python -m benchmarks --rows 10000
+#   python -m benchmarks --size 1m --stages clean_stream,prioritize_top
+#   python -m benchmarks --compare benchmarks/results/a.json benchmarks/results/b.json
+
+SIZES = {"10k": 10_000, "1m": 1_000_000, "10m": 10_000_000}
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SEND_LIMIT = 2_000 # Messages for the send stage, whatever the list size
+
+def _peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def _fixture(workdir, name):
+    # Private copy, since most stages rewrite their input
+    src = os.path.join(workdir, "Master_Outreach_List.csv")
+    dst = os.path.join(workdir, f"{name}.csv")
+    shutil.copyfile(src, dst)
+    return dst
+
+
+def _columnar_fixture(workdir, name, fmt):
+    # The fixture converted to .arrow/.parquet (dictionary-encoded, as imported)
+    from master_list import iter_master, write_master_chunks
+    dst = os.path.join(workdir, f"{name}.{fmt}")
+    write_master_chunks(iter_master(os.path.join(workdir, "Master_Outreach_List.csv")), dst)
+    return dst
+
+
+# Each stage: setup(workdir, rows) -> (run, rows_processed); only run() is timed
+
+# What the morning batch loads
+SELECT_COLUMNS = ['Email', 'Company', 'Status']
+
+def stage_read(workdir, rows):
+    from master_list import read_master
+    path = _fixture(workdir, "read")
+    return lambda: read_master(path), rows
+
+def stage_read_columns(workdir, rows):
+    from master_list import read_master
+    path = _fixture(workdir, "read_columns")
+    return lambda: read_master(path, columns=SELECT_COLUMNS), rows
+
+def stage_read_arrow(workdir, rows):
+    from master_list import read_master
+    path = _columnar_fixture(workdir, "read_arrow", "arrow")
+    return lambda: read_master(path, columns=SELECT_COLUMNS), rows
+
+def stage_read_parquet(workdir, rows):
+    from master_list import read_master
+    path = _columnar_fixture(workdir, "read_parquet", "parquet")
+    return lambda: read_master(path, columns=SELECT_COLUMNS), rows
+
+def _clean(workdir, rows, streaming):
+    import clean_master_list
+    path = _fixture(workdir, "clean")
+    clean_master_list.master_path = path
+    clean_master_list.backup_path = path + ".backup"
+    clean_master_list.store_enabled = lambda: False
+    run = clean_master_list.clean_list_streaming if streaming else clean_master_list.clean_list
+    return run, rows
+
+def stage_clean(workdir, rows):
+    return _clean(workdir, rows, streaming=False)
+
+def stage_clean_stream(workdir, rows):
+    return _clean(workdir, rows, streaming=True)
+
+def _prioritize(workdir, rows, argv, fmt="csv"):
+    import prioritize_leads
+    path = _fixture(workdir, "prioritize") if fmt == "csv" else _columnar_fixture(workdir, "prioritize", fmt)
+    prioritize_leads.MASTER_PATH = path
+    prioritize_leads.NEXT_BATCH_PATH = os.path.join(workdir, "Next_Batch.csv")
+    prioritize_leads.store_enabled = lambda: False
+    prioritize_leads.load_config = lambda: {}
+    sys.argv = ["prioritize_leads.py"] + argv
+    return prioritize_leads.main, rows
+
+def stage_prioritize(workdir, rows):
+    return _prioritize(workdir, rows, [])
+
+def stage_prioritize_top(workdir, rows):
+    return _prioritize(workdir, rows, ["--top", "100"])
+
+def stage_prioritize_arrow(workdir, rows):
+    return _prioritize(workdir, rows, [], fmt="arrow")
+
+def stage_select(workdir, rows):
+    # morning_batch_sender's candidate selection over the loaded list
+    from master_list import read_master
+    from morning_batch_sender import collect_candidates
+    df = read_master(_fixture(workdir, "select"))
+    suppressed = set(df['Email'].iloc[::50])
+    # A 30-email morning batch over-fetches 60 companies
+    return lambda: collect_candidates(df, suppressed, n=60), rows
+
+def stage_readme_parse(workdir, rows):
+    from readme_parser import parse_readme_companies
+    from benchmarks.synthetic import readme_text
+    companies = max(1, rows // 6)
+    content = readme_text(companies)
+    return lambda: parse_readme_companies(content), companies
+
+def stage_readme_diff(workdir, rows):
+    # A day's change to an already-processed README: 1% new rows
+    from readme_parser import ReadmeTracker
+    from benchmarks.synthetic import readme_text
+    companies = max(1, rows // 6)
+    old = readme_text(companies)
+    new = old + "".join(line + "\n" for line in readme_text(max(1, companies // 100), seed=1).splitlines()[4:])
+    tracker = ReadmeTracker(os.path.join(workdir, "readme_state"))
+    tracker.new_companies("bench", old)
+    tracker.commit()
+    return lambda: tracker.new_companies("bench", new), companies
+
+def stage_send(workdir, rows):
+    # End to end: render, build MIME (shared attachment), rate-limit, deliver, record
+    from send_engine import SendEngine
+    from suppression import Suppression, CATEGORIES
+    from email_templates import get_template
+    from benchmarks.loopback import LoopbackTransport
+
+    with open(os.path.join(REPO_DIR, "config.json.template")) as f:
+        config = json.load(f)
+    config["rate_limits"] = {"per_domain_per_minute": None, "global_per_minute": None, "max_in_flight": 8}
+    resume_path = os.path.join(workdir, "resume.pdf")
+    with open(resume_path, "wb") as f:
+        f.write(os.urandom(200 * 1024))
+
+    count = min(rows, SEND_LIMIT)
+    suppression = Suppression(
+        {name: os.path.join(workdir, filename) for name, filename in CATEGORIES.items()},
+        index_dir=os.path.join(workdir, "suppression"),
+    )
+    template = get_template(config, "cold", os.path.join(REPO_DIR, "templates"))
+
+    def run():
+        jobs = []
+        for i in range(count):
+            email = f"careers@company{i % 500}.com"
+            subject, body = template.render(greeting="Hi there,", company=f"Company {i % 500}", recipient=email)
+            jobs.append({"recipient": email, "subject": subject, "body": body, "attachment_path": resume_path})
+        with LoopbackTransport() as transport:
+            SendEngine(transport, config).send_all(jobs, lambda job, ok: ok and suppression.add('sent', job['recipient']))
+        suppression.close()
+
+    return run, count
+
+STAGES = {
+    "read": stage_read,
+    "read_columns": stage_read_columns,
+    "read_arrow": stage_read_arrow,
+    "read_parquet": stage_read_parquet,
+    "clean": stage_clean,
+    "clean_stream": stage_clean_stream,
+    "prioritize": stage_prioritize,
+    "prioritize_top": stage_prioritize_top,
+    "prioritize_arrow": stage_prioritize_arrow,
+    "select": stage_select,
+    "readme_parse": stage_readme_parse,
+    "readme_diff": stage_readme_diff,
+    "send": stage_send,
+}
+
+
+def _child(name, workdir, rows, results):
+    os.chdir(REPO_DIR)
+    sys.path.insert(0, REPO_DIR)
+    try:
+        run, processed = STAGES[name](workdir, rows)
+        baseline = _peak_rss_mb()
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            start = time.perf_counter()
+            run()
+            elapsed = time.perf_counter() - start
+        results.put({
+            "rows": processed,
+            "seconds": round(elapsed, 4),
+            "rows_per_sec": round(processed / elapsed, 1) if elapsed else None,
+            "peak_rss_mb": round(_peak_rss_mb(), 1),
+            "setup_rss_mb": round(baseline, 1),
+        })
+    except Exception as e:
+        results.put({"error": f"{type(e).__name__}: {e}"})
+
+def run_stage(name, workdir, rows):
+    ctx = multiprocessing.get_context("spawn")
+    results = ctx.Queue()
+    process = ctx.Process(target=_child, args=(name, workdir, rows, results))
+    process.start()
+    result = results.get()
+    process.join()
+    return result
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_benchmarks(rows, stages=None, workdir=None, seed=0):
+    from benchmarks.synthetic import write_master_list
+    import pandas as pd
+
+    stages = stages or list(STAGES)
+    report = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "rows": rows,
+        "stages": {},
+    }
+    cleanup = workdir is None
+    workdir = workdir or tempfile.mkdtemp(prefix="outreach-bench-")
+    try:
+        print(f"🧪 Generating {rows:,} synthetic leads in {workdir}...")
+        start = time.perf_counter()
+        write_master_list(os.path.join(workdir, "Master_Outreach_List.csv"), rows, seed)
+        report["generate_seconds"] = round(time.perf_counter() - start, 2)
+
+        for name in stages:
+            result = run_stage(name, workdir, rows)
+            report["stages"][name] = result
+            if "error" in result:
+                print(f"⚠️  {name}: skipped ({result['error']})")
+            else:
+                print(f"📊 {name:<15} {result['seconds']:>9.3f}s {result['rows_per_sec']:>13,.0f} rows/s "
+                      f"{result['peak_rss_mb']:>8.1f} MB peak")
+    finally:
+        if cleanup:
+            shutil.rmtree(workdir, ignore_errors=True)
+    return report
+
+def save_report(report, results_dir=RESULTS_DIR):
+    os.makedirs(results_dir, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    path = os.path.join(results_dir, f"{stamp}-{report['rows']}.json")
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    return path
+
+def compare(old_path, new_path):
+    with open(old_path) as f:
+        old = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+    print(f"📊 {old.get('git_commit')} ({old['rows']:,} rows) -> {new.get('git_commit')} ({new['rows']:,} rows)")
+    for name, after in new["stages"].items():
+        before = old["stages"].get(name)
+        if not before or "error" in before or "error" in after:
+            continue
+        ratio = after["seconds"] / before["seconds"] if before["seconds"] else float("inf")
+        flag = "⚠️ " if ratio > 1.1 else "  "
+        print(f"{flag}{name:<15} {before['seconds']:>9.3f}s -> {after['seconds']:>9.3f}s ({ratio:.2f}x), "
+              f"{before['peak_rss_mb']:.0f} -> {after['peak_rss_mb']:.0f} MB")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark each pipeline stage on synthetic data.")
+    parser.add_argument("--size", choices=SIZES, default="10k", help="Preset list size.")
+    parser.add_argument("--rows", type=int, default=None, help="Exact list size (overrides --size).")
+    parser.add_argument("--stages", default=None, help=f"Comma-separated subset of: {', '.join(STAGES)}.")
+    parser.add_argument("--workdir", default=None, help="Keep fixtures here instead of a temp dir.")
+    parser.add_argument("--no-save", action="store_true", help="Don't write a results JSON.")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="Compare two results files.")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    stages = args.stages.split(",") if args.stages else None
+    unknown = [s for s in stages or [] if s not in STAGES]
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(unknown)}")
+    if args.workdir:
+        os.makedirs(args.workdir, exist_ok=True)
+
+    report = run_benchmarks(args.rows or SIZES[args.size], stages, args.workdir)
+    if not args.no_save:
+        print(f"💾 Results saved to {save_report(report)}")
+
+if __name__ == "__main__":
+    main()
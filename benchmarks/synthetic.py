@@ -0,0 +1,132 @@
+import os
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from cleaning_rules import WASTE_PREFIXES
+
+# Synthetic fixtures shaped like the real data:
+#   - Master_Outreach_List.csv: ~6 role addresses per company (as fetch_new_leads
+#     generates them), a long tail of companies, mostly Pending, some SENT, plus
+#     the junk clean_list exists to remove (free providers, noreply, bad TLDs,
+#     malformed addresses, duplicates).
+#   - GitHub README job tables in the formats parse_readme_companies handles.
+# Everything is seeded, so the same size always produces the same file.
+
+MASTER_COLUMNS = ["Email", "Company", "Job/Role", "Status", "Key Tools", "Job Focus/Needs"]
+
+ROLE_PREFIXES = ["recruitment", "careers", "talent", "hiring", "tech-recruiting", "university-recruiting"]
+FIRST_NAMES = ["john", "maria", "wei", "priya", "james", "sofia", "ahmed", "emma", "carlos", "yuki"]
+LAST_NAMES = ["smith", "garcia", "chen", "patel", "johnson", "rossi", "khan", "muller", "silva", "tanaka"]
+
+# Mix of scoring-tier keywords and neutral words, so prioritize_leads has real work
+NAME_WORDS = [
+    "Health", "Pharma", "Medical", "Care", "Capital", "Financial", "Bank", "Insurance", "Wealth",
+    "Tech", "Data", "Analytics", "Systems", "Solutions", "Software", "Digital", "Consulting", "Group",
+    "Blue", "River", "Summit", "North", "Apex", "Harbor", "Granite", "Cedar", "Orbit", "Lumen",
+    "Atlas", "Vertex", "Nova", "Pioneer", "Sterling", "Beacon", "Crescent", "Evergreen",
+]
+SUFFIXES = ["", " Inc", " LLC", " Corp", " Partners", " Labs", " & Co"]
+
+# (kind, share of rows)
+JUNK_MIX = [
+    ("free_provider", 0.04),
+    ("waste_prefix", 0.03),
+    ("blocked_tld", 0.02),
+    ("invalid", 0.02),
+    ("duplicate", 0.05),
+]
+STATUS_MIX = [("Pending", 0.85), ("SENT", 0.12), ("", 0.03)]
+
+def company_names(count, seed=0):
+    rng = np.random.default_rng(seed)
+    words = np.array(NAME_WORDS, dtype=object)
+    first = words[rng.integers(0, len(words), count)]
+    second = words[rng.integers(0, len(words), count)]
+    suffix = np.array(SUFFIXES, dtype=object)[rng.integers(0, len(SUFFIXES), count)]
+    names = first + " " + second + suffix + " " + pd.Series(np.arange(count)).astype(str).to_numpy(dtype=object)
+    return names
+
+def _domains(companies):
+    return pd.Series(companies).str.lower().str.replace(r"[ &]", "", regex=True).to_numpy(dtype=object) + ".com"
+
+def master_chunk(start, rows, names, domains, seed=0):
+    # Rows [start, start + rows) of a list over the given companies
+    rng = np.random.default_rng((seed, start))
+    n_companies = len(names)
+
+    # 40% of rows follow a Zipf law (a few very large companies, scattered across
+    # the name space), the rest are spread evenly over the long tail
+    popular = (np.minimum(rng.zipf(1.3, rows), n_companies) - 1) * 7919 % n_companies
+    company_idx = np.where(rng.random(rows) < 0.4, popular, rng.integers(0, n_companies, rows))
+
+    prefixes = np.array(ROLE_PREFIXES, dtype=object)[rng.integers(0, len(ROLE_PREFIXES), rows)]
+    personal = rng.random(rows) < 0.2
+    first = np.array(FIRST_NAMES, dtype=object)[rng.integers(0, len(FIRST_NAMES), rows)]
+    last = np.array(LAST_NAMES, dtype=object)[rng.integers(0, len(LAST_NAMES), rows)]
+    local = np.where(personal, first + "." + last, prefixes)
+    emails = local + "@" + domains[company_idx]
+
+    kinds = rng.random(rows)
+    edge = 0.0
+    for kind, share in JUNK_MIX:
+        hit = (kinds >= edge) & (kinds < edge + share)
+        edge += share
+        if kind == "free_provider":
+            emails[hit] = local[hit] + "@gmail.com"
+        elif kind == "waste_prefix":
+            waste = np.array(WASTE_PREFIXES, dtype=object)[rng.integers(0, len(WASTE_PREFIXES), hit.sum())]
+            emails[hit] = waste + "@" + domains[company_idx[hit]]
+        elif kind == "blocked_tld":
+            emails[hit] = local[hit] + "@" + np.char.replace(domains[company_idx[hit]].astype(str), ".com", ".co.uk").astype(object)
+        elif kind == "invalid":
+            emails[hit] = local[hit] + "@@" + domains[company_idx[hit]]
+        elif kind == "duplicate" and hit.any():
+            emails[hit] = emails[rng.integers(0, rows, hit.sum())]
+
+    statuses = rng.choice([s for s, _ in STATUS_MIX], rows, p=[p for _, p in STATUS_MIX])
+    return pd.DataFrame({
+        "Email": emails,
+        "Company": names[company_idx],
+        "Job/Role": "Data Analyst",
+        "Status": statuses,
+        "Key Tools": "SQL, Power BI, Snowflake, Excel",
+        "Job Focus/Needs": "Dashboards, Reporting, KPI Analysis",
+    }, columns=MASTER_COLUMNS)
+
+def write_master_list(path, rows, seed=0, chunksize=500_000):
+    # Streams chunks to disk, so 10M rows never sit in memory at once
+    names = company_names(max(1, rows // 6), seed)
+    domains = _domains(names)
+    tmp_path = path + ".tmp"
+    for i, start in enumerate(range(0, rows, chunksize)):
+        chunk = master_chunk(start, min(chunksize, rows - start), names, domains, seed)
+        chunk.to_csv(tmp_path, mode="w" if i == 0 else "a", header=i == 0, index=False)
+    if rows == 0:
+        pd.DataFrame(columns=MASTER_COLUMNS).to_csv(tmp_path, index=False)
+    os.replace(tmp_path, path)
+    return path
+
+def readme_text(companies, seed=0):
+    # Job table rows in the formats seen in the tracked repos:
+    #   | **[Company](link)** | Role | Location | Apply |
+    #   | **Company** | Role | Location | Apply |
+    rng = np.random.default_rng(seed)
+    lines = [
+        "# Data Analyst Jobs",
+        "",
+        "| Company | Role | Location | Application |",
+        "| --- | --- | --- | --- |",
+    ]
+    names = company_names(companies, seed)
+    linked = rng.random(companies) < 0.7
+    for name, link in zip(names, linked):
+        cell = f"**[{name}](https://example.com/{zlib.crc32(name.encode()) % 10**8})**" if link else f"**{name}**"
+        lines.append(f"| {cell} | Data Analyst | New York, NY | [Apply](https://example.com/apply) |")
+    return "\n".join(lines) + "\n"
+
+def write_readme(path, companies, seed=0):
+    with open(path, "w") as f:
+        f.write(readme_text(companies, seed))
+    return path
@@ -1,26 +1,18 @@
 import csv
-import time
 import os
-import subprocess
 import json
+import argparse
+from suppression import open_suppression
+from send_ledger import open_send_ledger
+from email_templates import get_template
+from outbox import open_outbox, drain, message_id, print_report, DeliveryRecorder
+from instrumentation import start_run, finish_run, timer, count
 
 # Load Configuration
 def load_config():
     with open('config.json', 'r') as f:
         return json.load(f)
 
-SENT_LOG_FILE = "sent_emails.txt"
-
-def load_sent_emails():
-    if not os.path.exists(SENT_LOG_FILE):
-        return set()
-    with open(SENT_LOG_FILE, "r") as f:
-        return set(line.strip() for line in f if line.strip())
-
-def log_sent_email(email):
-    with open(SENT_LOG_FILE, "a") as f:
-        f.write(f"{email}\n")
-
 def get_smart_greeting(email, company_name):
     user_part = email.split('@')[0]
     if '.' in user_part:
@@ -28,49 +20,12 @@ def get_smart_greeting(email, company_name):
         return f"Hi {name.capitalize()},"
     return f"Hi {company_name} Team,"
 
-def get_body(config, greeting):
-    return f"""{greeting}
-
-I hope you’re doing well. I’m reaching out to explore {config['job_title']} opportunities within your team or current client openings.
-
-    I have 5+ years of professional experience working across finance, payroll, and workforce analytics, with hands-on expertise in SQL, Snowflake, Power BI (DAX), Python, and Excel. I’ve built end-to-end dashboards, automated reporting workflows, and supported leadership teams with clear, decision-ready insights.
-Most recently, I’ve been working on Power BI and Snowflake-based reporting solutions, owning data extraction, modeling, DAX development, and dashboard delivery. I’m actively seeking {config['job_title']} roles where I can contribute immediately.
-
-I’ve included my resume and links below for quick reference:
-• Resume: Attached
-• Portfolio: {config['portfolio_url']}
-• GitHub: {config['github_url']}
-• LinkedIn: {config['linkedin_url']}
-
-If there’s a role that aligns, I’d really appreciate the opportunity to connect. Even a short conversation would be valuable.
-
-Thank you for your time, and I look forward to hearing from you.
-
-Best regards,
-{config['candidate_name']}
-{config['job_title']}
-📞 {config['phone']}
-📧 {config['email']}
-"""
-
-def send_mac_mail(recipient, subject, body, attachment_path):
-    apple_script = f'''
-    tell application "Mail"
-        set newMessage to make new outgoing message with properties {{subject:"{subject}", content:"{body}", visible:false}}
-        tell newMessage
-            make new to recipient at end of to recipients with properties {{address:"{recipient}"}}
-            make new attachment with properties {{file name:POSIX file "{attachment_path}"}} at after the last paragraph
-            send
-        end tell
-    end tell
-    '''
-    try:
-        subprocess.run(["osascript", "-e", apple_script], check=True)
-        return True
-    except:
-        return False
-
 def main():
+    parser = argparse.ArgumentParser(description="Send a cold email to every lead in leads.csv.")
+    parser.add_argument("--queue-only", action="store_true",
+                        help="Render into the outbox and leave delivery to `python outbox.py drain`.")
+    args = parser.parse_args()
+
     if not os.path.exists('config.json'):
         print("❌ config.json not found.")
         return
@@ -83,29 +38,66 @@ def main():
         print(f"❌ Resume not found at {resume_path}")
         return
 
-    sent_emails = load_sent_emails()
+    # Sent, bounced and opted-out addresses are all suppressed
+    suppression = open_suppression()
+    # Send times drive the follow-up schedule
+    ledger = open_send_ledger(config, suppression=suppression)
     print(f"🚀 Starting Bulk Send...")
     
+    template = get_template(config, "cold")
+    messages = []
+    queued = set()
     with open(csv_file, mode='r') as file:
         reader = csv.DictReader(file)
         for row in reader:
             email = row['Email']
             company = row['Company']
             
-            if email in sent_emails:
+            if email in suppression or email in queued:
+                count("leads_skipped")
                 continue
+            queued.add(email) # Don't queue the same address twice
                 
-            greeting = get_smart_greeting(email, company)
-            body = get_body(config, greeting)
-            
-            print(f"📧 Sending to {email}...", end="", flush=True)
-            if send_mac_mail(email, config['email_subject'], body, resume_path):
-                print(" ✅ Sent")
-                log_sent_email(email)
-            else:
-                print(" ❌ Failed")
-            
-            time.sleep(config['delay_seconds'])
+            with timer("render"):
+                subject, body = template.render(greeting=get_smart_greeting(email, company), company=company, recipient=email)
+            messages.append({
+                "id": message_id("bulk", email),
+                "recipient": email,
+                "subject": subject,
+                "body": body,
+                "attachment_path": resume_path,
+            })
+
+    # Everything is rendered and queued before anything is sent
+    with open_outbox(config) as outbox:
+        added = outbox.enqueue(messages, "bulk", config.get('email'))
+        print(f"📥 Queued {added} new messages in the outbox ({len(messages) - added} were already there).")
+        if args.queue_only:
+            suppression.close()
+            ledger.close()
+            return
+
+        recorder = DeliveryRecorder(suppression, ledger)
+
+        def on_sent(message):
+            print(f"📧 {message['recipient']} ✅ Sent")
+            recorder.sent(message)
+
+        def on_failed(message, outcome):
+            print(f"📧 {message['recipient']} ❌ Failed ({outcome})")
+            recorder.failed(message, outcome)
+
+        # Domains are sent to concurrently; each one is rate limited on its own
+        stats = drain(outbox, config, on_sent, on_failed)
+        print_report(outbox, stats)
+        recorder.close()
+    suppression.close()
+    ledger.close()
+    print(f"🏁 Bulk Send Complete. Sent {stats['sent']} emails.")
 
 if __name__ == "__main__":
-    main()
+    start_run("bulk_sender")
+    try:
+        main()
+    finally:
+        finish_run()
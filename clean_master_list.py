@@ -1,69 +1,181 @@
-import pandas as pd
 import os
-import re
+import shutil
+import sqlite3
+import argparse
+import tempfile
+from master_list import (
+    read_master, write_master, compact_master, master_file,
+    iter_master, write_master_chunks, read_journal, drop_folded,
+)
+from cleaning_rules import apply_rules, print_report
+from lead_store import LEAD_DB_PATH, store_enabled, open_store
+from instrumentation import start_run, finish_run, timer, count
 
 master_path = "/Users/vr/Desktop/Master_Outreach_List.csv"
 backup_path = "/Users/vr/Desktop/Master_Outreach_List_backup.csv"
+store_backup_path = "/Users/vr/Desktop/Master_Outreach_List_backup.db"
+
+def list_paths():
+    # (list, backup) as stored: a columnar list gets a backup in the same format
+    path = master_file(master_path)
+    if path == master_path:
+        return path, backup_path
+    return path, os.path.splitext(backup_path)[0] + os.path.splitext(path)[1]
+
+def clean_frame(df):
+    # 2-6. Email rules (format, waste prefixes, free providers, non-US TLDs)
+    # evaluated in one vectorized pass and applied with a single mask
+    with timer("clean_rules"):
+        df, report = apply_rules(df)
+
+    # 7. Deduplicate
+    before_dedupe = len(df)
+    with timer("dedupe"):
+        df = df.drop_duplicates(subset=['Email'])
+    report['duplicate'] = before_dedupe - len(df)
+    for name, removed in report.items():
+        count(f"removed_{name}", removed)
+    return df, report
 
 def clean_list():
-    if not os.path.exists(master_path):
-        print(f"❌ Master list not found at {master_path}")
-        return
+    use_store = store_enabled()
+    if use_store:
+        store = open_store()
+        print(f"🔄 Reading {store.path}...")
+        df = store.to_frame(['Email'])
+        initial_count = len(df)
 
-    print(f"🔄 Reading {master_path}...")
-    df = pd.read_csv(master_path, on_bad_lines='skip')
-    initial_count = len(df)
+        # 1. Backup
+        store.backup(store_backup_path)
+        print(f"💾 Backup created at {store_backup_path}")
+    else:
+        path, backup = list_paths()
+        if not os.path.exists(path):
+            print(f"❌ Master list not found at {master_path}")
+            return
 
-    # 1. Backup
-    df.to_csv(backup_path, index=False)
-    print(f"💾 Backup created at {backup_path}")
+        print(f"🔄 Reading {path}...")
+        # Fold pending status changes in first so the cleaned list keeps them
+        compact_master(path)
+        df = read_master(path)
+        initial_count = len(df)
 
-    # 2. Basic Cleanup
-    df = df.dropna(subset=['Email'])
-    df['Email'] = df['Email'].str.strip()
-    
-    # 3. Valid Email Regex
-    # Stricter regex: No commas, no double dots
-    # The previous regex might have slipped if not applied correctly or if pandas regex behavior varied.
-    # We will explicitly filter out common bad patterns first.
-    
-    # Filter out emails with commas or double dots
-    df = df[~df['Email'].str.contains(r',|\.\.', regex=True, na=False)]
-    
-    email_regex = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    df = df[df['Email'].str.match(email_regex, na=False)]
-
-    # 4. Remove Generic/Waste Emails
-    # We keep 'recruiting', 'hr', 'careers', 'hiring' but remove 'info', 'support', 'admin', etc.
-    waste_prefixes = ['info', 'support', 'admin', 'sales', 'help', 'contact', 'webmaster', 'test', 'office', 'marketing']
-    waste_pattern = r'^(?:' + '|'.join(waste_prefixes) + r')@'
-    df = df[~df['Email'].str.contains(waste_pattern, case=False, na=False)]
-
-    # 5. Remove Free/Low-Quality Providers
-    # Based on user feedback that these are 'waste of time'
-    free_providers = ['gmail.com', 'yahoo.com', 'hotmail.com', 'outlook.com', 'icloud.com', 'aol.com', 'rediffmail.com', 'zoho.com']
-    df = df[~df['Email'].str.split('@').str[-1].str.lower().isin(free_providers)]
-
-    # 6. US Filter (Simple TLD and Keyword check)
-    # Remove known non-US TLDs
-    non_us_tlds = ['.in', '.uk', '.ca', '.au', '.pk', '.eu', '.de', '.fr']
-    for tld in non_us_tlds:
-        df = df[~df['Email'].str.lower().str.endswith(tld, na=False)]
+        # 1. Backup
+        write_master(df, backup)
+        print(f"💾 Backup created at {backup}")
 
-    # 7. Deduplicate
-    df = df.drop_duplicates(subset=['Email'])
+    df, report = clean_frame(df)
 
     final_count = len(df)
     removed_count = initial_count - final_count
 
     # Save cleaned list
-    df.to_csv(master_path, index=False)
+    if use_store:
+        store.retain(df['Email'])
+        store.close()
+    else:
+        write_master(df, path)
     
     print(f"✅ Cleanup Complete!")
     print(f"📊 Initial: {initial_count}")
     print(f"📊 Removed: {removed_count}")
+    print_report(report)
     print(f"📊 Final:   {final_count}")
-    print(f"🚀 Master List updated at {master_path}")
+    print(f"🚀 Master List updated at {LEAD_DB_PATH if use_store else path}")
+
+def make_backup(path, backup):
+    # The cleaned list is written to a new file and renamed over the original,
+    # so the original inode is never modified: a hardlink is a free backup.
+    if os.path.exists(backup):
+        os.remove(backup)
+    try:
+        os.link(path, backup)
+    except OSError:
+        shutil.copyfile(path, backup)
+
+class SeenSet:
+    # Disk-backed set of 64-bit email hashes, so dedupe memory stays flat
+    def __init__(self, directory):
+        fd, self.path = tempfile.mkstemp(suffix=".seen.db", dir=directory)
+        os.close(fd)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute("PRAGMA journal_mode=OFF")
+        self.conn.execute("PRAGMA synchronous=OFF")
+        self.conn.execute("CREATE TABLE seen (h INTEGER PRIMARY KEY)")
+
+    def filter_new(self, emails):
+        # Boolean mask of rows whose email hasn't been seen in this or any earlier chunk
+        import pandas as pd
+        hashes = pd.util.hash_pandas_object(emails, index=False).astype('int64')
+        first_in_chunk = ~hashes.duplicated()
+        candidates = hashes[first_in_chunk].tolist()
+        already = set()
+        for i in range(0, len(candidates), 500):
+            batch = candidates[i:i + 500]
+            marks = ",".join("?" * len(batch))
+            already.update(h for (h,) in self.conn.execute(f"SELECT h FROM seen WHERE h IN ({marks})", batch))
+        with self.conn:
+            self.conn.executemany("INSERT OR IGNORE INTO seen VALUES (?)", ((h,) for h in candidates))
+        return first_in_chunk & ~hashes.isin(already)
+
+    def close(self):
+        self.conn.close()
+        os.remove(self.path)
+
+def clean_list_streaming(chunksize=100_000):
+    path, backup = list_paths()
+    if not os.path.exists(path):
+        print(f"❌ Master list not found at {master_path}")
+        return
+
+    print(f"🔄 Streaming {path} in chunks of {chunksize}...")
+    make_backup(path, backup)
+    print(f"💾 Backup created at {backup}")
+
+    updates, folded = read_journal(path)
+    seen = SeenSet(os.path.dirname(path) or ".")
+    report = {}
+    counts = {"initial": 0}
+
+    def cleaned_chunks():
+        for chunk in iter_master(path, chunksize, updates):
+            counts["initial"] += len(chunk)
+            with timer("clean_rules"):
+                chunk, chunk_report = apply_rules(chunk)
+            with timer("dedupe"):
+                fresh = seen.filter_new(chunk['Email'])
+            chunk_report['duplicate'] = int((~fresh).sum())
+            for name, count in chunk_report.items():
+                report[name] = report.get(name, 0) + count
+            yield chunk[fresh]
+
+    try:
+        final_count = write_master_chunks(cleaned_chunks(), path)
+    finally:
+        seen.close()
+    # Journaled statuses are now part of the rewritten list
+    drop_folded(path, folded)
+    for name, removed in report.items():
+        count(f"removed_{name}", removed)
+
+    print(f"✅ Cleanup Complete!")
+    print(f"📊 Initial: {counts['initial']}")
+    print(f"📊 Removed: {counts['initial'] - final_count}")
+    print_report(report)
+    print(f"📊 Final:   {final_count}")
+    print(f"🚀 Master List updated at {path}")
 
 if __name__ == "__main__":
-    clean_list()
+    start_run("clean_master_list")
+    parser = argparse.ArgumentParser(description="Clean and deduplicate the master outreach list.")
+    parser.add_argument("--stream", action="store_true", help="Process the CSV in bounded-size chunks (flat memory).")
+    parser.add_argument("--chunksize", type=int, default=100_000, help="Rows per chunk in --stream mode.")
+    args = parser.parse_args()
+
+    try:
+        if args.stream and not store_enabled():
+            clean_list_streaming(args.chunksize)
+        else:
+            clean_list()
+    finally:
+        finish_run()
@@ -0,0 +1,74 @@
+import re
+
+# Declarative cleaning rules for lead emails.
+# Rules are listed in the order removals are attributed in the report, and are
+# compiled into ONE regex of optional lookaheads, so a single vectorized pass
+# over the (lower-cased) Email column tells us every rule each row breaks.
+
+# We keep 'recruiting', 'hr', 'careers', 'hiring' but remove 'info', 'support', 'admin', etc.
+WASTE_PREFIXES = ['info', 'support', 'admin', 'sales', 'help', 'contact', 'webmaster', 'test', 'office', 'marketing']
+
+# Based on user feedback that these are 'waste of time'
+FREE_PROVIDERS = ['gmail.com', 'yahoo.com', 'hotmail.com', 'outlook.com', 'icloud.com', 'aol.com', 'rediffmail.com', 'zoho.com']
+
+# US filter: known non-US TLDs
+BLOCKED_TLDS = ['.in', '.uk', '.ca', '.au', '.pk', '.eu', '.de', '.fr']
+
+EMAIL_REGEX = r'[a-z0-9._%+-]+@[a-z0-9.-]+\.[a-z]{2,}'
+
+def _alternation(items):
+    return '|'.join(re.escape(item) for item in items)
+
+# (rule name, pattern, reject when the pattern matches?)
+RULES = [
+    ("comma_or_double_dot", r'.*(?:,|\.\.)', True),
+    ("invalid_format", EMAIL_REGEX + r'$', False),
+    ("waste_prefix", r'(?:' + _alternation(WASTE_PREFIXES) + r')@', True),
+    ("free_provider", r'.*@(?:' + _alternation(FREE_PROVIDERS) + r')$', True),
+    ("blocked_tld", r'.*(?:' + _alternation(BLOCKED_TLDS) + r')$', True),
+]
+
+def compile_rules(rules=RULES):
+    lookaheads = ''.join(f'(?:(?=(?P<{name}>{pattern})))?' for name, pattern, _ in rules)
+    return re.compile('^' + lookaheads)
+
+COMBINED_RULES = compile_rules()
+
+def evaluate(emails, rules=RULES, combined=COMBINED_RULES):
+    # emails: pandas Series. Returns (keep_mask, report) where report maps each
+    # rule to the number of rows it removed (first failing rule in RULES order).
+    missing = emails.isna()
+    normalized = emails.fillna('').astype(str).str.strip().str.lower()
+    hits = normalized.str.extract(combined)
+
+    report = {"missing_email": int(missing.sum())}
+    removed = missing.copy()
+    for name, _, reject_on_match in rules:
+        matched = hits[name].notna()
+        fails = matched if reject_on_match else ~matched
+        newly = fails & ~removed
+        report[name] = int(newly.sum())
+        removed |= newly
+    return ~removed, report
+
+def apply_rules(df, column='Email'):
+    # Single mask application over the frame; the Email column is stripped.
+    keep, report = evaluate(df[column])
+    df = df[keep].copy()
+    df[column] = df[column].astype(str).str.strip()
+    return df, report
+
+def is_clean(email, rules=RULES, combined=COMBINED_RULES):
+    # Scalar check for a single address (ingest-time filtering)
+    if not isinstance(email, str):
+        return False
+    hits = combined.match(email.strip().lower()).groupdict()
+    for name, _, reject_on_match in rules:
+        if (hits[name] is not None) == reject_on_match:
+            return False
+    return True
+
+def print_report(report):
+    for name, count in report.items():
+        if count:
+            print(f"   - {name}: {count}")
@@ -0,0 +1,152 @@
+import os
+import sys
+import runpy
+import argparse
+
+# One entry point for every script:
+#   python cli.py send --limit 20        (= python morning_batch_sender.py --limit 20)
+#   python cli.py status                 lead counts by status
+#   python cli.py check a@b.com          suppression lookup
+#   python cli.py due                    follow-ups due now
+#   python cli.py draft-one a@b.com      one draft, no clipboard watcher
+# Nothing heavy is imported up front: each script command loads its own module
+# when it runs, and status/check/due/draft-one never import pandas at all.
+# `python -m benchmarks.coldstart` keeps startup under budget.
+
+# command -> (module run as __main__, help)
+SCRIPTS = {
+    "fetch": ("fetch_new_leads", "Fetch new leads from GitHub lists and job boards."),
+    "clean": ("clean_master_list", "Clean and deduplicate the master list."),
+    "prioritize": ("prioritize_leads", "Score leads and put the best ones first."),
+    "send": ("morning_batch_sender", "Send the morning batch of cold emails."),
+    "bulk": ("bulk_sender", "Send to every lead in leads.csv."),
+    "follow-up": ("follow_up_sender", "Send the follow-ups that are due."),
+    "outbox": ("outbox", "Outbox status, delivery worker and dead letters."),
+    "ingest": ("mail_ingest", "Ingest bounces and replies from a Maildir or mbox."),
+    "draft": ("auto_drafter", "Watch the clipboard and draft emails."),
+    "pipeline": ("pipeline", "Run fetch, clean, prioritize and send in one process."),
+    "compact": ("master_list", "Fold journaled status changes into the master list."),
+    "store": ("lead_store", "Lead store import/export/stats."),
+    "suppression": ("suppression", "Suppression index stats/compact/check."),
+    "bench": ("benchmarks", "Benchmark each stage on synthetic data."),
+}
+
+def run_script(module, args):
+    # Exactly as if `python <module>.py args...` had been run
+    sys.argv = [f"{module}.py"] + list(args)
+    runpy.run_module(module, run_name="__main__", alter_sys=True)
+
+def status_counts(path):
+    # Streams the CSV with the csv module and applies the journal; no pandas.
+    # A columnar list is counted from its Email and Status columns only.
+    import csv
+    from master_list import load_journal, list_format, read_master
+    if list_format(path) != "csv":
+        counts = {}
+        statuses = read_master(path, columns=['Email', 'Status'])['Status']
+        for status, n in statuses.value_counts(dropna=False).items():
+            status = status if isinstance(status, str) and status else 'Pending'
+            counts[status] = counts.get(status, 0) + int(n)
+        return counts
+    updates = load_journal(path)
+    counts = {}
+    with open(path, newline='') as f:
+        for row in csv.DictReader(f):
+            email = row.get('Email')
+            status = updates[email][0] if email in updates else row.get('Status')
+            status = status or 'Pending'
+            counts[status] = counts.get(status, 0) + 1
+    return counts
+
+def cmd_status(args):
+    from lead_store import LEAD_DB_PATH, store_enabled, open_store
+    from master_list import MASTER_PATH, master_file
+    if store_enabled():
+        with open_store() as store:
+            counts, source = store.status_counts(), LEAD_DB_PATH
+    else:
+        path = master_file(args.path or MASTER_PATH)
+        if not os.path.exists(path):
+            print(f"❌ Master list not found at {path}")
+            return 1
+        counts, source = status_counts(path), path
+    print(f"📊 {sum(counts.values())} leads in {source}")
+    for status, n in sorted(counts.items(), key=lambda item: -item[1]):
+        print(f"   {status}: {n}")
+
+def cmd_check(args):
+    from suppression import open_suppression
+    with open_suppression() as suppression:
+        for email in args.emails:
+            hits = [c for c, ledger in suppression.ledgers.items() if email in ledger]
+            print(f"{'⛔' if suppression.is_suppressed(email) else '✅'} {email}: {', '.join(hits) if hits else 'not suppressed'}")
+
+def cmd_due(args):
+    from send_ledger import SendLedger, SEND_LEDGER_PATH
+    if not os.path.exists(SEND_LEDGER_PATH):
+        print("No sends recorded yet.")
+        return
+    with SendLedger() as ledger:
+        print(f"📊 Follow-ups due now: {ledger.due_count()}")
+        for email, step in ledger.due(args.limit):
+            print(f"   {email} (follow-up #{step + 1})")
+
+def cmd_draft_one(args):
+    import json
+    from transport import get_transport
+    from email_templates import get_template
+    if not os.path.exists('config.json'):
+        print("❌ config.json not found.")
+        return 1
+    with open('config.json', 'r') as f:
+        config = json.load(f)
+    template = get_template(config, "draft")
+    resume_path = os.path.abspath(config['resume_filename'])
+    drafts = []
+    for email in args.emails:
+        subject, body = template.render(greeting="Hi,", recipient=email)
+        drafts.append((email, subject, body, resume_path))
+    with get_transport(config) as transport:
+        results = transport.draft_many(drafts)
+    for email, ok in zip(args.emails, results):
+        print(f"{'✅ Draft created for' if ok else '❌ Could not draft'} {email}")
+    return 0 if all(results) else 1
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="cli.py", description="Outreach toolkit.")
+    sub = parser.add_subparsers(dest="command", metavar="command")
+    for name, (module, help_text) in SCRIPTS.items():
+        # Their own options are parsed by the script itself
+        sub.add_parser(name, help=help_text, add_help=False)
+
+    status = sub.add_parser("status", help="Lead counts by status (no pandas).")
+    status.add_argument("--path", default=None, help="Master list (CSV, .arrow or .parquet).")
+    status.set_defaults(func=cmd_status)
+
+    check = sub.add_parser("check", help="Is an address suppressed?")
+    check.add_argument("emails", nargs="+")
+    check.set_defaults(func=cmd_check)
+
+    due = sub.add_parser("due", help="List follow-ups due now.")
+    due.add_argument("--limit", type=int, default=20)
+    due.set_defaults(func=cmd_due)
+
+    draft_one = sub.add_parser("draft-one", help="Draft emails to the given addresses.")
+    draft_one.add_argument("emails", nargs="+")
+    draft_one.set_defaults(func=cmd_draft_one)
+    return parser
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] in SCRIPTS:
+        run_script(SCRIPTS[argv[0]][0], argv[1:])
+        return 0
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if not getattr(args, "func", None):
+        parser.print_help()
+        return 0
+    return args.func(args) or 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,159 @@
+import re
+import sys
+import time
+import queue
+import shutil
+import platform
+import subprocess
+
+# Clipboard sources for auto_drafter.
+# Each source exposes changes(): a generator yielding the clipboard text every
+# time it changes. Where the platform can tell us about changes we block on
+# that instead of polling; otherwise we poll with adaptive backoff.
+
+EMAIL_PATTERN = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
+
+def extract_emails(text):
+    # Every address in a pasted blob, de-duplicated, in order of appearance
+    seen = {}
+    for match in EMAIL_PATTERN.findall(text or ""):
+        seen.setdefault(match.strip(".").lower(), match.strip("."))
+    return list(seen.values())
+
+class ClipboardSource:
+    def changes(self):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class PollingSource(ClipboardSource):
+    # Polls read() but backs off while the clipboard is idle: the interval doubles
+    # up to max_interval and snaps back to min_interval as soon as something changes.
+    def __init__(self, read, min_interval=0.25, max_interval=2.0, sleep=time.sleep):
+        self.read = read
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.sleep = sleep
+        self.interval = min_interval
+
+    def changes(self):
+        last = self.read()
+        while True:
+            self.sleep(self.interval)
+            current = self.read()
+            if current != last:
+                last = current
+                self.interval = self.min_interval
+                yield current
+            else:
+                self.interval = min(self.max_interval, self.interval * 2)
+
+
+class PasteboardSource(PollingSource):
+    # macOS: NSPasteboard.changeCount is an in-process counter, so checking it is
+    # cheap (no helper process); the text is only read when the count moves.
+    def __init__(self, **kwargs):
+        from AppKit import NSPasteboard, NSPasteboardTypeString
+        self.pasteboard = NSPasteboard.generalPasteboard()
+        self.string_type = NSPasteboardTypeString
+        kwargs.setdefault("min_interval", 0.1)
+        kwargs.setdefault("max_interval", 0.5)
+        super().__init__(self.pasteboard.changeCount, **kwargs)
+
+    def changes(self):
+        for _ in super().changes():
+            yield self.pasteboard.stringForType_(self.string_type) or ""
+
+
+class NotifyCommandSource(ClipboardSource):
+    # Linux: block on a helper that exits/prints on every clipboard change
+    # (clipnotify on X11, `wl-paste --watch` on Wayland) and read only then.
+    def __init__(self, command, read, streaming=False):
+        self.command = command
+        self.read = read
+        self.streaming = streaming
+        self.process = None
+
+    def changes(self):
+        if self.streaming:
+            self.process = subprocess.Popen(self.command, stdout=subprocess.PIPE, text=True)
+            for _ in self.process.stdout:
+                yield self.read()
+        else:
+            while True:
+                subprocess.run(self.command, check=True)
+                yield self.read()
+
+    def close(self):
+        if self.process:
+            self.process.terminate()
+
+
+class FakeClipboardSource(ClipboardSource):
+    # Headless stand-in: put() simulates a copy. Stops at None.
+    def __init__(self):
+        self.events = queue.Queue()
+
+    def put(self, text):
+        self.events.put(text)
+
+    def changes(self):
+        while True:
+            text = self.events.get()
+            if text is None:
+                return
+            yield text
+
+
+def get_clipboard_source():
+    if platform.system() == "Darwin":
+        try:
+            return PasteboardSource()
+        except ImportError:
+            pass # pyobjc not installed
+
+    import pyperclip
+    if platform.system() == "Linux":
+        if shutil.which("clipnotify"):
+            return NotifyCommandSource(["clipnotify"], pyperclip.paste)
+        if shutil.which("wl-paste"):
+            return NotifyCommandSource(["wl-paste", "--watch", "echo"], pyperclip.paste, streaming=True)
+    return PollingSource(pyperclip.paste)
+
+
+def measure_polling(idle_seconds=10.0, copies=5, **kwargs):
+    # Idle CPU and detection latency of PollingSource, headless: the "clipboard"
+    # is an in-memory value flipped from a timer thread.
+    import threading
+    state = {"text": "", "copied_at": None}
+    latencies = []
+    source = PollingSource(lambda: state["text"], **kwargs)
+
+    def copier():
+        time.sleep(idle_seconds)
+        for i in range(copies):
+            state["copied_at"] = time.perf_counter()
+            state["text"] = f"person{i}@example.com"
+            time.sleep(1.0)
+
+    threading.Thread(target=copier, daemon=True).start()
+    cpu_start = time.process_time()
+    for _ in source.changes():
+        latencies.append(time.perf_counter() - state["copied_at"])
+        if len(latencies) == 1:
+            idle_cpu = time.process_time() - cpu_start
+        if len(latencies) == copies:
+            break
+
+    print(f"📊 Idle CPU: {idle_cpu:.4f}s over {idle_seconds:.0f}s ({idle_cpu / idle_seconds * 100:.3f}%)")
+    print(f"📊 Detection latency: first {latencies[0] * 1000:.0f} ms (after idle), "
+          f"max {max(latencies[1:] or latencies) * 1000:.0f} ms (while active)")
+    return {"idle_cpu_seconds": idle_cpu, "latencies": latencies}
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--measure":
+        measure_polling(float(sys.argv[2]) if len(sys.argv) > 2 else 10.0)
+    else:
+        print("Usage: python clipboard_source.py --measure [idle_seconds]")
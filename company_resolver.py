@@ -0,0 +1,253 @@
+import re
+import sys
+import zlib
+import sqlite3
+import unicodedata
+
+# Company entity resolution: "Acme Inc", "Acme, Inc." and "ACME" are one company.
+#
+# Each name is first canonicalized (case, accents, punctuation, legal suffixes)
+# into a key, e.g. "acme". Keys that are still near-duplicates ("Goldman Sachs" /
+# "Goldmann Sachs") are clustered with MinHash LSH over character 3-grams: a new
+# key is only compared with the keys that share an LSH band bucket with it, never
+# with every known key, and a match must reach SIMILARITY (3-gram Jaccard).
+# The canonical ID of a cluster is the key of its first member.
+#
+# Everything resolved is cached in companies.db (raw name -> ID, key -> ID and
+# the band buckets), so a run only resolves names it has never seen.
+
+COMPANY_DB_PATH = "companies.db"
+NUM_PERM = 30
+BANDS = 10 # 10 bands x 3 rows: ~98% of pairs at 0.7 Jaccard become candidates
+SHINGLE = 3
+SIMILARITY = 0.7
+
+LEGAL_SUFFIXES = {
+    "inc", "incorporated", "llc", "ltd", "limited", "corp", "corporation", "co", "company",
+    "plc", "lp", "llp", "pllc", "gmbh", "ag", "sa", "nv", "bv", "pty",
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS names (name TEXT PRIMARY KEY, canonical TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS keys (id INTEGER PRIMARY KEY, key TEXT NOT NULL UNIQUE, canonical TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS bands (
+    band INTEGER NOT NULL,
+    bucket INTEGER NOT NULL,
+    key_id INTEGER NOT NULL,
+    PRIMARY KEY (band, bucket, key_id)
+) WITHOUT ROWID;
+"""
+
+_MERSENNE = (1 << 31) - 1
+# Odd multipliers that fold a band's rows (and the key's digits) into one 64-bit bucket id
+_BAND_MIX = (1, 0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9)
+_DIGIT_MIX = 0xD6E8FEB86659FD93
+_NON_WORD = re.compile(r"[\W_]+")
+
+def normalize_company(name):
+    # "The Acme Co., L.L.C." -> "acme"; "" if nothing is left
+    if not isinstance(name, str):
+        return ""
+    text = name.lower()
+    if not text.isascii():
+        text = "".join(ch for ch in unicodedata.normalize("NFKD", text) if not unicodedata.combining(ch))
+    text = text.replace("&", " and ").replace("'", "").replace("’", "")
+    tokens = _join_initials(_NON_WORD.sub(" ", text).split())
+
+    if len(tokens) > 1 and tokens[0] == "the":
+        tokens = tokens[1:]
+    while len(tokens) > 1 and (tokens[-1] in LEGAL_SUFFIXES or tokens[-1] == "and"):
+        tokens.pop()
+    return " ".join(tokens)
+
+def _join_initials(tokens):
+    # Runs of single letters are initials: "l l c" -> "llc", "i b m" -> "ibm"
+    joined = []
+    run = False
+    for token in tokens:
+        single = len(token) == 1 and token.isalpha()
+        if single and run:
+            joined[-1] += token
+        else:
+            joined.append(token)
+        run = single
+    return joined
+
+def shingles(key):
+    # Spaces are dropped so "jp morgan" and "jpmorgan" compare equal
+    padded = f" {key.replace(' ', '')} "
+    if len(padded) <= SHINGLE:
+        return {padded}
+    return {padded[i:i + SHINGLE] for i in range(len(padded) - SHINGLE + 1)}
+
+def digits(key):
+    return " ".join(t for t in key.split() if t.isdigit())
+
+def similar(a, b):
+    # Same digits (e.g. "studio 54" vs "studio 55" never merge) and close 3-grams
+    if digits(a) != digits(b):
+        return 0.0
+    sa, sb = shingles(a), shingles(b)
+    return len(sa & sb) / len(sa | sb)
+
+def _permutations(seed=1):
+    import numpy as np
+    rng = np.random.default_rng(seed)
+    return (rng.integers(1, _MERSENNE, NUM_PERM, dtype=np.int64),
+            rng.integers(0, _MERSENNE, NUM_PERM, dtype=np.int64))
+
+def band_buckets(keys, chunk=20_000):
+    # (len(keys), BANDS) bucket ids, one MinHash signature per key, vectorized
+    # over all shingles of a chunk of keys at a time. The key's digits are part
+    # of every bucket, since keys with different digits never merge anyway.
+    import numpy as np
+    a, b = _permutations()
+    rows = NUM_PERM // BANDS
+    mix = np.array(_BAND_MIX[:rows], dtype=np.uint64)
+    out = np.empty((len(keys), BANDS), dtype=np.int64)
+    for start in range(0, len(keys), chunk):
+        part = keys[start:start + chunk]
+        grams = [sorted(shingles(key)) for key in part]
+        hashes = np.array([zlib.crc32(g.encode()) % _MERSENNE for gs in grams for g in gs], dtype=np.int64)
+        offsets = np.cumsum([0] + [len(gs) for gs in grams[:-1]])
+        signature = np.minimum.reduceat((a[:, None] * hashes[None, :] + b[:, None]) % _MERSENNE, offsets, axis=1).T
+        # Fold each band's rows into one stable bucket id (unsigned wraparound,
+        # shifted to fit SQLite's signed INTEGER)
+        banded = signature.reshape(len(part), BANDS, rows).astype(np.uint64)
+        number = np.array([zlib.crc32(digits(key).encode()) for key in part], dtype=np.uint64)
+        folded = (banded * mix).sum(axis=2, dtype=np.uint64) + number[:, None] * np.uint64(_DIGIT_MIX)
+        out[start:start + len(part)] = (folded >> np.uint64(1)).astype(np.int64)
+    return out
+
+class CompanyResolver:
+    def __init__(self, path=COMPANY_DB_PATH, similarity=SIMILARITY):
+        self.path = path
+        self.similarity = similarity
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        self._names = None # Loaded on first use
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _known_names(self):
+        if self._names is None:
+            self._names = dict(self.conn.execute("SELECT name, canonical FROM names"))
+        return self._names
+
+    def resolve(self, name):
+        return self.resolve_many([name])[name]
+
+    def resolve_many(self, names):
+        # {name: canonical ID} for every name; only unseen names cost any work
+        known = self._known_names()
+        result = {}
+        unseen = []
+        for name in names:
+            if name in known:
+                result[name] = known[name]
+            elif name not in result:
+                result[name] = None
+                unseen.append(name)
+        if not unseen:
+            return result
+
+        keys = {name: normalize_company(name) or str(name).strip().lower() for name in unseen}
+        canonical = self._resolve_keys(list(dict.fromkeys(keys.values())))
+        with self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO names VALUES (?, ?)",
+                                  [(str(name), canonical[key]) for name, key in keys.items()])
+        for name, key in keys.items():
+            result[name] = known[name] = canonical[key]
+        return result
+
+    def _resolve_keys(self, keys):
+        # {key: canonical ID}; new keys are clustered against known and each other
+        canonical = {}
+        for chunk in range(0, len(keys), 500):
+            part = keys[chunk:chunk + 500]
+            marks = ",".join("?" * len(part))
+            canonical.update(self.conn.execute(f"SELECT key, canonical FROM keys WHERE key IN ({marks})", part))
+        new = [key for key in keys if key not in canonical]
+        if not new:
+            return canonical
+
+        buckets = band_buckets(new)
+        index = {}
+        for band, bucket, key, cid in self._bucket_members(buckets):
+            index.setdefault((band, bucket), []).append((key, cid))
+
+        for key, row in zip(new, buckets):
+            slots = [(band, int(bucket)) for band, bucket in enumerate(row)]
+            grams, number = shingles(key), digits(key)
+            best, best_score = key, 0.0
+            for candidate, cid in {c for slot in slots for c in index.get(slot, ())}:
+                if digits(candidate) != number:
+                    continue
+                other = shingles(candidate)
+                score = len(grams & other) / len(grams | other)
+                if score >= self.similarity and (score, cid) > (best_score, best):
+                    best, best_score = cid, score
+            canonical[key] = best
+            # Later new keys in this run can match this one too
+            for slot in slots:
+                index.setdefault(slot, []).append((key, best))
+
+        with self.conn:
+            ids = [self.conn.execute("INSERT INTO keys (key, canonical) VALUES (?, ?)", (key, canonical[key])).lastrowid
+                   for key in new]
+            self.conn.executemany("INSERT OR IGNORE INTO bands VALUES (?, ?, ?)",
+                                  [(band, int(bucket), key_id) for key_id, row in zip(ids, buckets)
+                                   for band, bucket in enumerate(row)])
+        return canonical
+
+    def _bucket_members(self, buckets):
+        # Known keys sharing any band bucket with the new keys, in one indexed join
+        # (CROSS JOIN keeps the small probe table as the outer loop)
+        if not self.conn.execute("SELECT 1 FROM keys LIMIT 1").fetchone():
+            return []
+        with self.conn:
+            self.conn.execute("CREATE TEMP TABLE IF NOT EXISTS probe (band INTEGER, bucket INTEGER)")
+            self.conn.execute("DELETE FROM probe")
+            self.conn.executemany("INSERT INTO probe VALUES (?, ?)",
+                                  {(band, int(bucket)) for row in buckets for band, bucket in enumerate(row)})
+            return self.conn.execute("""
+                SELECT b.band, b.bucket, k.key, k.canonical FROM probe AS p
+                CROSS JOIN bands AS b ON b.band = p.band AND b.bucket = p.bucket
+                CROSS JOIN keys AS k ON k.id = b.key_id
+            """).fetchall()
+
+    def canonical_ids(self, names):
+        # Same order as names (e.g. a column's unique values)
+        resolved = self.resolve_many(names)
+        return [resolved[name] for name in names]
+
+def group_by_company(candidates, contacted_companies, resolver):
+    # {company: [emails]} -> one entry per canonical company (first name wins,
+    # emails pooled in order), dropping companies whose ID was already contacted
+    contacted = set(resolver.canonical_ids(list(contacted_companies)))
+    ids = resolver.resolve_many(list(candidates))
+    grouped, names = {}, {}
+    for company, emails in candidates.items():
+        cid = ids[company]
+        if cid in contacted:
+            continue
+        names.setdefault(cid, company)
+        grouped.setdefault(names[cid], []).extend(emails)
+    return grouped
+
+def open_company_resolver(path=COMPANY_DB_PATH):
+    return CompanyResolver(path)
+
+if __name__ == "__main__":
+    # python company_resolver.py "Acme Inc" "ACME, Inc."  -> canonical IDs
+    with open_company_resolver() as resolver:
+        for name, cid in resolver.resolve_many(sys.argv[1:]).items():
+            print(f"{name} -> {cid}")
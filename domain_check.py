@@ -0,0 +1,151 @@
+import os
+import sys
+import json
+import time
+import socket
+from concurrent.futures import ThreadPoolExecutor
+from instrumentation import count, observe
+
+# Mail-domain verification for generated leads.
+# Each guessed domain is checked for MX records (falling back to A, which mail
+# servers also accept) on a bounded thread pool. Results are cached on disk with
+# a TTL, positive and negative alike, so a domain is resolved once across runs.
+# dnspython is used when installed (and can be pointed at any nameserver/port,
+# e.g. a local stub); otherwise the system resolver via socket (A records only).
+
+DNS_CACHE_PATH = ".dns_cache.json"
+POSITIVE_TTL = 30 * 86400 # Domains that accept mail rarely stop
+NEGATIVE_TTL = 7 * 86400  # Re-check dead domains weekly
+DEFAULT_WORKERS = 16
+
+# Lookup results. "error" (timeout, SERVFAIL) is never cached.
+MX, A, NONE, ERROR = "mx", "a", "none", "error"
+
+class DnsPythonResolver:
+    def __init__(self, nameservers=None, port=53, timeout=3.0):
+        import dns.resolver
+        import dns.exception
+        self.dns = dns
+        self.resolver = dns.resolver.Resolver(configure=not nameservers)
+        if nameservers:
+            self.resolver.nameservers = list(nameservers)
+            self.resolver.port = port
+        self.resolver.lifetime = timeout
+
+    def _query(self, domain, rdtype):
+        try:
+            return list(self.resolver.resolve(domain, rdtype))
+        except (self.dns.resolver.NXDOMAIN, self.dns.resolver.NoAnswer):
+            return []
+
+    def __call__(self, domain):
+        try:
+            mx = self._query(domain, "MX")
+            if mx:
+                # A lone "." MX is an explicit "accepts no mail" (RFC 7505)
+                if all(str(r.exchange) == "." for r in mx):
+                    return NONE
+                return MX
+            return A if self._query(domain, "A") else NONE
+        except self.dns.exception.DNSException:
+            return ERROR
+
+
+class SocketResolver:
+    # Fallback without dnspython: the system resolver, A/AAAA only
+    def __call__(self, domain):
+        try:
+            socket.getaddrinfo(domain, None)
+            return A
+        except socket.gaierror as e:
+            if e.errno in (socket.EAI_NONAME, getattr(socket, "EAI_NODATA", socket.EAI_NONAME)):
+                return NONE
+            return ERROR
+
+
+def get_resolver(nameservers=None, port=53, timeout=3.0):
+    try:
+        return DnsPythonResolver(nameservers, port, timeout)
+    except ImportError:
+        return SocketResolver()
+
+
+class DomainCache:
+    def __init__(self, path=DNS_CACHE_PATH, positive_ttl=POSITIVE_TTL, negative_ttl=NEGATIVE_TTL, clock=time.time):
+        self.path = path
+        self.positive_ttl = positive_ttl
+        self.negative_ttl = negative_ttl
+        self.clock = clock
+        self.entries = {}
+        self.dirty = False
+        if os.path.exists(path):
+            try:
+                with open(path, "r") as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError):
+                self.entries = {}
+
+    def get(self, domain):
+        entry = self.entries.get(domain)
+        if entry is None:
+            return None
+        ttl = self.negative_ttl if entry["result"] == NONE else self.positive_ttl
+        if self.clock() - entry["checked_at"] > ttl:
+            return None
+        return entry["result"]
+
+    def put(self, domain, result):
+        if result == ERROR:
+            return
+        self.entries[domain] = {"result": result, "checked_at": self.clock()}
+        self.dirty = True
+
+    def save(self):
+        if not self.dirty:
+            return
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.entries, f)
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+
+
+def verify_domains(domains, resolver=None, cache=None, max_workers=DEFAULT_WORKERS):
+    # -> {domain: "mx" | "a" | "none" | "error"}; only uncached domains hit the network
+    resolver = resolver or get_resolver()
+    cache = cache if cache is not None else DomainCache()
+    results = {}
+    misses = []
+    for domain in set(domains):
+        cached = cache.get(domain)
+        if cached is None:
+            misses.append(domain)
+        else:
+            results[domain] = cached
+    count("dns_cache_hits", len(results))
+    count("dns_lookups", len(misses))
+
+    def timed_lookup(domain):
+        start = time.perf_counter()
+        try:
+            return resolver(domain)
+        finally:
+            observe("dns_lookup", time.perf_counter() - start)
+
+    if misses:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(misses))) as pool:
+            for domain, result in zip(misses, pool.map(timed_lookup, misses)):
+                results[domain] = result
+                cache.put(domain, result)
+        cache.save()
+    return results
+
+def accepts_mail(result):
+    return result in (MX, A)
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python domain_check.py domain [domain ...]")
+    else:
+        for domain, result in sorted(verify_domains(sys.argv[1:]).items()):
+            print(f"{'✅' if accepts_mail(result) else '❌'} {domain}: {result}")
@@ -0,0 +1,87 @@
+import os
+import sys
+import json
+import time
+import string
+
+# Shared email templates (templates/<name>.txt).
+# File format: a "Subject: ..." line, a blank line, then the body.
+# Placeholders use str.format syntax. Config keys ({job_title}, {portfolio_url},
+# ...) are rendered once when the template is compiled; only the per-recipient
+# fields below are filled in for each message ({email} is the sender's own
+# address from config; the recipient's is {recipient}).
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
+RECIPIENT_FIELDS = {"greeting", "company", "recipient"}
+
+class CompiledTemplate:
+    def __init__(self, name, subject, body, config):
+        self.name = name
+        self.subject = self._compile(subject, config)
+        self.body = self._compile(body, config)
+
+    @staticmethod
+    def _compile(text, config):
+        # -> list alternating static strings and recipient field names (as 1-tuples)
+        parts = []
+        static = []
+        for literal, field, spec, conversion in string.Formatter().parse(text):
+            static.append(literal)
+            if field is None:
+                continue
+            if field in RECIPIENT_FIELDS:
+                parts.append("".join(static))
+                parts.append((field,))
+                static = []
+            else:
+                value = format(config[field], spec or "")
+                static.append(value)
+        parts.append("".join(static))
+        return parts
+
+    @staticmethod
+    def _render(parts, fields):
+        if len(parts) == 1:
+            return parts[0]
+        return "".join(p if isinstance(p, str) else fields[p[0]] for p in parts)
+
+    def render(self, **fields):
+        # Returns (subject, body)
+        return self._render(self.subject, fields), self._render(self.body, fields)
+
+
+def _read_template(path):
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    header, _, body = text.partition("\n\n")
+    if not header.startswith("Subject:"):
+        raise ValueError(f"{path}: template must start with a 'Subject:' line")
+    return header[len("Subject:"):].strip(), body
+
+_cache = {}
+
+def get_template(config, name, template_dir=TEMPLATE_DIR):
+    # Compiled once per (template, config) for the life of the process
+    key = (template_dir, name, json.dumps(config, sort_keys=True, default=str))
+    if key not in _cache:
+        subject, body = _read_template(os.path.join(template_dir, f"{name}.txt"))
+        _cache[key] = CompiledTemplate(name, subject, body, config)
+    return _cache[key]
+
+def benchmark(config, name="cold", count=100_000):
+    template = get_template(config, name)
+    start = time.perf_counter()
+    for i in range(count):
+        template.render(greeting=f"Hi Person{i},", company=f"Company {i}", recipient=f"p{i}@c{i}.com")
+    elapsed = time.perf_counter() - start
+    print(f"📊 Rendered {count} '{name}' messages in {elapsed:.3f}s ({elapsed / count * 1e6:.2f} µs/message)")
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--bench":
+        count = int(sys.argv[2]) if len(sys.argv) > 2 else 100_000
+        with open('config.json' if os.path.exists('config.json') else 'config.json.template') as f:
+            config = json.load(f)
+        for name in ("cold", "follow_up", "draft"):
+            benchmark(config, name, count)
+    else:
+        print("Usage: python email_templates.py --bench [count]")
@@ -1,39 +1,46 @@
 import os
 import json
-import pandas as pd
-import requests
-import re
-from jobspy import scrape_jobs
-
-def fetch_github_jobs():
-    repos = [
-        "https://raw.githubusercontent.com/jobs-jobr-pro/Data-Analyst-Jobs/main/README.md",
-        "https://raw.githubusercontent.com/speedyapply/2026-SWE-College-Jobs/main/README.md",
-        "https://raw.githubusercontent.com/SimplifyJobs/Summer2025-Internships/dev/README.md"
-    ]
-    
-    all_companies = set()
-    for url in repos:
-        try:
-            print(f"📡 Fetching from {url.split('/')[-3]}...")
-            response = requests.get(url)
-            response.raise_for_status()
-            content = response.text
-            
-            # Match patterns like | **[Company]** | ... or | Company | ...
-            # This regex is a bit more broad to handle different table formats
-            matches = re.findall(r'\|\s*\*\*?\[?([^\]\*]+)\]?\(?.*?\)?\s*\*\*?\s*\|', content)
-            for company in matches:
-                clean_name = company.strip()
-                if clean_name and clean_name not in ["Company", "---"]:
-                    all_companies.add(clean_name)
-        except Exception as e:
-            print(f"⚠️ Error fetching from {url}: {e}")
-    
-    return list(all_companies)
+from master_list import read_master, append_master, master_file
+from cleaning_rules import is_clean
+from http_cache import CACHE_DIR, fetch_all
+from readme_parser import ReadmeTracker
+from domain_check import verify_domains, accepts_mail, ERROR
+from company_resolver import open_company_resolver
+from lead_store import LEAD_DB_PATH, store_enabled, open_store
+from instrumentation import start_run, finish_run, timer, count
+
+GITHUB_REPOS = [
+    "https://raw.githubusercontent.com/jobs-jobr-pro/Data-Analyst-Jobs/main/README.md",
+    "https://raw.githubusercontent.com/speedyapply/2026-SWE-College-Jobs/main/README.md",
+    "https://raw.githubusercontent.com/SimplifyJobs/Summer2025-Internships/dev/README.md"
+]
+
+def fetch_github_jobs(repos=GITHUB_REPOS, cache_dir=CACHE_DIR, tracker=None):
+    # READMEs are fetched in parallel over a pooled session with conditional GETs
+    # (an unchanged README is a 304). Each one is diffed against the version
+    # processed last time, and only companies in added rows that were never seen
+    # before are returned. tracker.commit() once the leads are stored.
+    tracker = tracker or ReadmeTracker()
+    new_companies = set(tracker.retry)
+    results = fetch_all(repos, lambda text: text, cache_dir=cache_dir)
+    for url, result in results.items():
+        source = url.split('/')[-3]
+        if isinstance(result, Exception):
+            print(f"⚠️ Error fetching from {url}: {result}")
+            continue
+        text, from_cache = result
+        with timer("readme_parse"):
+            companies = tracker.new_companies(url, text)
+        print(f"📡 {source}: {len(companies)} new companies{' (unchanged, cached)' if from_cache else ''}")
+        new_companies.update(companies)
+    if tracker.retry:
+        print(f"🔁 Retrying {len(tracker.retry)} companies whose domains couldn't be checked last run.")
+
+    return list(new_companies)
 
 def fetch_jobspy_jobs(search_term="Data Analyst", location="United States"):
     try:
+        from jobspy import scrape_jobs # Large scraping stack; only loaded when we scrape
         jobs = scrape_jobs(
             site_name=["indeed", "linkedin", "zip_recruiter", "glassdoor", "google"],
             search_term=search_term,
@@ -49,17 +56,21 @@ def fetch_jobspy_jobs(search_term="Data Analyst", location="United States"):
         print(f"⚠️ Error fetching JobSpy jobs: {e}")
         return []
 
-def generate_recruiter_emails(company_name):
+def guess_domain(company_name):
     # Sanitize input
     if not isinstance(company_name, str):
-        return []
-        
-    # Common recruiter email patterns
+        return None
     clean_name = company_name.strip()
     if not clean_name:
+        return None
+    return clean_name.lower().replace(" ", "").replace("&", "") + ".com"
+
+def generate_recruiter_emails(company_name):
+    # Common recruiter email patterns
+    domain = guess_domain(company_name)
+    if not domain:
         return []
 
-    domain = clean_name.lower().replace(" ", "").replace("&", "") + ".com"
     patterns = [
         f"recruitment@{domain}",
         f"careers@{domain}",
@@ -70,56 +81,134 @@ def generate_recruiter_emails(company_name):
     ]
     return patterns
 
-def main():
+def gather_candidates(tracker, known_companies=()):
+    # Fetch companies from every source and turn them into verified addresses
+    # -> {email: company}. GitHub companies are only the new ones (see tracker).
+    # known_companies: names already on the master list (or in the lead store);
+    # other spellings of those companies get no new addresses.
     print("🔍 Fetching new job listings...")
-    master_path = "/Users/vr/Desktop/Master_Outreach_List.csv"
-    
+
     # 1. Fetch from GitHub
-    github_companies = fetch_github_jobs()
-    print(f"📈 Found {len(github_companies)} companies from GitHub lists.")
+    with timer("fetch"):
+        github_companies = fetch_github_jobs(tracker=tracker)
+    print(f"📈 Found {len(github_companies)} new companies from GitHub lists.")
     
     # 2. Fetch from JobSpy
     target_sectors = "Finance Healthcare Banking Pharma Hospital"
     jobspy_companies = []
     for sector in target_sectors.split():
         print(f"🕵️ Searching JobSpy for Data Analyst in {sector}...")
-        companies = fetch_jobspy_jobs(search_term=f"Data Analyst {sector}")
+        with timer("scrape", histogram=True):
+            companies = fetch_jobspy_jobs(search_term=f"Data Analyst {sector}")
         jobspy_companies.extend(companies)
     
-    all_companies = set(github_companies + jobspy_companies)
+    all_companies = sorted(set(github_companies + jobspy_companies))
+
+    # One set of addresses per company, however its name is spelled
+    # ("Acme Inc", "ACME, Inc." -> acme), and none for a company already on the
+    # list under another spelling. The domain is still guessed from a raw name:
+    # the canonical ID spells out "&" ("AT&T" -> "at and t"), which is no
+    # company's domain.
+    with open_company_resolver() as resolver:
+        ids = resolver.resolve_many(all_companies)
+        known_ids = set(resolver.canonical_ids(list(known_companies)))
+    companies_by_id, spellings = {}, {}
+    # Shortest spelling first: usually the bare name, without "Inc" or "LLC"
+    for company in sorted(all_companies, key=len):
+        spellings.setdefault(ids[company], []).append(company)
+        if ids[company] not in known_ids:
+            companies_by_id.setdefault(ids[company], company)
+    known = sum(1 for company in all_companies if ids[company] in known_ids)
+    if known:
+        print(f"🔗 {known} company names are already on the list under another spelling.")
+    if len(companies_by_id) < len(all_companies) - known:
+        print(f"🔗 {len(all_companies) - known - len(companies_by_id)} company names were spellings of another company.")
     
-    # Load existing leads from Master List to avoid duplicates
-    existing_emails = set()
-    if os.path.exists(master_path):
+    # Reject bad addresses (same rules as clean_master_list) before they are ever appended
+    candidates = {}
+    rejected = 0
+    for company in companies_by_id.values():
+        for email in generate_recruiter_emails(company):
+            if is_clean(email):
+                candidates.setdefault(email, company)
+            else:
+                rejected += 1
+    if rejected:
+        print(f"🧹 Rejected {rejected} generated addresses that fail the cleaning rules.")
+
+    # Drop addresses whose guessed domain has no MX/A record (one cached lookup per domain)
+    with timer("dns_verify"):
+        domains = verify_domains(email.split('@')[1] for email in candidates)
+    dead = [d for d, result in domains.items() if not accepts_mail(result)]
+    if dead:
+        unresolved = sum(1 for d in dead if domains[d] == ERROR)
+        # Lookups that failed are retried next run, so don't mark those companies
+        # (under every spelling merged into them) as seen
+        tracker.defer({name for e, c in candidates.items() if domains[e.split('@')[1]] == ERROR
+                       for name in spellings[ids[c]]})
+        candidates = {e: c for e, c in candidates.items() if accepts_mail(domains[e.split('@')[1]])}
+        print(f"📭 Dropped leads for {len(dead)}/{len(domains)} domains that don't accept mail"
+              f"{f' ({unresolved} lookups failed, retried next run)' if unresolved else ''}.")
+    count("leads_rejected", rejected)
+    return candidates
+
+def build_new_leads(candidates, existing_emails):
+    # Master-list rows for the generated addresses not already on the list
+    new_leads = []
+    for email, company in candidates.items():
+        if email not in existing_emails:
+            new_leads.append({
+                "Email": email, 
+                "Company": company,
+                "Job/Role": "Data Analyst",
+                "Status": "Pending",
+                "Key Tools": "SQL, Power BI, Snowflake, Excel",
+                "Job Focus/Needs": "Dashboards, Reporting, KPI Analysis"
+            })
+    count("leads_new", len(new_leads))
+    return new_leads
+
+def main():
+    master_path = "/Users/vr/Desktop/Master_Outreach_List.csv"
+    tracker = ReadmeTracker()
+
+    # Load existing leads to avoid duplicates
+    existing_emails, known_companies = set(), set()
+    if store_enabled():
+        with open_store() as store:
+            known_companies = store.companies()
+    elif os.path.exists(master_file(master_path)):
         try:
-            df_existing = pd.read_csv(master_path, on_bad_lines='skip')
-            if not df_existing.empty:
-                existing_emails = set(df_existing['Email'].dropna().unique())
+            df_existing = read_master(master_path, columns=['Email', 'Company'])
+            existing_emails = set(df_existing['Email'].dropna().unique())
+            known_companies = set(df_existing['Company'].dropna().unique())
         except Exception as e:
             print(f"⚠️ Error reading Master List: {e}")
+
+    candidates = gather_candidates(tracker, known_companies)
+    if store_enabled():
+        # Indexed lookups for just the generated addresses, no full-list scan
+        with open_store() as store:
+            existing_emails = store.known_emails(candidates)
     
-    new_leads = []
-    for company in all_companies:
-        emails = generate_recruiter_emails(company)
-        for email in emails:
-            if email not in existing_emails:
-                new_leads.append({
-                    "Email": email, 
-                    "Company": company,
-                    "Job/Role": "Data Analyst",
-                    "Status": "Pending",
-                    "Key Tools": "SQL, Power BI, Snowflake, Excel",
-                    "Job Focus/Needs": "Dashboards, Reporting, KPI Analysis"
-                })
-    
-    if new_leads:
-        df_new = pd.DataFrame(new_leads)
-        # Append to Master List
-        header = not os.path.exists(master_path)
-        df_new.to_csv(master_path, mode='a', index=False, header=header)
-        print(f"✅ Added {len(new_leads)} potential new leads to {master_path}")
-    else:
+    new_leads = build_new_leads(candidates, existing_emails)
+    if not new_leads:
         print("⏭️ No new unique leads found today.")
+    elif store_enabled():
+        with open_store() as store:
+            added = store.add_leads(new_leads)
+        print(f"✅ Added {added} potential new leads to {LEAD_DB_PATH}")
+    else:
+        import pandas as pd
+        # Append to Master List (CSV, or its columnar copy)
+        append_master(pd.DataFrame(new_leads), master_path)
+        print(f"✅ Added {len(new_leads)} potential new leads to {master_file(master_path)}")
+    # Leads are stored; these README versions won't be parsed again
+    tracker.commit()
 
 if __name__ == "__main__":
-    main()
+    start_run("fetch_new_leads")
+    try:
+        main()
+    finally:
+        finish_run()
@@ -1,34 +1,19 @@
 import csv
-import time
 import os
-import subprocess
 import json
 import sys
+import argparse
+from suppression import open_suppression
+from email_templates import get_template
+from outbox import open_outbox, drain, message_id, print_report, DeliveryRecorder
+from instrumentation import start_run, finish_run, timer, count
+from send_ledger import open_send_ledger, DEFAULT_CADENCE_DAYS
 
 # Load Configuration
 def load_config():
     with open('config.json', 'r') as f:
         return json.load(f)
 
-SENT_LOG = "sent_emails.txt"
-FOLLOWUP_LOG = "followed_up.txt"
-
-def load_sent_emails():
-    if not os.path.exists(SENT_LOG):
-        return set()
-    with open(SENT_LOG, "r") as f:
-        return set(line.strip() for line in f if line.strip())
-
-def load_followed_up_emails():
-    if not os.path.exists(FOLLOWUP_LOG):
-        return set()
-    with open(FOLLOWUP_LOG, "r") as f:
-        return set(line.strip() for line in f if line.strip())
-
-def log_followup(email):
-    with open(FOLLOWUP_LOG, "a") as f:
-        f.write(f"{email}\n")
-
 def get_smart_greeting(email):
     # Try to guess name from email (e.g., john.doe@company.com)
     user_part = email.split('@')[0]
@@ -37,42 +22,14 @@ def get_smart_greeting(email):
         return f"Hi {name.capitalize()},"
     return "Hi there,"
 
-def get_followup_body(config, greeting):
-    return f"""{greeting}
-
-I wanted to quickly follow up on my previous email regarding the {config['job_title']} opportunity.
-
-I remain very interested in the role and confident that my 5+ years of experience in SQL, Snowflake, and Power BI can bring immediate value to your team.
-
-I’ve attached my resume again for your convenience.
-
-Best regards,
-{config['candidate_name']}
-{config['job_title']}
-📞 {config['phone']}
-"""
-
-def send_mac_mail_reply(recipient, subject, body, attachment_path):
-    # Note: We add "Re:" to the subject to simulate a reply thread
-    final_subject = f"Re: {subject}"
-    
-    apple_script = f'''
-    tell application "Mail"
-        set newMessage to make new outgoing message with properties {{subject:"{final_subject}", content:"{body}", visible:false}}
-        tell newMessage
-            make new to recipient at end of to recipients with properties {{address:"{recipient}"}}
-            make new attachment with properties {{file name:POSIX file "{attachment_path}"}} at after the last paragraph
-            send
-        end tell
-    end tell
-    '''
-    try:
-        subprocess.run(["osascript", "-e", apple_script], check=True)
-        return True
-    except:
-        return False
-
 def main():
+    parser = argparse.ArgumentParser(description="Send the follow-ups that are due now.")
+    parser.add_argument("--cap", type=int, default=None, help="Max follow-ups this run (default: follow_up_cap in config.json).")
+    parser.add_argument("--dry-run", action="store_true", help="List the due follow-ups without sending.")
+    parser.add_argument("--queue-only", action="store_true",
+                        help="Render into the outbox and leave delivery to `python outbox.py drain`.")
+    args = parser.parse_args()
+
     if not os.path.exists('config.json'):
         print("❌ config.json not found.")
         return
@@ -84,42 +41,79 @@ def main():
         print(f"❌ Resume not found at {resume_path}")
         return
 
-    sent_emails = load_sent_emails()
-    followed_up = load_followed_up_emails()
-    
-    # Identify candidates for follow-up (Sent but not Followed-up)
-    to_contact = sent_emails - followed_up
-    
-    print(f"📊 Found {len(sent_emails)} total sent emails.")
-    print(f"✅ Already followed up with {len(followed_up)} people.")
-    print(f"🚀 Ready to follow up with {len(to_contact)} candidates.")
-    
-    if len(to_contact) == 0:
-        print("No new candidates to follow up with.")
+    suppression = open_suppression()
+    ledger = open_send_ledger(config, suppression=suppression)
+    cap = args.cap if args.cap is not None else config.get('follow_up_cap', 30)
+
+    # Only entries whose next follow-up is due now are read (indexed on due_at)
+    due = []
+    for email, step in ledger.due(cap):
+        if suppression.is_suppressed(email, ("bounced", "opted_out", "replied")):
+            ledger.cancel(email) # Never follow up with bounced/opted-out addresses or people who replied
+            count("follow_ups_cancelled")
+            continue
+        due.append((email, step))
+
+    print(f"📊 {ledger.due_count()} follow-ups due now (cadence: days {', '.join(str(d) for d in config.get('follow_up_days', DEFAULT_CADENCE_DAYS))}).")
+    print(f"🚀 Ready to follow up with {len(due)} candidates (cap {cap}).")
+
+    if len(due) == 0:
+        print("No follow-ups are due yet.")
+        ledger.close()
+        suppression.close()
         return
 
-    print("\n⚠️  WARNING: It is best practice to wait 3-5 days before following up.")
-    # confirm = input("Type 'YES' to proceed sending follow-ups NOW: ")
-    confirm = 'YES'
-    
-    if confirm.strip().upper() != 'YES':
-        print("Cancelled.")
+    if args.dry_run:
+        for email, step in due:
+            print(f"   {email} (follow-up #{step + 1})")
+        ledger.close()
+        suppression.close()
         return
 
     print(f"\n🚀 Starting Follow-Up Batch...")
+    # Note: The follow_up template adds "Re:" to the subject to simulate a reply thread
+    template = get_template(config, "follow_up")
     
-    for email in to_contact:
-        greeting = get_smart_greeting(email)
-        body = get_followup_body(config, greeting)
-        
-        print(f"📧 Following up with {email}...", end="", flush=True)
-        if send_mac_mail_reply(email, config['email_subject'], body, resume_path):
-            print(" ✅ Sent")
-            log_followup(email)
-        else:
-            print(" ❌ Failed")
-        
-        time.sleep(config['delay_seconds'])
+    messages = []
+    for email, step in due:
+        with timer("render"):
+            subject, body = template.render(greeting=get_smart_greeting(email), recipient=email)
+        messages.append({
+            "id": message_id("follow_up", email, step),
+            "recipient": email,
+            "subject": subject,
+            "body": body,
+            "attachment_path": resume_path,
+            "meta": {"step": step},
+        })
+
+    with open_outbox(config) as outbox:
+        # A follow-up still in the outbox (or dead-lettered) is not queued twice
+        added = outbox.enqueue(messages, "follow_up", config.get('email'))
+        print(f"📥 Queued {added} follow-ups in the outbox.")
+        if not args.queue_only:
+            recorder = DeliveryRecorder(suppression, ledger)
+
+            def on_sent(message):
+                if message['kind'] == "follow_up":
+                    print(f"📧 Followed up with {message['recipient']} (#{message['meta']['step'] + 1}) ✅ Sent")
+                else:
+                    print(f"📧 {message['recipient']} ({message['kind']}) ✅ Sent")
+                recorder.sent(message)
+
+            def on_failed(message, outcome):
+                # Retried with backoff; a dead follow-up is dropped from the schedule
+                print(f"📧 Following up with {message['recipient']} ❌ Failed ({outcome})")
+                recorder.failed(message, outcome)
+
+            print_report(outbox, drain(outbox, config, on_sent, on_failed))
+            recorder.close()
+    ledger.close()
+    suppression.close()
 
 if __name__ == "__main__":
-    main()
+    start_run("follow_up_sender")
+    try:
+        main()
+    finally:
+        finish_run()
@@ -0,0 +1,96 @@
+import os
+import json
+import hashlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from instrumentation import count, observe
+
+CACHE_DIR = ".http_cache"
+DEFAULT_TIMEOUT = (5, 30) # (connect, read) seconds
+
+_session = None
+_session_lock = threading.Lock()
+
+def get_session(pool_size=8):
+    # One pooled session per process so repeated fetches reuse keep-alive connections
+    global _session
+    with _session_lock:
+        if _session is None:
+            # requests is only imported once something is actually fetched
+            import requests
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+            session = requests.Session()
+            retry = Retry(total=2, backoff_factor=0.5, status_forcelist=[500, 502, 503, 504])
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+        return _session
+
+def _cache_file(url, cache_dir):
+    return os.path.join(cache_dir, hashlib.sha256(url.encode()).hexdigest() + ".json")
+
+def load_entry(url, cache_dir=CACHE_DIR):
+    path = _cache_file(url, cache_dir)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def save_entry(url, entry, cache_dir=CACHE_DIR):
+    os.makedirs(cache_dir, exist_ok=True)
+    path = _cache_file(url, cache_dir)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(entry, f)
+    os.replace(tmp_path, path)
+
+def fetch_cached(url, parse, session=None, cache_dir=CACHE_DIR, timeout=DEFAULT_TIMEOUT):
+    # Conditional GET keyed by URL. On 304 the parsed result from the previous run
+    # is reused, so neither the body download nor the parse is repeated.
+    # parse(text) must return something JSON-serializable.
+    # Returns (parsed, from_cache).
+    session = session or get_session()
+    entry = load_entry(url, cache_dir)
+    headers = {}
+    if entry:
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+    start = time.perf_counter()
+    response = session.get(url, headers=headers, timeout=timeout)
+    observe("fetch", time.perf_counter() - start)
+    if response.status_code == 304 and entry:
+        count("fetch_not_modified")
+        return entry["parsed"], True
+    response.raise_for_status()
+    count("fetch_ok")
+
+    parsed = parse(response.text)
+    save_entry(url, {
+        "url": url,
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+        "parsed": parsed,
+    }, cache_dir)
+    return parsed, False
+
+def fetch_all(urls, parse, max_workers=4, **kwargs):
+    # Fetch several URLs in parallel. Returns {url: (parsed, from_cache) or Exception}.
+    def run(url):
+        try:
+            return fetch_cached(url, parse, **kwargs)
+        except Exception as e:
+            count("fetch_errors")
+            return e
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return dict(zip(urls, pool.map(run, urls)))
@@ -0,0 +1,241 @@
+import os
+import sys
+import json
+import time
+import bisect
+import threading
+from datetime import datetime
+
+# Lightweight run metrics shared by all scripts.
+#   count("sends_ok")                     counters
+#   with timer("csv_read"): ...           accumulated time per stage
+#   with timer("transport_send", histogram=True): ...   + latency histogram
+#   observe("fetch", seconds)             histogram sample without a timer
+# Library modules record unconditionally (a dict update and a perf_counter
+# call, well under a microsecond). A script calls start_run() at the top and
+# finish_run() at the end to get a JSON run report and, optionally, a
+# Prometheus textfile-collector file.
+#
+# config.json:
+#   "metrics": {
+#       "report_dir": "run_reports",
+#       "textfile_dir": "/var/lib/node_exporter/textfile_collector"
+#   }
+# OUTREACH_METRICS_TEXTFILE_DIR overrides textfile_dir.
+
+REPORT_DIR = "run_reports"
+TEXTFILE_ENV = "OUTREACH_METRICS_TEXTFILE_DIR"
+PROMETHEUS_PREFIX = "outreach"
+
+# Latency buckets in seconds: osascript spawns and SMTP round trips land in the
+# 0.1-5 s range, cached fetches and DNS lookups well below
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+class Histogram:
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1) # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q):
+        # Upper bound of the bucket holding the q-th sample
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(self.buckets + (float("inf"),), self.counts):
+            seen += n
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+    def to_dict(self):
+        cumulative, seen = {}, 0
+        for bound, n in zip(self.buckets + (float("inf"),), self.counts):
+            seen += n
+            cumulative["+Inf" if bound == float("inf") else str(bound)] = seen
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "buckets": cumulative,
+        }
+
+
+class Timer:
+    __slots__ = ("metrics", "name", "histogram", "start")
+
+    def __init__(self, metrics, name, histogram):
+        self.metrics = metrics
+        self.name = name
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.add_time(self.name, time.perf_counter() - self.start, self.histogram)
+
+
+class Metrics:
+    def __init__(self, script=None):
+        self.script = script
+        self.started_at = datetime.now()
+        self.start = time.perf_counter()
+        self.counters = {}
+        self.timers = {} # name -> [count, total_seconds]
+        self.histograms = {}
+        self.lock = threading.Lock() # fetches and DNS lookups record from worker threads
+
+    def count(self, name, n=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def timer(self, name, histogram=False):
+        return Timer(self, name, histogram)
+
+    def add_time(self, name, seconds, histogram=False):
+        with self.lock:
+            entry = self.timers.get(name)
+            if entry is None:
+                entry = self.timers[name] = [0, 0.0]
+            entry[0] += 1
+            entry[1] += seconds
+            if histogram:
+                self._histogram(name).observe(seconds)
+
+    def observe(self, name, value):
+        with self.lock:
+            self._histogram(name).observe(value)
+
+    def _histogram(self, name):
+        hist = self.histograms.get(name)
+        if hist is None:
+            hist = self.histograms[name] = Histogram()
+        return hist
+
+    def report(self):
+        with self.lock:
+            return {
+                "script": self.script,
+                "started_at": self.started_at.isoformat(timespec="seconds"),
+                "duration_seconds": round(time.perf_counter() - self.start, 3),
+                "counters": dict(self.counters),
+                "timers": {name: {"count": c, "total_seconds": round(t, 6)} for name, (c, t) in self.timers.items()},
+                "histograms": {name: h.to_dict() for name, h in self.histograms.items()},
+            }
+
+    def prometheus(self):
+        # Text exposition format for node_exporter's textfile collector
+        report = self.report()
+        label = f'script="{self.script or "unknown"}"'
+        lines = [
+            f"# TYPE {PROMETHEUS_PREFIX}_run_duration_seconds gauge",
+            f"{PROMETHEUS_PREFIX}_run_duration_seconds{{{label}}} {report['duration_seconds']}",
+            f"# TYPE {PROMETHEUS_PREFIX}_last_run_timestamp_seconds gauge",
+            f"{PROMETHEUS_PREFIX}_last_run_timestamp_seconds{{{label}}} {int(time.time())}",
+        ]
+        for name, value in sorted(report["counters"].items()):
+            metric = f"{PROMETHEUS_PREFIX}_{_metric_name(name)}_total"
+            lines += [f"# TYPE {metric} counter", f"{metric}{{{label}}} {value}"]
+        for name, timer in sorted(report["timers"].items()):
+            metric = f"{PROMETHEUS_PREFIX}_{_metric_name(name)}_seconds_total"
+            lines += [f"# TYPE {metric} counter", f"{metric}{{{label}}} {timer['total_seconds']}"]
+        for name, hist in sorted(report["histograms"].items()):
+            metric = f"{PROMETHEUS_PREFIX}_{_metric_name(name)}_seconds"
+            lines.append(f"# TYPE {metric} histogram")
+            for bound, n in hist["buckets"].items():
+                lines.append(f'{metric}_bucket{{{label},le="{bound}"}} {n}')
+            lines += [f"{metric}_sum{{{label}}} {hist['sum']}", f"{metric}_count{{{label}}} {hist['count']}"]
+        return "\n".join(lines) + "\n"
+
+
+def _metric_name(name):
+    return "".join(c if c.isalnum() else "_" for c in name).lower()
+
+def _write_atomic(path, text):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+_metrics = Metrics()
+_settings = {}
+
+def current():
+    return _metrics
+
+def count(name, n=1):
+    _metrics.count(name, n)
+
+def timer(name, histogram=False):
+    return _metrics.timer(name, histogram)
+
+def observe(name, value):
+    _metrics.observe(name, value)
+
+def _load_settings(config):
+    if config is None and os.path.exists("config.json"):
+        try:
+            with open("config.json", "r") as f:
+                config = json.load(f)
+        except (OSError, ValueError):
+            config = None
+    return dict((config or {}).get("metrics", {}))
+
+def start_run(script, config=None):
+    # Fresh metrics for this script's run; settings from config (or config.json if present)
+    global _metrics, _settings
+    _metrics = Metrics(script)
+    _settings = _load_settings(config)
+    if os.environ.get(TEXTFILE_ENV):
+        _settings["textfile_dir"] = os.environ[TEXTFILE_ENV]
+    return _metrics
+
+def finish_run(quiet=False):
+    # Writes run_reports/<script>-<timestamp>.json (and <script>.prom if configured)
+    metrics = _metrics
+    script = metrics.script or os.path.splitext(os.path.basename(sys.argv[0]))[0] or "run"
+    report = metrics.report()
+    report_dir = _settings.get("report_dir", REPORT_DIR)
+    try:
+        os.makedirs(report_dir, exist_ok=True)
+        path = os.path.join(report_dir, f"{script}-{metrics.started_at.strftime('%Y%m%d-%H%M%S')}.json")
+        _write_atomic(path, json.dumps(report, indent=2))
+        textfile_dir = _settings.get("textfile_dir")
+        if textfile_dir:
+            _write_atomic(os.path.join(textfile_dir, f"{PROMETHEUS_PREFIX}_{script}.prom"), metrics.prometheus())
+    except OSError as e:
+        print(f"⚠️ Could not write run report: {e}")
+        return None
+    if not quiet:
+        print(f"📈 Run report: {path}")
+    return path
+
+if __name__ == "__main__":
+    # Summarize the latest run report per script
+    report_dir = sys.argv[1] if len(sys.argv) > 1 else REPORT_DIR
+    if not os.path.isdir(report_dir):
+        print(f"No run reports in {report_dir}.")
+        sys.exit(0)
+    latest = {}
+    for name in sorted(os.listdir(report_dir)):
+        if name.endswith(".json"):
+            latest[name.rsplit("-", 2)[0]] = os.path.join(report_dir, name)
+    for script, path in sorted(latest.items()):
+        with open(path) as f:
+            report = json.load(f)
+        timers = ", ".join(f"{n} {t['total_seconds']:.2f}s" for n, t in sorted(
+            report["timers"].items(), key=lambda item: -item[1]["total_seconds"]))
+        print(f"📊 {script} ({report['started_at']}, {report['duration_seconds']:.1f}s): {timers or 'no timers'}")
+        if report["counters"]:
+            print(f"   {', '.join(f'{k}={v}' for k, v in sorted(report['counters'].items()))}")
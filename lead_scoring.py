@@ -0,0 +1,57 @@
+import re
+
+# Keyword tiers for company relevance. Override with "scoring_tiers" in config.json.
+# A company earns a tier's weight once if any of its keywords appears in the name.
+DEFAULT_TIERS = [
+    # Tier 1: User's specific high-value targets (Finance & Healthcare)
+    {"name": "tier_1", "weight": 10, "keywords": [
+        "health", "pharma", "medical", "care", "clinic", "hospital", "therapeutics",
+        "bank", "financial", "capital", "insurance", "wealth", "asset", "invest", "credit", "finance"
+    ]},
+    # Tier 2: Tech & Data (General Good Matches)
+    {"name": "tier_2", "weight": 5, "keywords": [
+        "tech", "data", "analytics", "systems", "solutions", "software", "digital", "consulting", "group"
+    ]},
+]
+
+def load_tiers(config=None):
+    return (config or {}).get('scoring_tiers', DEFAULT_TIERS)
+
+class LeadScorer:
+    # Each tier's keywords are compiled into one alternation regex and matched
+    # vectorized over the distinct company names only, then broadcast back.
+    def __init__(self, tiers=DEFAULT_TIERS):
+        self.tiers = [
+            (re.compile('|'.join(re.escape(kw.lower()) for kw in tier['keywords'])), int(tier['weight']))
+            for tier in tiers if tier['keywords']
+        ]
+
+    def score_one(self, company_name):
+        if not isinstance(company_name, str):
+            return 0
+        name = company_name.lower()
+        return sum(weight for pattern, weight in self.tiers if pattern.search(name))
+
+    def score(self, companies):
+        import numpy as np
+        import pandas as pd
+        codes, uniques = pd.factorize(companies)
+        names = pd.Series(uniques, dtype=object).astype(str).str.lower()
+        unique_scores = np.zeros(len(uniques) + 1, dtype=np.int64)
+        for pattern, weight in self.tiers:
+            unique_scores[:-1] += names.str.contains(pattern, na=False).to_numpy() * weight
+        # Missing/non-string companies get code -1, i.e. the trailing 0 slot
+        return pd.Series(unique_scores[codes], index=companies.index, name='Relevance_Score')
+
+
+def is_pending(status):
+    return status.astype(str).str.lower().str.strip() == 'pending'
+
+def top_candidates(df, k, scorer, exclude_companies=()):
+    # Next k send candidates without sorting the whole list: pending rows from
+    # companies not yet contacted, one per company, by score (ties keep list order).
+    pending = df[is_pending(df['Status']) & ~df['Company'].isin(list(exclude_companies))]
+    pending = pending.drop_duplicates(subset=['Company'])
+    scores = scorer.score(pending['Company'])
+    top = scores.nlargest(k, keep='first') # partial sort
+    return pending.loc[top.index].assign(Relevance_Score=top)
@@ -0,0 +1,257 @@
+import os
+import sys
+import csv
+import sqlite3
+from datetime import datetime
+
+from master_list import MASTER_PATH, CONTACTED_STATUSES, compact_master, master_file
+
+LEAD_DB_PATH = "/Users/vr/Desktop/Master_Outreach_List.db"
+
+# CSV header -> table column
+COLUMNS = {
+    "Email": "email",
+    "Company": "company",
+    "Job/Role": "job_role",
+    "Status": "status",
+    "Key Tools": "key_tools",
+    "Job Focus/Needs": "job_focus",
+    "Priority Score": "priority_score",
+    "Status Updated": "status_updated",
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS leads (
+    email TEXT PRIMARY KEY,
+    company TEXT,
+    job_role TEXT,
+    status TEXT DEFAULT 'Pending',
+    key_tools TEXT,
+    job_focus TEXT,
+    priority_score INTEGER DEFAULT 0,
+    status_updated TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_leads_company ON leads(company);
+CREATE INDEX IF NOT EXISTS idx_leads_status ON leads(status);
+CREATE INDEX IF NOT EXISTS idx_leads_priority ON leads(priority_score DESC);
+"""
+
+# Anything not yet emailed is still a send candidate (same rule as the CSV flow)
+CONTACTED_SQL = "status IN ({})".format(", ".join(f"'{status}'" for status in CONTACTED_STATUSES))
+PENDING_SQL = f"(status IS NULL OR NOT {CONTACTED_SQL})"
+
+def _chunks(items, size=500):
+    items = list(items)
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+class LeadStore:
+    def __init__(self, path=LEAD_DB_PATH):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --- Lookups -----------------------------------------------------------
+
+    def is_known(self, email):
+        return self.conn.execute("SELECT 1 FROM leads WHERE email = ?", (email,)).fetchone() is not None
+
+    def known_emails(self, emails):
+        # Which of these emails are already in the store (indexed IN lookups)
+        known = set()
+        for chunk in _chunks(emails):
+            marks = ",".join("?" * len(chunk))
+            rows = self.conn.execute(f"SELECT email FROM leads WHERE email IN ({marks})", chunk)
+            known.update(email for (email,) in rows)
+        return known
+
+    def companies(self):
+        # Every company name in the store (walks the company index)
+        rows = self.conn.execute("SELECT DISTINCT company FROM leads WHERE company IS NOT NULL")
+        return {company for (company,) in rows}
+
+    def contacted_companies(self):
+        rows = self.conn.execute(f"SELECT DISTINCT company FROM leads WHERE {CONTACTED_SQL}")
+        return {company for (company,) in rows}
+
+    def next_pending(self, n, per_company=1, exclude_emails=()):
+        # Highest priority pending leads from companies nobody has been sent to yet.
+        # Returns {company: [email, ...]} with up to per_company fallbacks each,
+        # in priority order, for at most n companies.
+        # Walks the priority index only until n companies are picked (contacted
+        # companies are one precomputed set, not a subquery per row); companies
+        # still short of per_company are then topped up through the company index.
+        rows = self.conn.execute(f"""
+            SELECT email, company FROM leads
+            WHERE {PENDING_SQL}
+              AND (company IS NULL OR company NOT IN (
+                  SELECT company FROM leads WHERE company IS NOT NULL AND {CONTACTED_SQL}
+              ))
+            ORDER BY priority_score DESC, rowid
+        """)
+        picked = {}
+        for email, company in rows:
+            if email in exclude_emails:
+                continue
+            if company not in picked:
+                if len(picked) >= n:
+                    break
+                picked[company] = []
+            if len(picked[company]) < per_company:
+                picked[company].append(email)
+        rows.close()
+
+        for company, emails in picked.items():
+            if len(emails) >= per_company or company is None:
+                continue
+            seen = set(emails)
+            for (email,) in self.conn.execute(
+                    f"SELECT email FROM leads WHERE company = ? AND {PENDING_SQL} ORDER BY priority_score DESC, rowid",
+                    (company,)):
+                if email in seen or email in exclude_emails:
+                    continue
+                emails.append(email)
+                if len(emails) >= per_company:
+                    break
+        return picked
+
+    def status_counts(self):
+        return dict(self.conn.execute("SELECT COALESCE(status, 'Pending'), COUNT(*) FROM leads GROUP BY 1"))
+
+    # --- Writes ------------------------------------------------------------
+
+    def add_leads(self, leads):
+        # leads: dicts keyed by CSV header names. Existing emails are left untouched.
+        rows = [tuple(lead.get(header) for header in COLUMNS) for lead in leads]
+        cols = ",".join(COLUMNS.values())
+        marks = ",".join("?" * len(COLUMNS))
+        with self.conn:
+            before = self.conn.total_changes
+            self.conn.executemany(f"INSERT OR IGNORE INTO leads ({cols}) VALUES ({marks})", rows)
+            return self.conn.total_changes - before
+
+    def mark_status(self, emails, status, when=None):
+        when = when or datetime.now().isoformat(timespec='seconds')
+        if isinstance(emails, str):
+            emails = [emails]
+        with self.conn:
+            self.conn.executemany(
+                "UPDATE leads SET status = ?, status_updated = ? WHERE email = ?",
+                [(status, when, email) for email in emails],
+            )
+
+    def set_priority_scores(self, scores):
+        # scores: iterable of (email, score)
+        with self.conn:
+            self.conn.executemany(
+                "UPDATE leads SET priority_score = ? WHERE email = ?",
+                [(int(score), email) for email, score in scores],
+            )
+
+    def retain(self, emails):
+        # Delete every lead whose email is not in `emails`; returns rows removed
+        with self.conn:
+            self.conn.execute("CREATE TEMP TABLE IF NOT EXISTS keep (email TEXT PRIMARY KEY)")
+            self.conn.execute("DELETE FROM keep")
+            self.conn.executemany("INSERT OR IGNORE INTO keep VALUES (?)", ((e,) for e in emails))
+            removed = self.conn.execute("DELETE FROM leads WHERE email NOT IN (SELECT email FROM keep)").rowcount
+            self.conn.execute("DROP TABLE keep")
+        return removed
+
+    def backup(self, path):
+        dest = sqlite3.connect(path)
+        with dest:
+            self.conn.backup(dest)
+        dest.close()
+
+    # --- Interop -----------------------------------------------------------
+
+    def to_frame(self, columns=None):
+        import pandas as pd
+        headers = columns or list(COLUMNS)
+        cols = ",".join(COLUMNS[h] for h in headers)
+        df = pd.read_sql_query(f"SELECT {cols} FROM leads ORDER BY rowid", self.conn)
+        df.columns = headers
+        return df
+
+    def import_csv(self, csv_path, batch_size=10000):
+        # Streams the CSV in batches; rows for known emails are updated in place
+        cols = ",".join(COLUMNS.values())
+        marks = ",".join("?" * len(COLUMNS))
+        updates = ",".join(f"{c}=COALESCE(excluded.{c}, {c})" for c in COLUMNS.values() if c != "email")
+        sql = f"INSERT INTO leads ({cols}) VALUES ({marks}) ON CONFLICT(email) DO UPDATE SET {updates}"
+        count = 0
+        with open(csv_path, newline='') as f, self.conn:
+            batch = []
+            for row in csv.DictReader(f):
+                row["Email"] = (row.get("Email") or "").strip()
+                if not row["Email"]:
+                    continue
+                batch.append(tuple(row.get(header) or None for header in COLUMNS))
+                if len(batch) >= batch_size:
+                    self.conn.executemany(sql, batch)
+                    count += len(batch)
+                    batch = []
+            if batch:
+                self.conn.executemany(sql, batch)
+                count += len(batch)
+        return count
+
+    def export_csv(self, csv_path):
+        cols = ",".join(COLUMNS.values())
+        tmp_path = csv_path + ".tmp"
+        count = 0
+        with open(tmp_path, "w", newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(COLUMNS)
+            for row in self.conn.execute(f"SELECT {cols} FROM leads ORDER BY rowid"):
+                writer.writerow(row)
+                count += 1
+        os.replace(tmp_path, csv_path)
+        return count
+
+
+def store_enabled(path=LEAD_DB_PATH):
+    # Scripts switch to the store once it has been created with `lead_store.py import`
+    return os.path.exists(path)
+
+def open_store(path=LEAD_DB_PATH):
+    return LeadStore(path)
+
+def main():
+    command = sys.argv[1] if len(sys.argv) > 1 else "stats"
+    csv_path = sys.argv[2] if len(sys.argv) > 2 else MASTER_PATH
+
+    if command == "import" and master_file(csv_path) != csv_path:
+        # The CSV is stale once a columnar copy holds the list
+        print(f"❌ {master_file(csv_path)} holds the list; `python master_list.py export` it and remove it first")
+        return
+
+    with open_store() as store:
+        if command == "import":
+            if os.path.exists(csv_path):
+                compact_master(csv_path)
+            count = store.import_csv(csv_path)
+            print(f"✅ Imported {count} rows from {csv_path} into {store.path}")
+        elif command == "export":
+            count = store.export_csv(csv_path)
+            print(f"✅ Exported {count} leads to {csv_path}")
+        elif command == "stats":
+            for status, count in sorted(store.status_counts().items()):
+                print(f"📊 {status}: {count}")
+        else:
+            print("Usage: python lead_store.py [import|export|stats] [csv_path]")
+
+if __name__ == "__main__":
+    main()
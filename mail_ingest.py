@@ -0,0 +1,370 @@
+import os
+import re
+import json
+import mmap
+import hashlib
+import sqlite3
+import argparse
+from email.header import decode_header, make_header
+from instrumentation import start_run, finish_run, count, timer
+
+# Bounce and reply ingestion from a local mailbox (Maildir or mbox).
+#
+# Only message headers are parsed. The body is read just for bounces that don't
+# name the failed address in a header (X-Failed-Recipients): then the DSN's
+# delivery-status part is scanned for Final-Recipient. Each finding goes into
+# the suppression ledgers (bounced / replied / opted_out) and the lead's Status,
+# and the address's pending follow-ups are cancelled.
+#
+# Scans are incremental. For an mbox the byte offset of the end of the last
+# message read is remembered (plus a fingerprint of the bytes before it, so a
+# rewritten mailbox is rescanned from the start); the file is memory-mapped and
+# the scan jumps from one "From " separator to the next. For a Maildir the
+# unique names of files already read are remembered. Message-IDs of findings
+# are remembered too, so a message seen twice (e.g. in a rescan, or in two
+# folders) is only applied once.
+#
+# config.json:
+#   "mailboxes": ["~/Mail/INBOX", "~/Mail/Bounces.mbox"]
+#
+#   python mail_ingest.py                 # scan the configured mailboxes
+#   python mail_ingest.py ~/Mail/INBOX    # or these
+#   python mail_ingest.py --dry-run       # report findings without applying them
+
+INGEST_DB_PATH = "mail_ingest.db"
+MAX_HEADER_BYTES = 256 * 1024 # Header blocks larger than this are not real messages
+FINGERPRINT_BYTES = 256
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS mbox_positions (path TEXT PRIMARY KEY, offset INTEGER NOT NULL, fingerprint TEXT);
+CREATE TABLE IF NOT EXISTS maildir_seen (name TEXT PRIMARY KEY) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS findings (
+    message_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    email TEXT NOT NULL,
+    PRIMARY KEY (message_id, email)
+) WITHOUT ROWID;
+"""
+
+# Finding -> (suppression category, lead Status)
+OUTCOMES = {
+    "bounce": ("bounced", "BOUNCED"),
+    "reply": ("replied", "REPLIED"),
+    "opt_out": ("opted_out", "OPTED_OUT"),
+}
+
+BOUNCE_SENDERS = ("mailer-daemon", "postmaster", "mail-daemon")
+_BOUNCE_SUBJECT = re.compile(
+    r"undeliver|delivery status notification|returned mail|mail delivery (failed|failure|subsystem)"
+    r"|delivery (has )?failed|failure notice|could not be delivered", re.I)
+_AUTO_SUBJECT = re.compile(r"^\s*(automatic reply|auto[- ]?reply|auto:|out of (the )?office|away from)", re.I)
+_OPT_OUT = re.compile(r"\b(unsubscribe|remove me|opt[- ]?out|stop (emailing|contacting))\b", re.I)
+_FINAL_RECIPIENT = re.compile(rb"^Final-Recipient:[^;\n]*;\s*<?([^\s<>]+@[^\s<>]+?)>?\s*$", re.I | re.M)
+_ACTION = re.compile(rb"^Action:\s*(\w+)", re.I | re.M)
+_DSN_STATUS = re.compile(rb"^Status:\s*(\d)", re.I | re.M)
+_QMAIL_RECIPIENT = re.compile(rb"^<([^\s<>]+@[^\s<>]+)>:\s*$", re.M)
+_BLANK = re.compile(rb"\r?\n\r?\n")
+_FOLD = re.compile(rb"\r?\n[ \t]+")
+_ADDRESS = re.compile(r"<\s*([^<>\s]+@[^<>\s]+?)\s*>|([^\s<>\"',;:]+@[^\s<>\"',;]+)")
+
+def parse_headers(block):
+    # Header block -> {lowercase name: value} (first occurrence wins). Far cheaper
+    # than the email package's parser, and all that's needed here.
+    headers = {}
+    for line in _FOLD.sub(b" ", block).split(b"\n"):
+        name, colon, value = line.partition(b":")
+        if colon:
+            headers.setdefault(name.strip().lower().decode("latin-1"), value.strip().decode("utf-8", "replace"))
+    return headers
+
+def addresses(value):
+    # Lowercased email addresses in a From/To-style header value, in order
+    return [(bracketed or bare).lower() for bracketed, bare in _ADDRESS.findall(value)]
+
+def header_text(headers, name):
+    value = headers.get(name.lower(), "")
+    if "=?" in value:
+        try:
+            value = str(make_header(decode_header(value)))
+        except (UnicodeError, LookupError, ValueError):
+            pass
+    return value
+
+def is_bounce(headers):
+    content_type = header_text(headers, "Content-Type").lower()
+    if "multipart/report" in content_type and "delivery-status" in content_type:
+        return True
+    sender = (addresses(header_text(headers, "From")) or ["@"])[0].split("@")[0]
+    return (sender in BOUNCE_SENDERS or header_text(headers, "Return-Path").strip() == "<>") \
+        and bool(_BOUNCE_SUBJECT.search(header_text(headers, "Subject")))
+
+def is_auto_reply(headers):
+    auto = header_text(headers, "Auto-Submitted").strip().lower()
+    precedence = header_text(headers, "Precedence").strip().lower()
+    return (auto not in ("", "no") or precedence in ("bulk", "junk", "list", "auto_reply")
+            or "x-autoreply" in headers or "x-autorespond" in headers
+            or bool(_AUTO_SUBJECT.match(header_text(headers, "Subject"))))
+
+def failed_recipients(body):
+    # Hard-failed addresses in a bounce body: RFC 3464 per-recipient blocks
+    # (Final-Recipient + Action: failed / Status: 5.x.x), else qmail-style "<addr>:" lines
+    failed = []
+    for block in _BLANK.split(body):
+        recipient = _FINAL_RECIPIENT.search(block)
+        if not recipient:
+            continue
+        action, status = _ACTION.search(block), _DSN_STATUS.search(block)
+        if (action and action.group(1).lower() == b"failed") or (not action and status and status.group(1) == b"5"):
+            failed.append(recipient.group(1).decode(errors="replace"))
+    if not failed and not _FINAL_RECIPIENT.search(body):
+        failed = [m.decode(errors="replace") for m in _QMAIL_RECIPIENT.findall(body)]
+    return failed
+
+def classify(headers, read_body, contacted):
+    # [(kind, email)] for one message. read_body() returns the body bytes and is
+    # only called for bounces; contacted(email) says whether we wrote to email.
+    if is_bounce(headers):
+        listed = header_text(headers, "X-Failed-Recipients")
+        if listed:
+            emails = addresses(listed)
+        else:
+            with timer("bounce_body"):
+                emails = failed_recipients(read_body())
+        return [("bounce", email.strip().lower()) for email in dict.fromkeys(emails)]
+    if is_auto_reply(headers):
+        return []
+    email = (addresses(header_text(headers, "From")) or [""])[0]
+    if not email or not contacted(email):
+        return []
+    return [("opt_out" if _OPT_OUT.search(header_text(headers, "Subject")) else "reply", email)]
+
+def message_key(headers, block):
+    message_id = header_text(headers, "Message-ID").strip()
+    return message_id or "sha1:" + hashlib.sha1(block).hexdigest()
+
+def _header_end(data, start, stop):
+    # Offset of the blank line ending the header block in data[start:stop], or -1
+    match = _BLANK.search(data, start, stop)
+    return match.start() if match else -1
+
+def _fingerprint(mm, offset):
+    return hashlib.blake2b(mm[max(0, offset - FINGERPRINT_BYTES):offset], digest_size=16).hexdigest()
+
+
+class IngestState:
+    def __init__(self, path=INGEST_DB_PATH):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+    def mbox_position(self, path):
+        row = self.conn.execute("SELECT offset, fingerprint FROM mbox_positions WHERE path = ?", (path,)).fetchone()
+        return row or (0, None)
+
+    def set_mbox_position(self, path, offset, fingerprint):
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO mbox_positions VALUES (?, ?, ?)", (path, offset, fingerprint))
+
+    def unseen_names(self, names):
+        # Maildir unique names not read yet (chunked indexed IN lookups)
+        names = list(names)
+        seen = set()
+        for i in range(0, len(names), 500):
+            chunk = names[i:i + 500]
+            marks = ",".join("?" * len(chunk))
+            seen.update(name for (name,) in self.conn.execute(
+                f"SELECT name FROM maildir_seen WHERE name IN ({marks})", chunk))
+        return [name for name in names if name not in seen]
+
+    def mark_names(self, names):
+        with self.conn:
+            self.conn.executemany("INSERT OR IGNORE INTO maildir_seen VALUES (?)", [(name,) for name in names])
+
+    def applied(self, message_id):
+        return self.conn.execute("SELECT 1 FROM findings WHERE message_id = ? LIMIT 1", (message_id,)).fetchone() is not None
+
+    def record(self, message_id, findings):
+        with self.conn:
+            self.conn.executemany("INSERT OR IGNORE INTO findings VALUES (?, ?, ?)",
+                                  [(message_id, kind, email) for kind, email in findings])
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class MailIngestor:
+    # Scans mailboxes and applies what it finds. apply(kind, email) is called
+    # once per new finding.
+    def __init__(self, state, contacted, apply):
+        self.state = state
+        self.contacted = contacted
+        self.apply = apply
+        self.scanned = 0
+        self.found = {kind: 0 for kind in OUTCOMES}
+
+    def _handle(self, block, read_body):
+        self.scanned += 1
+        headers = parse_headers(block)
+        findings = classify(headers, read_body, self.contacted)
+        if not findings:
+            return
+        key = message_key(headers, block)
+        if self.state.applied(key):
+            return
+        for kind, email in findings:
+            self.found[kind] += 1
+            self.apply(kind, email)
+        # Only after applying: a crash in between means the message is applied again, never skipped
+        self.state.record(key, findings)
+
+    def scan(self, path):
+        path = os.path.expanduser(path)
+        if os.path.isdir(path):
+            self.scan_maildir(path)
+        elif os.path.exists(path):
+            self.scan_mbox(path)
+        else:
+            print(f"⚠️  Mailbox not found: {path}")
+
+    def scan_mbox(self, path):
+        key = os.path.abspath(path)
+        size = os.path.getsize(path)
+        if size == 0:
+            return
+        offset, fingerprint = self.state.mbox_position(key)
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if offset > size or (offset and _fingerprint(mm, offset) != fingerprint):
+                print(f"♻️  {path} was rewritten; rescanning it.")
+                offset = 0
+            if mm[offset:offset + 5] == b"From ":
+                pos = offset
+            else:
+                following = mm.find(b"\nFrom ", offset)
+                pos = size if following == -1 else following + 1
+            while pos < size:
+                following = mm.find(b"\nFrom ", pos)
+                end = size if following == -1 else following + 1
+                if following == -1 and mm[size - 1:size] != b"\n":
+                    break # Last message is still being written
+                headers_start = mm.find(b"\n", pos) + 1
+                headers_end = _header_end(mm, headers_start, min(end, headers_start + MAX_HEADER_BYTES))
+                if headers_end != -1:
+                    self._handle(mm[headers_start:headers_end], lambda s=headers_end, e=end: mm[s:e])
+                offset = pos = end
+            self.state.set_mbox_position(key, offset, _fingerprint(mm, offset))
+
+    def scan_maildir(self, path):
+        # new/ and cur/ of the Maildir and of any Maildir++ subfolders (".Sent", ...)
+        folders = [path] + [os.path.join(path, name) for name in sorted(os.listdir(path))
+                            if name.startswith(".") and os.path.isdir(os.path.join(path, name, "cur"))]
+        for folder in folders:
+            for sub in ("new", "cur"):
+                directory = os.path.join(folder, sub)
+                if not os.path.isdir(directory):
+                    continue
+                # A message keeps its unique name when its flags change (new/x -> cur/x:2,S)
+                files = {name.split(":", 1)[0]: name for name in os.listdir(directory) if not name.startswith(".")}
+                unseen = self.state.unseen_names(files)
+                for name in unseen:
+                    self._read_maildir_file(os.path.join(directory, files[name]))
+                self.state.mark_names(unseen)
+
+    def _read_maildir_file(self, path):
+        try:
+            with open(path, "rb") as f:
+                head = f.read(8192)
+                headers_end = _header_end(head, 0, len(head))
+                while headers_end == -1 and len(head) < MAX_HEADER_BYTES:
+                    more = f.read(65536)
+                    if not more:
+                        break
+                    head += more
+                    headers_end = _header_end(head, 0, len(head))
+        except FileNotFoundError:
+            return # Moved by the mail client mid-scan; picked up under its new name
+        if headers_end == -1:
+            headers_end = len(head)
+
+        def read_body():
+            with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return mm[headers_end:]
+        self._handle(head[:headers_end], read_body)
+
+
+def _load_config():
+    if not os.path.exists('config.json'):
+        return {}
+    with open('config.json', 'r') as f:
+        return json.load(f)
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest bounces and replies from a Maildir or mbox.")
+    parser.add_argument("mailboxes", nargs="*", help="Maildir directories or mbox files (default: \"mailboxes\" in config.json).")
+    parser.add_argument("--dry-run", action="store_true", help="Print findings without applying them (nothing is remembered).")
+    args = parser.parse_args()
+
+    config = _load_config()
+    mailboxes = args.mailboxes or config.get('mailboxes', [])
+    if not mailboxes:
+        print("❌ No mailboxes given and none configured under \"mailboxes\" in config.json.")
+        return
+
+    from suppression import open_suppression
+    from send_ledger import open_send_ledger
+    from outbox import open_outbox
+    from master_list import MASTER_PATH, record_status
+    from lead_store import store_enabled, open_store
+
+    suppression = open_suppression()
+    ledger = open_send_ledger(config, suppression=suppression)
+    outbox = open_outbox(config)
+    store = open_store() if store_enabled() else None
+
+    def contacted(email):
+        return email in suppression['sent'] or email in suppression['followed_up']
+
+    def apply(kind, email):
+        category, status = OUTCOMES[kind]
+        print(f"{'📭' if kind == 'bounce' else '💬'} {email}: {status}")
+        if args.dry_run:
+            return
+        suppression.add(category, email)
+        ledger.cancel(email) # No more follow-ups
+        outbox.cancel_recipient(email)
+        if store:
+            store.mark_status(email, status)
+        else:
+            record_status(MASTER_PATH, email, status)
+
+    state = IngestState(":memory:" if args.dry_run else INGEST_DB_PATH)
+    ingestor = MailIngestor(state, contacted, apply)
+    try:
+        for mailbox in mailboxes:
+            with timer("mail_scan"):
+                ingestor.scan(mailbox)
+    finally:
+        state.close()
+        suppression.close()
+        ledger.close()
+        outbox.close()
+        if store:
+            store.close()
+    for kind, n in ingestor.found.items():
+        count(f"mail_{kind}s", n)
+    count("mail_messages_scanned", ingestor.scanned)
+    print(f"📊 Scanned {ingestor.scanned} new messages: {ingestor.found['bounce']} bounces, "
+          f"{ingestor.found['reply']} replies, {ingestor.found['opt_out']} opt-outs.")
+
+if __name__ == "__main__":
+    start_run("mail_ingest")
+    try:
+        main()
+    finally:
+        finish_run()
@@ -0,0 +1,471 @@
+import os
+import sys
+import json
+import fcntl
+from datetime import datetime
+
+from instrumentation import timer, count
+
+MASTER_PATH = "/Users/vr/Desktop/Master_Outreach_List.csv"
+STATUS_TIME_COLUMN = "Status Updated"
+# Statuses of leads that were emailed; their companies count as contacted
+# (BOUNCED/REPLIED/OPTED_OUT replace SENT once mail_ingest.py sees the outcome)
+CONTACTED_STATUSES = ("SENT", "BOUNCED", "REPLIED", "OPTED_OUT")
+
+# Columnar storage. The format follows the file extension; once
+# Master_Outreach_List.arrow (or .parquet) exists next to the CSV, every script
+# reads and writes it instead, and the CSV is only used for import/export:
+#
+#   python master_list.py import [--format parquet]   # CSV -> .arrow
+#   python master_list.py export                      # .arrow -> CSV
+#
+# Arrow IPC files are uncompressed and memory-mapped, so reading a few columns
+# only touches those columns' pages; Parquet is compressed (smaller, slower to
+# read). Repetitive columns are dictionary-encoded and load as categoricals.
+COLUMNAR_FORMATS = {".arrow": "arrow", ".feather": "arrow", ".parquet": "parquet"}
+DICTIONARY_COLUMNS = ("Company", "Job/Role", "Status", "Key Tools", "Job Focus/Needs")
+
+def list_format(path):
+    return COLUMNAR_FORMATS.get(os.path.splitext(path)[1].lower(), "csv")
+
+def master_file(path=MASTER_PATH):
+    # The file actually holding the list: a columnar sibling takes over from a CSV path
+    if list_format(path) != "csv":
+        return path
+    stem = os.path.splitext(path)[0]
+    for ext in COLUMNAR_FORMATS:
+        if os.path.exists(stem + ext):
+            return stem + ext
+    return path
+
+def is_columnar(path=MASTER_PATH):
+    return list_format(master_file(path)) != "csv"
+
+# Status changes (e.g. Status = 'SENT') are appended to a small journal next to
+# the master list instead of rewriting the whole CSV after every send.
+# Each line is one JSON record; a torn last line (crash mid-write) is ignored.
+def journal_path(path):
+    # One journal per list whatever format holds it: Master_Outreach_List.arrow
+    # shares Master_Outreach_List.csv.journal, so switching formats never strands it
+    if list_format(path) != "csv":
+        return os.path.splitext(path)[0] + ".csv.journal"
+    return path + ".journal"
+
+def record_status(path, email, status, when=None):
+    when = when or datetime.now().isoformat(timespec='seconds')
+    line = json.dumps({"email": email, "status": status, "at": when}) + "\n"
+    with open(journal_path(path), "a+") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            # Never glue a record onto a torn line left by an earlier crash
+            if f.tell() > 0:
+                f.seek(f.tell() - 1)
+                if f.read(1) != "\n":
+                    line = "\n" + line
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+def _parse_journal(data):
+    updates = {}
+    for raw in data.splitlines():
+        try:
+            entry = json.loads(raw)
+        except ValueError:
+            continue # Torn or partial line
+        updates[entry['email']] = (entry['status'], entry.get('at'))
+    return updates
+
+def load_journal(path):
+    return read_journal(path)[0]
+
+def read_journal(path):
+    # Returns (updates, folded_bytes) so a later drop_folded() only removes what was read
+    jpath = journal_path(path)
+    if not os.path.exists(jpath):
+        return {}, 0
+    with open(jpath, "rb") as f:
+        # Same lock as record_status, so an append in progress is never half read
+        fcntl.flock(f, fcntl.LOCK_SH)
+        try:
+            data = f.read()
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+    # Only whole lines count as read: a torn last line (crash mid-write) was
+    # skipped by the parser and must survive drop_folded()
+    return _parse_journal(data.decode(errors='replace')), data.rfind(b"\n") + 1
+
+def drop_folded(path, folded):
+    # Remove the first `folded` bytes of the journal, keeping anything appended since
+    jpath = journal_path(path)
+    if not folded or not os.path.exists(jpath):
+        return
+    with open(jpath, "rb+") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            f.seek(folded)
+            tail = f.read()
+            f.seek(0)
+            f.write(tail)
+            f.truncate()
+            f.flush()
+            os.fsync(f.fileno())
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+def apply_journal(df, updates):
+    if not updates or df.empty or 'Email' not in df.columns:
+        return df
+    statuses = {email: status for email, (status, _) in updates.items()}
+    times = {email: when for email, (_, when) in updates.items()}
+    if 'Status' not in df.columns:
+        df['Status'] = None
+    if STATUS_TIME_COLUMN not in df.columns:
+        df[STATUS_TIME_COLUMN] = None
+    hit = df['Email'].isin(list(statuses))
+    if hit.any():
+        for column, values in (('Status', statuses), (STATUS_TIME_COLUMN, times)):
+            df[column] = df[column].astype(object).where(~hit, df['Email'].map(values))
+    return df
+
+def _journal_columns(columns, updates):
+    # (columns to load, updates to apply): a status change needs Email to land
+    # on its row, and is irrelevant when Status isn't loaded
+    if columns is None:
+        return None, updates
+    columns = list(columns)
+    if 'Status' not in columns:
+        return columns, {}
+    if updates and 'Email' not in columns:
+        return columns + ['Email'], updates
+    return columns, updates
+
+def _project(df, columns):
+    if columns is None or list(df.columns) == list(columns):
+        return df
+    return df[list(columns)]
+
+def _pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError("Columnar master lists (.arrow/.parquet) need pyarrow: pip install pyarrow") from None
+    return pyarrow
+
+def _read_table(path, columns=None):
+    # Arrow table of a columnar list, memory-mapped; only `columns` are read
+    pa = _pyarrow()
+    if list_format(path) == "parquet":
+        import pyarrow.parquet as pq
+        names = columns or pq.read_schema(path, memory_map=True).names
+        dictionary = [c for c in DICTIONARY_COLUMNS if c in names]
+        return pq.read_table(path, columns=columns, memory_map=True, read_dictionary=dictionary)
+    with pa.memory_map(path) as source:
+        table = pa.ipc.open_file(source).read_all()
+    return table if columns is None else table.select(columns)
+
+def _iter_tables(path, chunksize, columns=None):
+    # The same in slices of at most chunksize rows (at least one, maybe empty)
+    if list_format(path) == "parquet":
+        import pyarrow.parquet as pq
+        parquet = pq.ParquetFile(path, memory_map=True)
+        empty = True
+        for batch in parquet.iter_batches(batch_size=chunksize, columns=columns):
+            empty = False
+            yield _pyarrow().Table.from_batches([batch])
+        if empty:
+            yield parquet.schema_arrow.empty_table().select(columns or parquet.schema_arrow.names)
+        return
+    table = _read_table(path, columns)
+    for start in range(0, max(table.num_rows, 1), chunksize):
+        yield table.slice(start, chunksize)
+
+def _to_frame(table, decode=False):
+    # Dictionary columns come back as categoricals. Streamed chunks are decoded
+    # to plain strings instead: a slice still carries its column's whole
+    # dictionary, which would otherwise be converted again for every chunk.
+    return (_plain(table) if decode else table).to_pandas()
+
+class _DictionaryEncoder:
+    # Arrow IPC files can't replace a column's dictionary between batches, only
+    # extend it, so chunked writes keep one growing dictionary per column (the
+    # first chunk's values sorted, later ones appended as deltas)
+    def __init__(self):
+        self.dictionaries = {}
+
+    def encode(self, column, array):
+        import numpy as np
+        import pyarrow.compute as pc
+        pa = _pyarrow()
+        encoded = array.dictionary_encode()
+        uniques = encoded.dictionary
+        dictionary = self.dictionaries.get(column)
+        if dictionary is None:
+            order = pc.array_sort_indices(uniques)
+            dictionary = uniques.take(order)
+            positions = np.empty(len(uniques), dtype=np.int32)
+            positions[order.to_numpy()] = np.arange(len(uniques), dtype=np.int32)
+        else:
+            # Probe the (large) dictionary against this chunk's (small) set of
+            # values rather than hashing the whole dictionary for every chunk
+            hits = pc.index_in(dictionary, value_set=uniques)
+            found = hits.is_valid().to_numpy(zero_copy_only=False)
+            positions = np.full(len(uniques), -1, dtype=np.int32)
+            positions[hits.drop_null().to_numpy()] = np.flatnonzero(found)
+            new = positions < 0
+            if new.any():
+                positions[new] = np.arange(len(dictionary), len(dictionary) + new.sum(), dtype=np.int32)
+                dictionary = pa.concat_arrays([dictionary, uniques.filter(pa.array(new))])
+        self.dictionaries[column] = dictionary
+        indices = pa.array(positions).take(encoded.indices)
+        return pa.DictionaryArray.from_arrays(indices, dictionary)
+
+def _text_array(values):
+    # Any pandas column as one Arrow large_string array (the list is all text).
+    # pyarrow-backed string columns can convert to a ChunkedArray; the encoder
+    # and Table.from_arrays want a single contiguous array.
+    import pandas as pd
+    pa = _pyarrow()
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        array = pa.array(values, from_pandas=True).dictionary_decode().cast(pa.large_string())
+    else:
+        if not pd.api.types.is_string_dtype(values):
+            values = values.astype("string")
+        array = pa.array(values, type=pa.large_string(), from_pandas=True)
+    if isinstance(array, pa.ChunkedArray):
+        array = array.combine_chunks()
+    return array
+
+def _to_arrow(df, encoder):
+    # Every column is text; DICTIONARY_COLUMNS are dictionary-encoded
+    pa = _pyarrow()
+    arrays = []
+    for column in df.columns:
+        array = _text_array(df[column])
+        arrays.append(encoder.encode(column, array) if column in DICTIONARY_COLUMNS else array)
+    return pa.Table.from_arrays(arrays, names=[str(c) for c in df.columns])
+
+def _plain(table):
+    # Dictionary columns decoded back to strings
+    pa = _pyarrow()
+    for i, field in enumerate(table.schema):
+        if pa.types.is_dictionary(field.type):
+            table = table.set_column(i, field.name, table.column(i).cast(field.type.value_type))
+    return table
+
+def _open_writer(path, schema, fmt):
+    pa = _pyarrow()
+    if fmt == "parquet":
+        # Parquet dictionary-encodes each row group by itself (and _read_table
+        # asks for those columns back as dictionaries), so it is given plain strings
+        import pyarrow.parquet as pq
+        return pq.ParquetWriter(path, schema, use_dictionary=[c for c in DICTIONARY_COLUMNS if c in schema.names])
+    options = pa.ipc.IpcWriteOptions(emit_dictionary_deltas=True, unify_dictionaries=True)
+    return pa.ipc.new_file(path, schema, options=options)
+
+def _write_tables(tables, path):
+    # Temp file in the same directory, then atomically renamed over path
+    tmp_path = path + ".tmp"
+    rows = 0
+    writer = None
+    try:
+        for table in tables:
+            with timer("columnar_write"):
+                if list_format(path) == "parquet":
+                    table = _plain(table)
+                if writer is None:
+                    writer = _open_writer(tmp_path, table.schema, list_format(path))
+                writer.write_table(table)
+            rows += table.num_rows
+        if writer is None:
+            writer = _open_writer(tmp_path, _pyarrow().schema([]), list_format(path))
+    finally:
+        if writer is not None:
+            writer.close()
+    with timer("columnar_write"):
+        _fsync_replace(tmp_path, path)
+    count("columnar_rows_written", rows)
+    return rows
+
+def _read_file(path, columns=None, **kwargs):
+    import pandas as pd # Imported on first use so journal-only callers stay light
+    if list_format(path) == "csv":
+        kwargs.setdefault('on_bad_lines', 'skip')
+        with timer("csv_read"):
+            df = pd.read_csv(path, usecols=columns, **kwargs)
+        count("csv_rows_read", len(df))
+        return df
+    with timer("columnar_read"):
+        df = _to_frame(_read_table(path, columns))
+    count("columnar_rows_read", len(df))
+    return df
+
+def _iter_file(path, chunksize, columns=None, **kwargs):
+    if list_format(path) == "csv":
+        import pandas as pd
+        kwargs.setdefault('on_bad_lines', 'skip')
+        reader = iter(pd.read_csv(path, chunksize=chunksize, usecols=columns, **kwargs))
+    else:
+        reader = _iter_tables(path, chunksize, columns)
+    name = "csv" if list_format(path) == "csv" else "columnar"
+    while True:
+        with timer(f"{name}_read"):
+            chunk = next(reader, None)
+            if chunk is not None and name == "columnar":
+                chunk = _to_frame(chunk, decode=True)
+        if chunk is None:
+            return
+        count(f"{name}_rows_read", len(chunk))
+        yield chunk
+
+def _write_file(chunks, path):
+    if list_format(path) != "csv":
+        encoder = _DictionaryEncoder()
+        return _write_tables((_to_arrow(chunk, encoder) for chunk in chunks), path)
+    tmp_path = path + ".tmp"
+    rows = 0
+    with open(tmp_path, "w", newline='') as f:
+        for i, chunk in enumerate(chunks):
+            with timer("csv_write"):
+                chunk.to_csv(f, index=False, header=(i == 0))
+            rows += len(chunk)
+    with timer("csv_write"):
+        _fsync_replace(tmp_path, path)
+    count("csv_rows_written", rows)
+    return rows
+
+def read_master(path=MASTER_PATH, columns=None, **kwargs):
+    # Merged view: the master list with all journaled status changes applied.
+    # With columns, only those are loaded (usecols is accepted as an alias);
+    # other keyword arguments are pd.read_csv options and only apply to CSV.
+    path = master_file(path)
+    columns = columns if columns is not None else kwargs.pop('usecols', None)
+    load, updates = _journal_columns(columns, load_journal(path))
+    if list_format(path) != "csv":
+        kwargs = {}
+    return _project(apply_journal(_read_file(path, load, **kwargs), updates), columns)
+
+def iter_master(path=MASTER_PATH, chunksize=200_000, updates=None, columns=None, **kwargs):
+    # Merged view in bounded-size chunks, for lists too large to load at once
+    path = master_file(path)
+    if updates is None:
+        updates = load_journal(path)
+    load, updates = _journal_columns(columns, updates)
+    if list_format(path) != "csv":
+        kwargs = {}
+    for chunk in _iter_file(path, chunksize, load, **kwargs):
+        yield _project(apply_journal(chunk, updates), columns)
+
+def take_master(positions, path=MASTER_PATH):
+    # Just the rows at these positions (e.g. the top few of a ranking computed
+    # over a couple of columns), merged with the journal
+    path = master_file(path)
+    if list_format(path) == "csv":
+        return read_master(path).iloc[positions].reset_index(drop=True)
+    with timer("columnar_read"):
+        df = _to_frame(_read_table(path).take(positions))
+    count("columnar_rows_read", len(df))
+    return apply_journal(df, load_journal(path))
+
+def reorder_master(order, path=MASTER_PATH):
+    # Rewrite the list with its rows in this order (positions). A columnar list
+    # is reordered in Arrow, without building a DataFrame of every column.
+    # Journaled changes stay in the journal, as with any other write.
+    path = master_file(path)
+    if list_format(path) == "csv":
+        return write_master(read_master(path).iloc[order], path)
+    with timer("columnar_write"):
+        table = _read_table(path).take(order)
+    _write_tables([table], path)
+
+def _fsync_replace(tmp_path, path):
+    with open(tmp_path, "rb+") as f:
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+def write_master(df, path=MASTER_PATH):
+    # Write to a temp file in the same directory, then atomically rename over
+    _write_file([df], master_file(path))
+
+def write_master_chunks(chunks, path=MASTER_PATH):
+    # Streaming counterpart of write_master: header once, then every chunk
+    return _write_file(chunks, master_file(path))
+
+def append_master(df, path=MASTER_PATH):
+    # New rows at the end of the list. A CSV is appended to in place; a columnar
+    # file can't be, so it is rewritten (memory-mapped, without pandas).
+    path = master_file(path)
+    if list_format(path) == "csv":
+        df.to_csv(path, mode='a', index=False, header=not os.path.exists(path))
+        count("csv_rows_written", len(df))
+        return
+    pa = _pyarrow()
+    table = _to_arrow(df, _DictionaryEncoder())
+    if os.path.exists(path):
+        existing = _read_table(path)
+        table = pa.concat_tables([existing, table], promote_options="permissive")
+    _write_tables([table], path)
+
+def compact_master(path=MASTER_PATH, chunksize=200_000):
+    # Fold the journal back into the master list once, then drop the folded part.
+    # Streams the list, so memory stays flat however large it is.
+    path = master_file(path)
+    if not os.path.exists(path):
+        return 0
+    updates, folded = read_journal(path)
+    if updates:
+        write_master_chunks(iter_master(path, chunksize, updates), path)
+    drop_folded(path, folded)
+    return len(updates)
+
+def main():
+    command = sys.argv[1] if len(sys.argv) > 1 else "compact"
+    if command == "import":
+        # python master_list.py import [csv] [--format arrow|parquet]
+        args = sys.argv[2:]
+        fmt = "arrow"
+        if "--format" in args:
+            i = args.index("--format")
+            fmt = args[i + 1] if i + 1 < len(args) else fmt
+            del args[i:i + 2]
+        if fmt not in ("arrow", "parquet"):
+            print(f"❌ Unknown format {fmt}; use arrow or parquet")
+            sys.exit(1)
+        source = args[0] if args else MASTER_PATH
+        target = os.path.splitext(source)[0] + "." + fmt
+        if list_format(source) != "csv":
+            print(f"❌ Import reads a CSV, not {source}")
+            sys.exit(1)
+        if master_file(source) != source:
+            print(f"❌ {master_file(source)} already holds the list; remove it to import again")
+            sys.exit(1)
+        if not os.path.exists(source):
+            print(f"❌ Master list not found at {source}")
+            sys.exit(1)
+        updates, folded = read_journal(source)
+        rows = _write_file(iter_master(source, updates=updates), target)
+        # Those changes are in the columnar file now; later ones stay journaled for it
+        drop_folded(source, folded)
+        print(f"✅ Imported {rows} rows from {source} into {target}")
+    elif command == "export":
+        # python master_list.py export [csv]
+        target = sys.argv[2] if len(sys.argv) > 2 else MASTER_PATH
+        source = master_file(target)
+        if source == target:
+            print(f"ℹ️  {target} is already the master list; nothing to export")
+            return
+        rows = _write_file(iter_master(source), target)
+        print(f"✅ Exported {rows} rows from {source} to {target}")
+    else:
+        # python master_list.py [path]: fold the journal in
+        target = command if len(sys.argv) > 1 else MASTER_PATH
+        if not os.path.exists(master_file(target)):
+            print(f"❌ Master list not found at {target}")
+            sys.exit(1)
+        applied = compact_master(target)
+        print(f"✅ Folded {applied} journaled status changes into {master_file(target)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+import os
+import re
+import mmap
+import uuid
+import base64
+import mimetypes
+import threading
+from email.message import EmailMessage
+from email.policy import SMTP
+from email.utils import make_msgid, formatdate
+
+# Builds outgoing MIME messages as a list of byte chunks.
+# The attachment (the resume) is read once via mmap, base64-encoded once, and
+# the encoded part is cached by (path, mtime, size). Every message then reuses
+# that same bytes object; only headers and body are built per recipient.
+
+POLICY = SMTP.clone(cte_type='7bit') # CRLF line endings, no 8bit bodies
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+def _encode_file(path, size):
+    if size == 0:
+        return b""
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        return base64.encodebytes(mm)
+
+def encoded_attachment(path):
+    # Complete MIME part (headers + base64 body, CRLF endings) for `path`, cached
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+    with _cache_lock:
+        part = _cache.get(key)
+    if part is not None:
+        return part
+
+    ctype, _ = mimetypes.guess_type(path)
+    filename = os.path.basename(path).replace('"', '')
+    encoded = _encode_file(path, stat.st_size).replace(b"\n", b"\r\n")
+    headers = (
+        f'Content-Type: {ctype or "application/octet-stream"}; name="{filename}"\r\n'
+        f'Content-Transfer-Encoding: base64\r\n'
+        f'Content-Disposition: attachment; filename="{filename}"\r\n\r\n'
+    ).encode()
+    part = headers + encoded
+
+    with _cache_lock:
+        # Drop stale versions of the same file
+        for old in [k for k in _cache if k[0] == key[0]]:
+            del _cache[old]
+        _cache[key] = part
+    return part
+
+def _body_part(body):
+    part = EmailMessage(policy=POLICY)
+    part.set_content(body)
+    del part['MIME-Version']
+    return part.as_bytes()
+
+def _headers(sender, recipient, subject, content_type):
+    # Folded/encoded top-level headers + blank line
+    headers = [
+        ('From', sender),
+        ('To', recipient),
+        ('Subject', subject),
+        ('Date', formatdate(localtime=True)),
+        ('Message-ID', make_msgid()),
+        ('MIME-Version', '1.0'),
+        ('Content-Type', content_type),
+    ]
+    folded = (POLICY.fold_binary(name, POLICY.header_factory(name, value)) for name, value in headers)
+    return b"".join(folded) + b"\r\n"
+
+def build_parts(sender, recipient, subject, body, attachment_path=None):
+    # -> list of bytes chunks; join them for the full RFC 5322 message
+    if not attachment_path:
+        msg = EmailMessage(policy=POLICY)
+        msg['From'] = sender
+        msg['To'] = recipient
+        msg['Subject'] = subject
+        msg['Date'] = formatdate(localtime=True)
+        msg['Message-ID'] = make_msgid()
+        msg.set_content(body)
+        return [msg.as_bytes()]
+
+    boundary = f"=_{uuid.uuid4().hex}"
+    head = b"".join([
+        _headers(sender, recipient, subject, f'multipart/mixed; boundary="{boundary}"'),
+        f"--{boundary}\r\n".encode(),
+        _body_part(body),
+        f"\r\n--{boundary}\r\n".encode(),
+    ])
+    tail = f"\r\n--{boundary}--\r\n".encode()
+    return [head, encoded_attachment(attachment_path), tail]
+
+def build_message_bytes(sender, recipient, subject, body, attachment_path=None):
+    return b"".join(build_parts(sender, recipient, subject, body, attachment_path))
+
+_leading_dot = re.compile(rb'(?m)^\.')
+
+def dot_stuff(chunk):
+    # SMTP transparency (RFC 5321 4.5.2). Chunks without a line starting with '.'
+    # (always true for base64) are returned as the same object, not copied.
+    if not chunk.startswith(b".") and b"\n." not in chunk:
+        return chunk
+    return _leading_dot.sub(b"..", chunk)
@@ -1,27 +1,22 @@
-import csv
-import time
 import os
-import subprocess
 import json
 import argparse
+import itertools
+import multiprocessing
+from suppression import open_suppression
+from send_ledger import open_send_ledger, LeaseTable
+from email_templates import get_template
+from outbox import open_outbox, drain, message_id, print_report, DeliveryRecorder
+from instrumentation import start_run, finish_run, timer, count as count_metric
+from master_list import CONTACTED_STATUSES, read_master, record_status, compact_master, master_file
+from lead_store import store_enabled, open_store
+from company_resolver import open_company_resolver, group_by_company
 
 # Load Configuration
 def load_config():
     with open('config.json', 'r') as f:
         return json.load(f)
 
-SENT_LOG_FILE = "sent_emails.txt"
-
-def load_sent_emails():
-    if not os.path.exists(SENT_LOG_FILE):
-        return set()
-    with open(SENT_LOG_FILE, "r") as f:
-        return set(line.strip() for line in f if line.strip())
-
-def log_sent_email(email):
-    with open(SENT_LOG_FILE, "a") as f:
-        f.write(f"{email}\n")
-
 def get_smart_greeting(email, company_name):
     user_part = email.split('@')[0]
     if '.' in user_part:
@@ -29,56 +24,210 @@ def get_smart_greeting(email, company_name):
         return f"Hi {name.capitalize()},"
     return f"Hi {company_name} Team,"
 
-def get_body(config, greeting):
-    # Specialized body for Data Analyst role
-    return f"""{greeting}
-
-I hope you’re doing well. I’m reaching out to explore {config['job_title']} opportunities within your team or current client openings.
-
-I have 5+ years of professional experience working across finance, payroll, and workforce analytics, with hands-on expertise in SQL, Snowflake, Power BI (DAX), Python, and Excel. I’ve built end-to-end dashboards, automated reporting workflows, and supported leadership teams with clear, decision-ready insights.
-
-Most recently, I’ve been working on Power BI and Snowflake-based reporting solutions, owning data extraction, modeling, DAX development, and dashboard delivery. I’m actively seeking {config['job_title']} roles where I can contribute immediately.
-
-I’ve included my resume and links below for quick reference:
-• Resume: Attached
-• Portfolio: {config['portfolio_url']}
-• GitHub: {config['github_url']}
-• LinkedIn: {config['linkedin_url']}
-
-If there’s a role that aligns, I’d really appreciate the opportunity to connect. Even a short conversation would be valuable.
-
-Thank you for your time, and I look forward to hearing from you.
-
-Best regards,
-{config['candidate_name']}
-{config['job_title']}
-📞 {config['phone']}
-📧 {config['email']}
-"""
-
-def send_mac_mail(recipient, subject, body, attachment_path):
-    # Escaping double quotes for AppleScript
-    safe_body = body.replace('"', '\"')
-    apple_script = f'''
-    tell application "Mail"
-        set newMessage to make new outgoing message with properties {{subject:"{subject}", content:"{safe_body}", visible:false}}
-        tell newMessage
-            make new to recipient at end of to recipients with properties {{address:"{recipient}"}}
-            make new attachment with properties {{file name:POSIX file "{attachment_path}"}} at after the last paragraph
-            send
-        end tell
-    end tell
-    '''
+def collect_candidates(df, suppression, n=None, per_company=3, resolver=None):
+    # Next sendable leads as {company: [email, ...]}: companies in list (priority)
+    # order, each with up to per_company fallbacks in list order, for at most n
+    # companies. Emailed rows (SENT, BOUNCED, ...) and already-contacted companies are excluded with
+    # vectorized masks over the whole list; the suppression index is only
+    # consulted for the rows of picked companies, until each has per_company.
+    # With a resolver, companies are keyed by canonical ID, so "Acme Inc" and
+    # "ACME" are one company.
+    import numpy as np
+    import pandas as pd
+
+    codes, companies = pd.factorize(df['Company'], use_na_sentinel=False)
+    if resolver is not None:
+        ids = {}
+        id_codes = np.fromiter((ids.setdefault(cid, len(ids)) for cid in resolver.canonical_ids(companies.tolist())),
+                               dtype=np.intp, count=len(companies))
+        codes, companies = id_codes[codes], np.array(list(ids), dtype=object)
+    sent = df['Status'].isin(CONTACTED_STATUSES).to_numpy()
+
+    # Identify companies that have ALREADY been contacted
+    contacted = np.zeros(len(companies), dtype=bool)
+    contacted[codes[sent]] = True
+    contacted_companies = set(companies[contacted])
+
+    rows = np.flatnonzero(~sent & df['Email'].notna().to_numpy() & ~contacted[codes])
+    row_codes = codes[rows]
+
+    # Per-company index: rows grouped by company (list order kept within each
+    # group), companies ranked by their best sendable row
+    order = np.argsort(row_codes, kind='stable')
+    grouped_codes = row_codes[order]
+    starts = np.flatnonzero(np.r_[True, grouped_codes[1:] != grouped_codes[:-1]])
+    ends = np.r_[starts[1:], len(order)]
+    ranking = np.argsort(rows[order[starts]], kind='stable')
+
+    emails, names = df['Email'].to_numpy(), df['Company'].to_numpy()
+    candidates = {}
+    for group in ranking:
+        if n is not None and len(candidates) >= n:
+            break
+        # Walk the company's rows until per_company unsuppressed ones are found
+        group_rows = rows[order[starts[group]:ends[group]]]
+        picked = []
+        for email in emails[group_rows]:
+            if str(email) not in suppression:
+                picked.append(str(email))
+                if len(picked) >= per_company:
+                    break
+        if picked:
+            # Named as on the company's best row
+            candidates[str(names[group_rows[0]])] = picked
+    return contacted_companies, candidates
+
+def send_batch(config, candidates, limit, resume_path, suppression, ledger, mark_sent, keys=None, deliver=True,
+               mark_bounced=None):
+    # Renders up to `limit` companies from candidates ({company: [emails]}, priority
+    # order) into the outbox, each company's fallback addresses on standby behind its
+    # first one, then delivers this account's queue (unless deliver is False, leaving
+    # it to `python outbox.py drain`). The other candidates are spares: when every
+    # address of a company dies, the next spare is queued in its place. Companies
+    # that already have messages in the outbox (sent, dead or still queued by an
+    # earlier run) are skipped. keys maps company -> canonical ID. mark_sent(email)
+    # persists each successful send's status, mark_bounced(email) each address the
+    # server rejected. Returns the count sent.
+    template = get_template(config, "cold")
+    keys = keys or {}
+    group_of = {company: f"company:{keys.get(company, company)}" for company in candidates}
+
+    def render(company):
+        messages = []
+        for email in candidates[company]:
+            with timer("render"):
+                subject, body = template.render(greeting=get_smart_greeting(email, company), company=company, recipient=email)
+            messages.append({
+                "id": message_id("cold", email),
+                "recipient": email,
+                "subject": subject,
+                "body": body,
+                "attachment_path": resume_path,
+                "meta": {"company": company},
+            })
+        return messages
+
+    with open_outbox(config) as outbox:
+        existing = outbox.existing_groups(group_of.values())
+        if existing:
+            print(f"ℹ️  {len(existing)} companies already have a message in the outbox; skipping them.")
+        spares = iter([company for company in candidates if group_of[company] not in existing])
+        ours = set()
+
+        def queue_next(n):
+            # Enqueue the next n spare companies (a concurrent run may take some first)
+            queued = 0
+            while queued < n:
+                groups = {group_of[company]: render(company) for company in itertools.islice(spares, n - queued)}
+                if not groups:
+                    break
+                ours.update(groups)
+                queued += outbox.enqueue_groups(groups, "cold", config.get('email'))
+            return queued
+
+        print(f"📥 Queued {queue_next(limit)} companies in the outbox.")
+        if not deliver:
+            return 0
+
+        count = 0
+        recorder = DeliveryRecorder(suppression, ledger, mark_sent, mark_bounced)
+
+        def on_sent(message):
+            nonlocal count
+            if message['kind'] == "cold":
+                count += 1
+                print(f"📧 [{count}/{limit}] {message['recipient']} ({message['meta'].get('company')}) ✅ Sent")
+            else:
+                print(f"📧 {message['recipient']} ({message['kind']}) ✅ Sent")
+            recorder.sent(message)
+
+        def on_failed(message, outcome):
+            # A dead address falls through to the company's next one, and a company
+            # with no addresses left to the next candidate company
+            print(f"📧 {message['recipient']} ({message['meta'].get('company', message['kind'])}) ❌ Failed ({outcome})")
+            if outcome == "fallback":
+                count_metric("fallback_retries")
+            recorder.failed(message, outcome)
+            if outcome == "dead" and message['grp'] in ours and queue_next(1):
+                count_metric("spare_companies")
+
+        stats = drain(outbox, config, on_sent, on_failed)
+        suppression.flush()
+        print_report(outbox, stats)
+    return count
+
+def load_accounts(config):
+    # One sender identity per worker. config.json "accounts" entries override the
+    # top-level settings (transport, smtp, email, rate_limits) for that worker:
+    #   "accounts": [{"email": "me@a.com", "smtp": {...}}, {"email": "me@b.com", "smtp": {...}}]
+    return [{**config, **account} for account in config.get('accounts') or [{}]]
+
+def shard(candidates, workers):
+    # Round-robin in priority order, so every worker gets an equal share of the best companies
+    shards = [{} for _ in range(workers)]
+    for i, (company, emails) in enumerate(candidates.items()):
+        shards[i % workers][company] = emails
+    return shards
+
+def run_worker(index, config, candidates, keys, limit, resume_path, master_path, use_store, deliver=True):
+    # One sending process bound to one account. Claims its companies in the shared
+    # lease table first (so no other worker or concurrent run can send to them),
+    # sends, then keeps the leases of companies it sent to and releases the rest.
+    worker = f"{os.uname().nodename}:{os.getpid()}:{index}"
+    leases = LeaseTable()
+    claimed = leases.claim({keys[company] for company in candidates}, worker)
+    skipped = len(candidates) - sum(1 for company in candidates if keys[company] in claimed)
+    if skipped:
+        print(f"ℹ️  Worker {index}: {skipped} companies are being handled by another sender.")
+    if leases.reclaimed:
+        print(f"♻️  Worker {index}: reclaimed {leases.reclaimed} companies from an expired lease.")
+    count_metric("leases_reclaimed", leases.reclaimed)
+    candidates = {company: emails for company, emails in candidates.items() if keys[company] in claimed}
+    company_of = {email: company for company, emails in candidates.items() for email in emails}
+
+    suppression = open_suppression()
+    ledger = open_send_ledger(config, suppression=suppression)
+    store = open_store() if use_store else None
+
+    def mark_status(email, status):
+        if store:
+            store.mark_status(email, status)
+        else:
+            # Journal the status change (crash-safe append) instead of rewriting the whole list
+            record_status(master_path, email, status)
+
+    def mark_sent(email):
+        mark_status(email, 'SENT')
+        if email in company_of: # Not a message left over from an earlier run
+            leases.complete(keys[company_of[email]], worker, email)
+        leases.renew(worker) # Still alive; keep the rest of our companies
+
+    try:
+        return send_batch(config, candidates, limit, resume_path, suppression, ledger, mark_sent, keys, deliver,
+                          lambda email: mark_status(email, 'BOUNCED'))
+    finally:
+        leases.release(leases.held(worker), worker)
+        leases.close()
+        suppression.close()
+        ledger.close()
+        if store:
+            store.close()
+
+def _worker_process(index, config, candidates, keys, limit, resume_path, master_path, use_store, deliver):
+    # Entry point of a spawned worker; it writes its own run report
+    start_run(f"morning_batch_sender_worker{index}")
     try:
-        subprocess.run(["osascript", "-e", apple_script], check=True)
-        return True
-    except Exception as e:
-        print(f" Error: {e}")
-        return False
+        return run_worker(index, config, candidates, keys, limit, resume_path, master_path, use_store, deliver)
+    finally:
+        finish_run()
 
 def main():
     parser = argparse.ArgumentParser(description="Send a morning batch of cold emails.")
     parser.add_argument("--limit", type=int, default=30, help="Number of emails to send.")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Parallel sending processes (default: one per configured account).")
+    parser.add_argument("--queue-only", action="store_true",
+                        help="Render the batch into the outbox and leave delivery to `python outbox.py drain`.")
     args = parser.parse_args()
 
     if not os.path.exists('config.json'):
@@ -93,69 +242,73 @@ def main():
         print(f"❌ Resume not found at {resume_path}")
         return
 
-    if not os.path.exists(master_path):
-        print(f"❌ {master_path} not found.")
-        return
+    # Sent, bounced and opted-out addresses are all suppressed
+    suppression = open_suppression()
+    # Seeds the send ledger on first use (workers open their own)
+    open_send_ledger(config, suppression=suppression).close()
+    # One email per company, keyed by canonical company ID
+    resolver = open_company_resolver()
+    accounts = load_accounts(config)
+    workers = max(1, args.workers or len(accounts))
+    limit = args.limit
+    use_store = store_enabled()
 
-    # Load the Master List
-    import pandas as pd
-    try:
-        df = pd.read_csv(master_path, on_bad_lines='skip')
-    except Exception as e:
-        print(f"❌ Error reading Master List: {e}")
-        return
+    if use_store:
+        # Indexed query for the next pending leads from uncontacted companies
+        with open_store() as store:
+            contacted_companies = store.contacted_companies()
+            # Over-fetch companies and keep a few fallbacks each so failures can fall through
+            candidates = store.next_pending(limit * 2, per_company=3, exclude_emails=suppression)
+        # The query matches exact names; merge spellings and drop ones already contacted
+        candidates = group_by_company(candidates, contacted_companies, resolver)
+    else:
+        if not os.path.exists(master_file(master_path)):
+            print(f"❌ {master_path} not found.")
+            return
 
-    sent_emails = load_sent_emails()
-    
-    # Identify companies that have ALREADY been contacted
-    contacted_companies = set(df[df['Status'] == 'SENT']['Company'].unique())
-    
-    count = 0
-    limit = args.limit
+        # Load the Master List (merged with any journaled status changes);
+        # selection only looks at these columns
+        try:
+            df = read_master(master_path, columns=['Email', 'Company', 'Status'])
+        except Exception as e:
+            print(f"❌ Error reading Master List: {e}")
+            return
+
+        # Vectorized selection; over-fetch companies and keep a few fallbacks each
+        with timer("select"):
+            contacted_companies, candidates = collect_candidates(df, suppression, n=limit * 2, per_company=3,
+                                                                 resolver=resolver)
+    # Lease keys: the canonical company ID
+    keys = resolver.resolve_many(list(candidates))
+    suppression.close()
+    resolver.close()
 
     print(f"🚀 Starting Morning Batch Outreach (Limit: {limit})...")
     print(f"ℹ️  Found {len(contacted_companies)} companies already contacted. Enforcing 1-email-per-company rule.")
-    
-    # Iterate through rows that are 'Pending' or not 'SENT'
-    # We prioritize Pending but also check the sent_emails.txt for extra safety
-    for index, row in df.iterrows():
-        if count >= limit:
-            break
-            
-        email = str(row['Email'])
-        company = str(row['Company'])
-        status = str(row.get('Status', 'Pending'))
-        
-        # Check if company was already contacted (globally or in this session)
-        if company in contacted_companies:
-            # Optional: Start skipping silently to reduce noise if many rows
-            # print(f"⏭️  Skipping {email} ({company} already contacted).")
-            continue
-
-        if status == 'SENT' or email in sent_emails:
-            continue
-            
-        greeting = get_smart_greeting(email, company)
-        body = get_body(config, greeting)
-        
-        print(f"📧 [{count+1}/{limit}] Sending to {email} ({company})...", end="", flush=True)
-        if send_mac_mail(email, config['email_subject'], body, resume_path):
-            print(" ✅ Sent")
-            log_sent_email(email)
-            # Update the status in the dataframe
-            df.at[index, 'Status'] = 'SENT'
-            contacted_companies.add(company) # Mark company as contacted for this run
-            count += 1
-            # Save progress immediately to prevent data loss on interrupt
-            df.to_csv(master_path, index=False)
-        else:
-            print(" ❌ Failed")
-        
-        time.sleep(config['delay_seconds'])
 
-    # Save the updated Master List back to Desktop
-    df.to_csv(master_path, index=False)
-    print(f"🏁 Morning Batch Complete. Sent {count} emails. Master List updated.")
+    if workers == 1:
+        count = run_worker(0, accounts[0], candidates, keys, limit, resume_path, master_path, use_store,
+                           not args.queue_only)
+    else:
+        # Each worker gets its own account, shard of companies and share of the limit
+        print(f"🔀 Sending with {workers} workers across {len(accounts)} account(s).")
+        limits = [limit // workers + (i < limit % workers) for i in range(workers)]
+        jobs = [(i, accounts[i % len(accounts)], part, keys, limits[i], resume_path, master_path, use_store,
+                 not args.queue_only)
+                for i, part in enumerate(shard(candidates, workers))]
+        with multiprocessing.get_context("spawn").Pool(workers) as pool:
+            count = sum(pool.starmap(_worker_process, jobs))
+
+    if use_store:
+        print(f"🏁 Morning Batch Complete. Sent {count} emails. Lead store updated.")
+    else:
+        # Fold the journal back into the Master List once at the end
+        compact_master(master_path)
+        print(f"🏁 Morning Batch Complete. Sent {count} emails. Master List updated.")
 
 if __name__ == "__main__":
-    main()
+    start_run("morning_batch_sender")
+    try:
+        main()
+    finally:
+        finish_run()
@@ -0,0 +1,423 @@
+import os
+import json
+import time
+import sqlite3
+import argparse
+from instrumentation import start_run, finish_run, count, timer
+
+# Persistent outbox: senders render every message up front and enqueue it here
+# (one transaction, no network), and delivery drains the queue separately with
+# retries, exponential backoff and dead-lettering.
+#
+# Every message has a stable ID ("cold:a@b.com", "follow_up:a@b.com:1"), so
+# enqueueing the same message twice is a no-op and a message that was delivered
+# (or dead-lettered) is never queued again. A message is claimed ("sending") only
+# once the rate limits let it go, right before it is handed to the transport; if
+# the process dies mid-send it is dead-lettered as "interrupted" on the next
+# drain rather than sent a second time. A permanent rejection (SMTP 5xx for the
+# address) is not retried: the message dies and its group's next address is queued.
+#
+# States: queued -> sending -> sent | queued (retry later) | dead
+#         standby -> queued (the message ahead of it in its group died) | cancelled
+# A group is one company's fallback addresses: only one is ever live at a time.
+#
+# config.json:
+#   "outbox": {"path": "outbox.db", "max_attempts": 3, "backoff_seconds": 10, "max_backoff_seconds": 900}
+#
+#   python outbox.py status          # queue depth and drain rate
+#   python outbox.py drain           # deliver everything due, for every account
+#   python outbox.py dead            # list dead letters
+#   python outbox.py retry-dead [ID ...]
+
+OUTBOX_PATH = "outbox.db"
+MAX_ATTEMPTS = 3
+BACKOFF_SECONDS = 10
+MAX_BACKOFF_SECONDS = 15 * 60
+STALE_SENDING = 10 * 60 # A "sending" message older than this belongs to a dead process
+BATCH_SIZE = 50
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    grp TEXT,
+    seq INTEGER NOT NULL DEFAULT 0,
+    sender TEXT,
+    recipient TEXT NOT NULL,
+    subject TEXT NOT NULL,
+    body TEXT NOT NULL,
+    attachment_path TEXT,
+    meta TEXT,
+    state TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL,
+    last_error TEXT,
+    enqueued_at REAL NOT NULL,
+    claimed_at REAL,
+    sent_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_outbox_due ON outbox(state, next_attempt_at);
+CREATE INDEX IF NOT EXISTS idx_outbox_grp ON outbox(grp) WHERE grp IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_outbox_sent ON outbox(sent_at) WHERE sent_at IS NOT NULL;
+"""
+
+LIVE_STATES = ("queued", "sending", "sent")
+COLUMNS = "id, kind, grp, recipient, subject, body, attachment_path, meta, attempts"
+
+def message_id(kind, recipient, step=None):
+    return f"{kind}:{recipient}" if step is None else f"{kind}:{recipient}:{step}"
+
+class Outbox:
+    def __init__(self, path=OUTBOX_PATH, max_attempts=MAX_ATTEMPTS, backoff=BACKOFF_SECONDS,
+                 max_backoff=MAX_BACKOFF_SECONDS, clock=time.time):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.clock = clock
+        # Senders and delivery workers share the file; wait for each other's writes
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+    def _insert(self, message, kind, sender, state, group=None, seq=0):
+        cursor = self.conn.execute(
+            "INSERT OR IGNORE INTO outbox (id, kind, grp, seq, sender, recipient, subject, body, attachment_path,"
+            " meta, state, next_attempt_at, enqueued_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (message['id'], kind, group, seq, sender, message['recipient'], message['subject'], message['body'],
+             message.get('attachment_path'), json.dumps(message.get('meta') or {}), state,
+             self.clock(), self.clock()),
+        )
+        return cursor.rowcount
+
+    def enqueue(self, messages, kind, sender=None):
+        # Independent messages (dicts with id, recipient, subject, body,
+        # attachment_path, meta). Returns how many were new.
+        with self.conn:
+            added = sum(self._insert(message, kind, sender, "queued") for message in messages)
+        count("outbox_enqueued", added)
+        return added
+
+    def enqueue_groups(self, groups, kind, sender=None):
+        # {group: [messages]}: the first new message of each group is queued and the
+        # rest wait on standby as its fallbacks. A group that already has a live
+        # message (from this or an earlier run) is left alone. Returns the number
+        # of groups queued.
+        queued = 0
+        with self.conn:
+            for group, messages in groups.items():
+                live = self.conn.execute(
+                    f"SELECT 1 FROM outbox WHERE grp = ? AND state IN ({','.join('?' * len(LIVE_STATES))}) LIMIT 1",
+                    (group,) + LIVE_STATES).fetchone()
+                if live:
+                    continue
+                state = "queued"
+                for seq, message in enumerate(messages):
+                    if self._insert(message, kind, sender, state, group, seq):
+                        state = "standby"
+                queued += state == "standby"
+        count("outbox_enqueued", queued)
+        return queued
+
+    def due(self, sender, limit=BATCH_SIZE):
+        # Due messages of one sender. Nothing is claimed yet: rate limits can hold a
+        # batch for longer than STALE_SENDING, so each message is claimed on its own
+        # when it can go out.
+        rows = self.conn.execute(
+            f"SELECT {COLUMNS} FROM outbox WHERE state = 'queued' AND next_attempt_at <= ? AND sender IS ?"
+            " ORDER BY next_attempt_at LIMIT ?", (self.clock(), sender, limit)).fetchall()
+        names = COLUMNS.split(", ")
+        messages = [dict(zip(names, row)) for row in rows]
+        for message in messages:
+            message['meta'] = json.loads(message['meta'] or "{}")
+        return messages
+
+    def existing_groups(self, groups):
+        # Which of these groups already have messages, in any state
+        found = set()
+        groups = list(groups)
+        for i in range(0, len(groups), 500):
+            chunk = groups[i:i + 500]
+            found.update(grp for (grp,) in self.conn.execute(
+                f"SELECT DISTINCT grp FROM outbox WHERE grp IN ({','.join('?' * len(chunk))})", chunk))
+        return found
+
+    def claim(self, message_id):
+        # Marks a due message "sending"; False if another drain got it first or it
+        # was cancelled or rescheduled in the meantime
+        now = self.clock()
+        with self.conn:
+            return self.conn.execute(
+                "UPDATE outbox SET state = 'sending', claimed_at = ? WHERE id = ? AND state = 'queued'"
+                " AND next_attempt_at <= ?", (now, message_id, now)).rowcount == 1
+
+    def mark_sent(self, message_id):
+        with self.conn:
+            row = self.conn.execute("SELECT grp FROM outbox WHERE id = ?", (message_id,)).fetchone()
+            self.conn.execute("UPDATE outbox SET state = 'sent', sent_at = ?, claimed_at = NULL WHERE id = ?",
+                              (self.clock(), message_id))
+            if row and row[0] is not None:
+                # The company has been reached; its fallbacks are not needed
+                self.conn.execute("UPDATE outbox SET state = 'cancelled' WHERE grp = ? AND state = 'standby'", (row[0],))
+
+    def mark_failed(self, message_id, error, permanent=False):
+        # "retry" (queued again after a backoff), "fallback" (dead; the next
+        # message of its group was queued instead) or "dead". A permanent failure
+        # skips the retries: the same address would only be rejected again.
+        now = self.clock()
+        with self.conn:
+            attempts, group = self.conn.execute(
+                "SELECT attempts + 1, grp FROM outbox WHERE id = ?", (message_id,)).fetchone()
+            if attempts < self.max_attempts and not permanent:
+                delay = min(self.max_backoff, self.backoff * 2 ** (attempts - 1))
+                self.conn.execute(
+                    "UPDATE outbox SET state = 'queued', attempts = ?, next_attempt_at = ?, last_error = ?,"
+                    " claimed_at = NULL WHERE id = ?", (attempts, now + delay, error, message_id))
+                return "retry"
+            self.conn.execute("UPDATE outbox SET state = 'dead', attempts = ?, last_error = ?, claimed_at = NULL"
+                              " WHERE id = ?", (attempts, error, message_id))
+            if group is None:
+                return "dead"
+            promoted = self.conn.execute("""
+                UPDATE outbox SET state = 'queued', next_attempt_at = ?
+                WHERE id = (SELECT id FROM outbox WHERE grp = ? AND state = 'standby' ORDER BY seq LIMIT 1)
+            """, (now, group)).rowcount
+            return "fallback" if promoted else "dead"
+
+    def recover(self, sender):
+        # Dead-letters messages left "sending" by a process that died; they may
+        # have gone out, so they are never retried automatically
+        stale = self.clock() - STALE_SENDING
+        with self.conn:
+            groups = [grp for (grp,) in self.conn.execute(
+                "SELECT grp FROM outbox WHERE state = 'sending' AND claimed_at <= ? AND sender IS ? AND grp IS NOT NULL",
+                (stale, sender))]
+            interrupted = self.conn.execute(
+                "UPDATE outbox SET state = 'dead', last_error = 'interrupted while sending (may have been delivered)',"
+                " claimed_at = NULL WHERE state = 'sending' AND claimed_at <= ? AND sender IS ?",
+                (stale, sender)).rowcount
+            self.conn.executemany("UPDATE outbox SET state = 'cancelled' WHERE grp = ? AND state = 'standby'",
+                                  [(grp,) for grp in groups])
+        count("outbox_interrupted", interrupted)
+        return interrupted
+
+    def cancel_recipient(self, email):
+        # Nothing more goes to this address (it bounced, replied or opted out)
+        with self.conn:
+            return self.conn.execute(
+                "UPDATE outbox SET state = 'cancelled' WHERE recipient = ? COLLATE NOCASE AND state IN ('queued', 'standby')",
+                (email,)).rowcount
+
+    def next_due(self, sender):
+        # When the earliest queued message of sender is due (None if nothing is queued)
+        return self.conn.execute("SELECT MIN(next_attempt_at) FROM outbox WHERE state = 'queued' AND sender IS ?",
+                                 (sender,)).fetchone()[0]
+
+    def depth(self):
+        # {state: messages}; "waiting" are queued messages backing off before a retry
+        counts = dict(self.conn.execute("SELECT state, COUNT(*) FROM outbox GROUP BY state"))
+        counts['waiting'] = self.conn.execute(
+            "SELECT COUNT(*) FROM outbox WHERE state = 'queued' AND next_attempt_at > ?", (self.clock(),)).fetchone()[0]
+        return counts
+
+    def drain_rate(self, window=3600):
+        # Messages delivered per minute over the last `window` seconds
+        sent = self.conn.execute("SELECT COUNT(*) FROM outbox WHERE sent_at >= ?",
+                                 (self.clock() - window,)).fetchone()[0]
+        return sent * 60 / window
+
+    def dead(self):
+        return self.conn.execute(
+            "SELECT id, attempts, last_error FROM outbox WHERE state = 'dead' ORDER BY enqueued_at").fetchall()
+
+    def retry_dead(self, ids=None):
+        # Puts dead letters (all, or just ids) back in the queue with fresh attempts
+        sql = "UPDATE outbox SET state = 'queued', attempts = 0, next_attempt_at = ? WHERE state = 'dead'"
+        with self.conn:
+            if ids is None:
+                return self.conn.execute(sql, (self.clock(),)).rowcount
+            return sum(self.conn.execute(sql + " AND id = ?", (self.clock(), i)).rowcount for i in ids)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class DeliveryRecorder:
+    # Records a delivered message wherever its kind belongs: suppression, the
+    # send ledger (follow-up schedule) and, for cold emails, the lead's status via
+    # mark_sent(email) (default: the lead store, or the master list's journal).
+    # An address the server rejected outright is recorded like a bounce:
+    # suppressed, and a cold lead marked BOUNCED via mark_bounced(email), so its
+    # company isn't picked again run after run.
+    def __init__(self, suppression, ledger, mark_sent=None, mark_bounced=None):
+        self.suppression = suppression
+        self.ledger = ledger
+        self.mark_sent = mark_sent or (lambda email: self._mark_status(email, 'SENT'))
+        self.mark_bounced = mark_bounced or (lambda email: self._mark_status(email, 'BOUNCED'))
+        self._store = None
+
+    def _mark_status(self, email, status):
+        from lead_store import store_enabled, open_store
+        from master_list import MASTER_PATH, record_status
+        if store_enabled():
+            self._store = self._store or open_store()
+            self._store.mark_status(email, status)
+        else:
+            record_status(MASTER_PATH, email, status)
+
+    def sent(self, message):
+        email = message['recipient']
+        if message['kind'] == "follow_up":
+            self.suppression.add('followed_up', email)
+            self.ledger.record_followup(email, message['meta']['step'])
+            return
+        self.suppression.add('sent', email)
+        self.ledger.record_send(email)
+        if message['kind'] == "cold":
+            self.mark_sent(email)
+
+    def failed(self, message, outcome):
+        if message.get('permanent'):
+            self.suppression.add('bounced', message['recipient'])
+            if message['kind'] == "cold":
+                self.mark_bounced(message['recipient'])
+        if outcome == "dead" and message['kind'] == "follow_up":
+            # Gave up on this follow-up; don't keep it due forever
+            self.ledger.cancel(message['recipient'])
+
+    def close(self):
+        if self._store:
+            self._store.close()
+
+
+def drain(outbox, config, on_sent=None, on_failed=None, wait=True, batch_size=BATCH_SIZE):
+    # Delivers the due messages of this account (config["email"]) through its
+    # transport and rate limits. With wait, sleeps through retry backoffs until
+    # nothing is queued; otherwise stops once nothing is due. on_failed(message,
+    # outcome) finds the failure in message['error'] and message['permanent'].
+    # Returns stats.
+    from transport import get_transport
+    from send_engine import SendEngine
+
+    sender = config.get('email')
+    stats = {"sent": 0, "retried": 0, "dead": 0, "interrupted": outbox.recover(sender)}
+    if stats["interrupted"]:
+        print(f"⚠️  {stats['interrupted']} messages were interrupted mid-send earlier; dead-lettered, not resent.")
+
+    def on_result(message, ok):
+        if ok:
+            outbox.mark_sent(message['id'])
+            stats["sent"] += 1
+            count("outbox_sent")
+            if on_sent:
+                on_sent(message)
+            return
+        # Transports return False, or a falsy SendFailure saying why
+        message['error'] = getattr(ok, "error", "transport reported a failure")
+        message['permanent'] = getattr(ok, "permanent", False)
+        outcome = outbox.mark_failed(message['id'], message['error'], message['permanent'])
+        stats["retried" if outcome == "retry" else "dead"] += 1
+        count("outbox_retries" if outcome == "retry" else "outbox_dead")
+        if on_failed:
+            on_failed(message, outcome)
+
+    start = time.perf_counter()
+    transport = None
+    try:
+        while True:
+            batch = outbox.due(sender, batch_size)
+            if not batch:
+                due = outbox.next_due(sender) if wait else None
+                if due is None:
+                    break
+                time.sleep(max(0.0, due - outbox.clock()))
+                continue
+            if transport is None:
+                transport = get_transport(config)
+                engine = SendEngine(transport, config)
+            with timer("outbox_drain"):
+                engine.send_all(batch, on_result, lambda message: outbox.claim(message['id']))
+    finally:
+        if transport is not None:
+            transport.close()
+    stats["seconds"] = time.perf_counter() - start
+    return stats
+
+def print_report(outbox, stats=None):
+    depth = outbox.depth()
+    if stats and stats["seconds"]:
+        print(f"📊 Drained {stats['sent']} messages in {stats['seconds']:.1f}s "
+              f"({stats['sent'] * 60 / stats['seconds']:.1f}/min); {stats['retried']} to retry, {stats['dead']} dead.")
+    print(f"📊 Outbox: {depth.get('queued', 0)} queued ({depth['waiting']} backing off), "
+          f"{depth.get('standby', 0)} fallbacks on standby, {depth.get('dead', 0)} dead, "
+          f"{depth.get('sent', 0)} sent; last hour {outbox.drain_rate():.1f}/min.")
+
+def open_outbox(config=None, path=None):
+    settings = (config or {}).get('outbox', {})
+    return Outbox(
+        path or settings.get('path', OUTBOX_PATH),
+        settings.get('max_attempts', MAX_ATTEMPTS),
+        settings.get('backoff_seconds', BACKOFF_SECONDS),
+        settings.get('max_backoff_seconds', MAX_BACKOFF_SECONDS),
+    )
+
+def _load_config():
+    if not os.path.exists('config.json'):
+        return {}
+    with open('config.json', 'r') as f:
+        return json.load(f)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Outbox status and delivery worker.")
+    parser.add_argument("command", choices=("status", "drain", "dead", "retry-dead"))
+    parser.add_argument("ids", nargs="*", help="Message IDs for retry-dead (default: all).")
+    parser.add_argument("--no-wait", action="store_true", help="drain: stop when nothing is due instead of waiting out backoffs.")
+    args = parser.parse_args(argv)
+    config = _load_config()
+
+    with open_outbox(config) as outbox:
+        if args.command == "status":
+            print_report(outbox)
+        elif args.command == "dead":
+            for message, attempts, error in outbox.dead():
+                print(f"   {message} ({attempts} attempts): {error}")
+        elif args.command == "retry-dead":
+            print(f"🔁 Requeued {outbox.retry_dead(args.ids or None)} dead messages.")
+        else:
+            from suppression import open_suppression
+            from send_ledger import open_send_ledger
+            from morning_batch_sender import load_accounts
+
+            suppression = open_suppression()
+            ledger = open_send_ledger(config, suppression=suppression)
+            recorder = DeliveryRecorder(suppression, ledger)
+
+            def on_sent(message):
+                print(f"📧 {message['recipient']} ({message['kind']}) ✅ Sent")
+                recorder.sent(message)
+
+            def on_failed(message, outcome):
+                print(f"📧 {message['recipient']} ({message['kind']}) ❌ Failed ({outcome})")
+                recorder.failed(message, outcome)
+
+            try:
+                # Each account delivers the messages rendered for it
+                for account in load_accounts(config):
+                    print_report(outbox, drain(outbox, account, on_sent, on_failed, wait=not args.no_wait))
+            finally:
+                recorder.close()
+                suppression.close()
+                ledger.close()
+
+if __name__ == "__main__":
+    start_run("outbox")
+    try:
+        main()
+    finally:
+        finish_run()
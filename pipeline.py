@@ -0,0 +1,189 @@
+import os
+import json
+import time
+import argparse
+from datetime import datetime
+
+from master_list import (
+    MASTER_PATH, read_master, write_master, apply_journal,
+    read_journal, drop_folded, record_status, master_file,
+)
+from lead_store import store_enabled
+from instrumentation import start_run, finish_run, timer
+
+# The daily run as one process: fetch -> clean -> prioritize -> send over a
+# single in-memory lead table. The master list is read once and written once at
+# the end (or after every stage with --checkpoint), instead of each script
+# re-reading and rewriting it.
+#
+#   python pipeline.py                          # all stages
+#   python pipeline.py --stages clean,prioritize
+#   python pipeline.py --limit 20 --checkpoint
+#
+# Sends are still journaled one by one (crash-safe), exactly as in
+# morning_batch_sender, and folded in by the final write.
+
+STAGES = ("fetch", "clean", "prioritize", "send")
+
+def load_config():
+    if not os.path.exists('config.json'):
+        return {}
+    with open('config.json', 'r') as f:
+        return json.load(f)
+
+class Pipeline:
+    def __init__(self, path=MASTER_PATH, config=None, limit=30, checkpoint=False, backup_path=None):
+        self.path = path
+        self.config = config or {}
+        self.limit = limit
+        self.checkpoint = checkpoint
+        # Master_Outreach_List.csv -> Master_Outreach_List_backup.csv, as clean_master_list
+        # does (.arrow -> _backup.arrow for a columnar list)
+        stem, ext = os.path.splitext(master_file(path))
+        self.backup_path = backup_path or stem + "_backup" + ext
+        self.df = None
+        self.dirty = False
+        self.timings = {}
+        self.tracker = None # Set by fetch, committed once the new leads are saved
+
+    def load(self):
+        import pandas as pd
+        if os.path.exists(master_file(self.path)):
+            print(f"🔄 Reading {master_file(self.path)}...")
+            self.df = read_master(self.path)
+        else:
+            self.df = pd.DataFrame(columns=["Email", "Company", "Job/Role", "Status", "Key Tools", "Job Focus/Needs"])
+        print(f"📊 {len(self.df)} leads loaded.")
+
+    def fetch(self):
+        import pandas as pd
+        from fetch_new_leads import gather_candidates, build_new_leads
+        from readme_parser import ReadmeTracker
+        self.tracker = ReadmeTracker()
+        candidates = gather_candidates(self.tracker)
+        new_leads = build_new_leads(candidates, set(self.df['Email'].dropna()))
+        if not new_leads:
+            print("⏭️ No new unique leads found today.")
+            return
+        self.df = pd.concat([self.df, pd.DataFrame(new_leads)], ignore_index=True)
+        self.dirty = True
+        print(f"✅ Added {len(new_leads)} potential new leads.")
+
+    def clean(self):
+        from clean_master_list import clean_frame, make_backup
+        from cleaning_rules import print_report
+        if os.path.exists(master_file(self.path)):
+            # The final write renames a new file over the list, so a hardlink is a free backup
+            make_backup(master_file(self.path), self.backup_path)
+            print(f"💾 Backup created at {self.backup_path}")
+        initial_count = len(self.df)
+        self.df, report = clean_frame(self.df)
+        self.dirty = self.dirty or len(self.df) != initial_count
+        print(f"✅ Cleanup Complete! Removed {initial_count - len(self.df)} of {initial_count}.")
+        print_report(report)
+
+    def prioritize(self):
+        from prioritize_leads import sort_by_priority
+        from lead_scoring import LeadScorer, load_tiers
+        self.df = sort_by_priority(self.df, LeadScorer(load_tiers(self.config)))
+        self.dirty = True
+        print(f"✅ Sorted {len(self.df)} leads.")
+
+    def send(self):
+        from morning_batch_sender import collect_candidates, send_batch
+        from suppression import open_suppression
+        from send_ledger import open_send_ledger
+        from company_resolver import open_company_resolver
+
+        if 'resume_filename' not in self.config:
+            print("❌ config.json not found or has no resume_filename; skipping send.")
+            return
+        resume_path = os.path.abspath(self.config['resume_filename'])
+        if not os.path.exists(resume_path):
+            print(f"❌ Resume not found at {resume_path}; skipping send.")
+            return
+
+        suppression = open_suppression()
+        ledger = open_send_ledger(self.config, suppression=suppression)
+        with open_company_resolver() as resolver:
+            contacted_companies, candidates = collect_candidates(self.df, suppression, n=self.limit * 2, resolver=resolver)
+            keys = resolver.resolve_many(list(candidates))
+        print(f"🚀 Starting Morning Batch Outreach (Limit: {self.limit})...")
+        print(f"ℹ️  Found {len(contacted_companies)} companies already contacted. Enforcing 1-email-per-company rule.")
+
+        updates = {}
+        def mark_sent(email):
+            when = datetime.now().isoformat(timespec='seconds')
+            record_status(self.path, email, 'SENT', when)
+            updates[email] = ('SENT', when)
+
+        try:
+            count = send_batch(self.config, candidates, self.limit, resume_path, suppression, ledger, mark_sent, keys)
+        finally:
+            suppression.close()
+            ledger.close()
+            if updates:
+                self.df = apply_journal(self.df, updates)
+                self.dirty = True
+        print(f"🏁 Sent {count} emails.")
+
+    def persist(self):
+        # Also folds in journal lines appended by anything else while we ran
+        updates, folded = read_journal(self.path)
+        if not self.dirty and not updates:
+            return
+        with timer("persist"):
+            write_master(apply_journal(self.df, updates), self.path)
+            drop_folded(self.path, folded)
+        self.dirty = False
+        print(f"💾 Master List saved to {master_file(self.path)}")
+        if self.tracker:
+            # New leads are on disk; don't parse those README rows again
+            self.tracker.commit()
+            self.tracker = None
+
+    def run(self, stages=STAGES):
+        total = time.perf_counter()
+        for name in ("load",) + tuple(stages) + (() if self.checkpoint else ("persist",)):
+            start = time.perf_counter()
+            with timer(f"stage_{name}"):
+                getattr(self, name)()
+                if self.checkpoint and name in STAGES:
+                    self.persist()
+            self.timings[name] = time.perf_counter() - start
+        self.timings["total"] = time.perf_counter() - total
+        return self.timings
+
+def print_timings(timings):
+    print("\n⏱️  Stage timings:")
+    for name, seconds in timings.items():
+        print(f"   {name:<11} {seconds:>8.2f}s")
+
+def main():
+    parser = argparse.ArgumentParser(description="Run fetch, clean, prioritize and send over one in-memory lead list.")
+    parser.add_argument("--stages", default=",".join(STAGES), help=f"Comma-separated subset of: {', '.join(STAGES)}.")
+    parser.add_argument("--limit", type=int, default=30, help="Number of emails to send.")
+    parser.add_argument("--checkpoint", action="store_true", help="Save the list after every stage.")
+    parser.add_argument("--path", default=MASTER_PATH, help="Master list (CSV, .arrow or .parquet).")
+    args = parser.parse_args()
+
+    stages = [s.strip() for s in args.stages.split(",") if s.strip()]
+    unknown = [s for s in stages if s not in STAGES]
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(unknown)}")
+    # Always run in pipeline order, whatever order they were given in
+    stages = [s for s in STAGES if s in stages]
+
+    if store_enabled():
+        print("ℹ️  The lead store is in use; each script already updates it in place. Run them directly.")
+        return
+
+    pipeline = Pipeline(args.path, load_config(), args.limit, args.checkpoint)
+    print_timings(pipeline.run(stages))
+
+if __name__ == "__main__":
+    start_run("pipeline")
+    try:
+        main()
+    finally:
+        finish_run()
@@ -1,69 +1,128 @@
-import pandas as pd
 import os
+import json
+import argparse
+from lead_scoring import LeadScorer, load_tiers, is_pending, top_candidates
+from master_list import (
+    CONTACTED_STATUSES, read_master, write_master, compact_master,
+    is_columnar, master_file, take_master, reorder_master,
+)
+from lead_store import LEAD_DB_PATH, store_enabled, open_store
+from instrumentation import start_run, finish_run, timer
 
 MASTER_PATH = "/Users/vr/Desktop/Master_Outreach_List.csv"
+NEXT_BATCH_PATH = "/Users/vr/Desktop/Next_Batch.csv"
+# All that scoring and ranking look at
+SCORE_COLUMNS = ['Company', 'Status']
+
+def load_config():
+    # Optional here: only used for custom "scoring_tiers"
+    if not os.path.exists('config.json'):
+        return {}
+    with open('config.json', 'r') as f:
+        return json.load(f)
+
+_default_scorer = None
 
 def get_relevance_score(company_name):
-    if not isinstance(company_name, str):
-        return 0
-        
-    company_name = company_name.lower()
-    
-    # Tier 1: User's specific high-value targets (Finance & Healthcare)
-    tier_1_keywords = [
-        "health", "pharma", "medical", "care", "clinic", "hospital", "therapeutics",
-        "bank", "financial", "capital", "insurance", "wealth", "asset", "invest", "credit", "finance"
-    ]
-    
-    # Tier 2: Tech & Data (General Good Matches)
-    tier_2_keywords = [
-        "tech", "data", "analytics", "systems", "solutions", "software", "digital", "consulting", "group"
-    ]
-    
-    score = 0
-    for kw in tier_1_keywords:
-        if kw in company_name:
-            score += 10 # High weight for target sectors
-            break # Count once per tier
-            
-    for kw in tier_2_keywords:
-        if kw in company_name:
-            score += 5
-            break
-            
-    return score
+    # Scalar helper kept for one-off checks; bulk scoring uses LeadScorer.score
+    global _default_scorer
+    if _default_scorer is None:
+        _default_scorer = LeadScorer(load_tiers(load_config()))
+    return _default_scorer.score_one(company_name)
+
+def write_next_batch(df, k, scorer, path=None):
+    # Top-K mode: store only the next k send candidates (partial sort), leaving
+    # the master list untouched. With a path, df only holds SCORE_COLUMNS and
+    # the chosen rows are fetched whole from the list.
+    contacted = set(df.loc[df['Status'].isin(CONTACTED_STATUSES), 'Company'].unique())
+    with timer("score"):
+        top = top_candidates(df, k, scorer, exclude_companies=contacted)
+    if path is None:
+        top = top.drop(columns=['Relevance_Score'])
+    else:
+        top = take_master(df.index.get_indexer(top.index), path)
+    top.to_csv(NEXT_BATCH_PATH, index=False)
+    print(f"✅ Wrote the next {len(top)} send candidates to {NEXT_BATCH_PATH}.")
+
+def prioritize_store(scorer):
+    # With the lead store, scores go into the indexed priority_score column and
+    # the send query orders by it, so nothing needs to be re-sorted or rewritten.
+    with open_store() as store:
+        df = store.to_frame(['Email', 'Company'])
+        print("Calculating relevance scores...")
+        with timer("score"):
+            scores = scorer.score(df['Company'])
+        store.set_priority_scores(zip(df['Email'], scores))
+    print(f"✅ Scored {len(df)} leads in {LEAD_DB_PATH}.")
+
+def priority_order(df, scorer):
+    # Row positions in send order; only SCORE_COLUMNS are used
+    import pandas as pd
+    company = df['Company'].reset_index(drop=True)
+    if isinstance(company.dtype, pd.CategoricalDtype):
+        # Categoricals sort by category order; make that A-Z
+        company = company.cat.reorder_categories(company.cat.categories.sort_values())
+    # Temporary columns for sorting
+    with timer("score"):
+        ranked = pd.DataFrame({
+            # 'Pending' comes first (0), 'SENT' comes last (1)
+            'Status_Rank': (~is_pending(df['Status'])).astype(int).to_numpy(),
+            'Relevance_Score': scorer.score(company).to_numpy(),
+            'Company': company,
+        })
+    # Sort by: Status (Pending first) -> Score (High to Low) -> Company Name (A-Z)
+    with timer("sort"):
+        ranked = ranked.sort_values(
+            by=['Status_Rank', 'Relevance_Score', 'Company'], 
+            ascending=[True, False, True]
+        )
+    return ranked.index.to_numpy()
+
+def sort_by_priority(df, scorer):
+    return df.iloc[priority_order(df, scorer)]
 
 def main():
-    if not os.path.exists(MASTER_PATH):
+    parser = argparse.ArgumentParser(description="Score leads and put the best ones first in line.")
+    parser.add_argument("--top", type=int, default=None, help="Only write the next N send candidates to Next_Batch.csv.")
+    args = parser.parse_args()
+
+    scorer = LeadScorer(load_tiers(load_config()))
+
+    if store_enabled():
+        prioritize_store(scorer)
+        return
+
+    if not os.path.exists(master_file(MASTER_PATH)):
         print("Master list not found.")
         return
 
-    print("reading csv...")
+    # A columnar list is scored from SCORE_COLUMNS alone; the other columns are
+    # only touched to move (or fetch) rows, in Arrow
+    columnar = is_columnar(MASTER_PATH)
+    print("reading master list...")
     try:
-        df = pd.read_csv(MASTER_PATH, on_bad_lines='skip')
+        if args.top is None:
+            compact_master(MASTER_PATH) # Full rewrite below anyway
+        df = read_master(MASTER_PATH, columns=SCORE_COLUMNS if columnar else None)
     except Exception as e:
-        print(f"Error reading CSV: {e}")
+        print(f"Error reading master list: {e}")
         return
     
+    if args.top is not None:
+        write_next_batch(df, args.top, scorer, MASTER_PATH if columnar else None)
+        return
+
     print("Calculating relevance scores...")
-    # Create a temporary column for sorting
-    df['Relevance_Score'] = df['Company'].apply(get_relevance_score)
-    
-    # Sort logic:
-    # 1. Status 'Pending' comes first (0), 'SENT' comes last (1)
-    df['Status_Rank'] = df['Status'].apply(lambda x: 0 if str(x).lower().strip() == 'pending' else 1)
-    
-    # Sort by: Status (Pending first) -> Score (High to Low) -> Company Name (A-Z)
-    df_sorted = df.sort_values(
-        by=['Status_Rank', 'Relevance_Score', 'Company'], 
-        ascending=[True, False, True]
-    )
-    
-    # Drop temp columns
-    df_sorted = df_sorted.drop(columns=['Relevance_Score', 'Status_Rank'])
-    
-    df_sorted.to_csv(MASTER_PATH, index=False)
-    print(f"✅ Sorted {len(df_sorted)} leads. Top Finance/Healthcare leads are now first in line.")
+    order = priority_order(df, scorer)
+    if columnar:
+        reorder_master(order, MASTER_PATH)
+    else:
+        write_master(df.iloc[order], MASTER_PATH)
+    print(f"✅ Sorted {len(df)} leads. Top Finance/Healthcare leads are now first in line.")
 
 if __name__ == "__main__":
-    main()
+    start_run("prioritize_leads")
+    try:
+        main()
+    finally:
+        finish_run()
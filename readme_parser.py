@@ -0,0 +1,170 @@
+import os
+import re
+import hashlib
+from collections import Counter
+
+# Company names from the job tables in GitHub READMEs, incrementally.
+#
+# TableParser is a streaming markdown-table parser: it is fed one line at a time,
+# learns each table's header (so it knows which column is "Company") and yields
+# the company cell of each data row. It understands the formats the tracked
+# lists use: **[Company](link)**, **Company**, <a href=..><strong>Company</strong></a>,
+# and "↳" rows (another role at the company above).
+#
+# ReadmeTracker keeps the last processed version of each README. A new version
+# is diffed against it line by line, only the added table rows are parsed, and
+# only companies never seen before are returned. Nothing is saved until
+# commit(), so a run that dies before its leads are stored is simply redone.
+
+README_STATE_DIR = ".readme_state"
+SEEN_FILE = "companies.txt"
+RETRY_FILE = "retry.txt"
+
+SAME_AS_ABOVE = ("↳", "")
+NOT_COMPANIES = {"company", "---", "-"}
+
+_LINK = re.compile(r'!?\[([^\]]*)\]\([^)]*\)')
+_TAG = re.compile(r'<[^>]*>')
+_SEPARATOR_CELL = re.compile(r'^:?-+:?$')
+
+def split_row(line):
+    # "| a | b \| c |" -> ["a", "b | c"]; None if the line is not a table row
+    line = line.strip()
+    if not line.startswith("|"):
+        return None
+    inner = line[1:-1] if line.endswith("|") and len(line) > 1 else line[1:]
+    if "\\|" not in inner:
+        return [cell.strip() for cell in inner.split("|")]
+    return [cell.strip().replace("\\|", "|") for cell in re.split(r'(?<!\\)\|', inner)]
+
+def cell_text(cell):
+    # Markdown/HTML cell -> plain text
+    text = _LINK.sub(r'\1', cell)
+    text = _TAG.sub('', text)
+    text = text.replace("**", "").replace("__", "").replace("&amp;", "&")
+    return text.strip(" *_`")
+
+class TableParser:
+    def __init__(self):
+        self.company_col = None # Set while inside a table body
+        self._header = None
+
+    def feed(self, line, emit=True):
+        # Returns the company of a data row (if emit), else None
+        if not emit and self.company_col is not None and line.lstrip().startswith("|"):
+            return None # Another body row of the current table; nothing to learn
+        cells = split_row(line)
+        if cells is None:
+            self.company_col = self._header = None
+            return None
+        if all(_SEPARATOR_CELL.match(cell) for cell in cells if cell):
+            # The row above was the header
+            names = [cell_text(cell).lower() for cell in self._header or []]
+            self.company_col = next((i for i, name in enumerate(names) if "company" in name), 0)
+            return None
+        if self.company_col is None:
+            self._header = cells
+            return None
+        if not emit or self.company_col >= len(cells):
+            return None
+        company = cell_text(cells[self.company_col])
+        if company in SAME_AS_ABOVE or company.lower() in NOT_COMPANIES:
+            return None
+        return company
+
+def table_companies(lines, rows=None):
+    # Companies in table rows, in order and deduplicated. With rows (a set of line
+    # numbers) only those rows are parsed; the rest just keep the header state.
+    parser = TableParser()
+    companies = {}
+    for number, line in enumerate(lines):
+        company = parser.feed(line, emit=rows is None or number in rows)
+        if company:
+            companies.setdefault(company, None)
+    return list(companies)
+
+def parse_readme_companies(content):
+    # Full parse of one README
+    return sorted(table_companies(content.splitlines()))
+
+def added_lines(old_lines, new_lines):
+    # Line numbers in new_lines that are not in old_lines. Moved lines count as
+    # unchanged and a line repeated more often than before counts as added.
+    remaining = Counter(old_lines)
+    added = set()
+    for number, line in enumerate(new_lines):
+        if remaining[line]:
+            remaining[line] -= 1
+        else:
+            added.add(number)
+    return added
+
+class ReadmeTracker:
+    def __init__(self, state_dir=README_STATE_DIR):
+        self.state_dir = state_dir
+        self.seen = self._read_set(SEEN_FILE)
+        self.retry = self._read_set(RETRY_FILE)
+        self._texts = {}
+        self._new = set()
+        self._deferred = set()
+
+    def _path(self, name):
+        return os.path.join(self.state_dir, name)
+
+    def _read_set(self, name):
+        if not os.path.exists(self._path(name)):
+            return set()
+        with open(self._path(name), "r") as f:
+            return {line.rstrip("\n") for line in f if line.strip()}
+
+    def _text_file(self, url):
+        return hashlib.sha256(url.encode()).hexdigest() + ".md"
+
+    def last_version(self, url):
+        path = self._path(self._text_file(url))
+        if not os.path.exists(path):
+            return ""
+        with open(path, "r") as f:
+            return f.read()
+
+    def new_companies(self, url, text):
+        # Companies in rows added since the last committed version of url that
+        # have never been seen in any source
+        old_lines, new_lines = self.last_version(url).splitlines(), text.splitlines()
+        rows = added_lines(old_lines, new_lines)
+        companies = [c for c in table_companies(new_lines, rows) if c not in self.seen]
+        self._texts[url] = text
+        self._new.update(companies)
+        return companies
+
+    def defer(self, companies):
+        # Couldn't be processed this run (e.g. DNS lookup failed); offered again next run
+        self._deferred.update(companies)
+
+    def commit(self):
+        os.makedirs(self.state_dir, exist_ok=True)
+        for url, text in self._texts.items():
+            path = self._path(self._text_file(url))
+            with open(path + ".tmp", "w") as f:
+                f.write(text)
+            os.replace(path + ".tmp", path)
+        done = (self._new | self.retry) - self._deferred - self.seen
+        if done:
+            with open(self._path(SEEN_FILE), "a") as f:
+                f.writelines(f"{company}\n" for company in sorted(done))
+        with open(self._path(RETRY_FILE) + ".tmp", "w") as f:
+            f.writelines(f"{company}\n" for company in sorted(self._deferred))
+        os.replace(self._path(RETRY_FILE) + ".tmp", self._path(RETRY_FILE))
+        self.seen |= done
+        self.retry = set(self._deferred)
+        self._texts, self._new, self._deferred = {}, set(), set()
+
+if __name__ == "__main__":
+    import sys
+    # python readme_parser.py README.md  -> companies in its job tables
+    for path in sys.argv[1:]:
+        with open(path, "r") as f:
+            companies = parse_readme_companies(f.read())
+        print(f"📊 {path}: {len(companies)} companies")
+        for company in companies:
+            print(f"   {company}")
@@ -0,0 +1,137 @@
+import time
+import asyncio
+import itertools
+from instrumentation import timer, count, current
+
+# Concurrent send engine.
+# Instead of a global time.sleep(delay_seconds) after every message, each
+# recipient domain gets its own token bucket (so one company is never hit
+# faster than its limit) while different domains are sent to in parallel,
+# under an optional global bucket and a max in-flight cap.
+#
+# config.json:
+#   "rate_limits": {
+#       "per_domain_per_minute": 2,
+#       "global_per_minute": 60,
+#       "burst": 1,
+#       "max_in_flight": 4
+#   }
+# Without "rate_limits", each domain is limited to one message per
+# delay_seconds and there is no global limit beyond max_in_flight.
+
+class TokenBucket:
+    def __init__(self, rate, burst=1, clock=time.monotonic):
+        self.rate = rate # tokens per second
+        self.capacity = max(1, burst)
+        self.tokens = self.capacity
+        self.clock = clock
+        self.updated = clock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        while True:
+            self._refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            wait = (1 - self.tokens) / self.rate
+            current().add_time("sleep", wait) # Time spent rate limited (concurrent waits overlap)
+            await asyncio.sleep(wait)
+
+    def refund(self):
+        # A failed send gives its slot back
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + 1)
+
+
+def get_domain(email):
+    return email.rsplit('@', 1)[-1].lower()
+
+def load_rate_limits(config):
+    limits = dict(config.get('rate_limits', {}))
+    if 'per_domain_per_minute' not in limits:
+        delay = config.get('delay_seconds', 5) or 0
+        limits['per_domain_per_minute'] = 60 / delay if delay else None
+    limits.setdefault('global_per_minute', None)
+    limits.setdefault('burst', 1)
+    limits.setdefault('max_in_flight', 4)
+    return limits
+
+class SendEngine:
+    def __init__(self, transport, config):
+        self.transport = transport
+        self.limits = load_rate_limits(config)
+        self.domain_buckets = {}
+        rate = self.limits['global_per_minute']
+        self.global_bucket = TokenBucket(rate / 60, self.limits['burst']) if rate else None
+
+    def _domain_bucket(self, domain):
+        rate = self.limits['per_domain_per_minute']
+        if not rate:
+            return None
+        if domain not in self.domain_buckets:
+            self.domain_buckets[domain] = TokenBucket(rate / 60, self.limits['burst'])
+        return self.domain_buckets[domain]
+
+    def _refund(self, domain_bucket):
+        if domain_bucket:
+            domain_bucket.refund()
+        if self.global_bucket:
+            self.global_bucket.refund()
+
+    async def _send_one(self, job, in_flight, on_result, claim):
+        domain_bucket = self._domain_bucket(get_domain(job['recipient']))
+        async with in_flight:
+            # Tokens are taken inside the slot, right before the send: taken while
+            # queueing for a slot, a domain's jobs would bank them and then go out
+            # back to back once slots free up
+            if domain_bucket:
+                await domain_bucket.acquire()
+            if self.global_bucket:
+                await self.global_bucket.acquire()
+            if claim and not claim(job):
+                # Taken (or cancelled) elsewhere while it waited for its slot
+                self._refund(domain_bucket)
+                count("sends_skipped")
+                return None
+            with timer("transport_send", histogram=True):
+                ok = await asyncio.to_thread(
+                    self.transport.send, job['recipient'], job['subject'], job['body'], job.get('attachment_path')
+                )
+        count("sends_ok" if ok else "sends_failed")
+
+        if not ok:
+            self._refund(domain_bucket)
+        if on_result:
+            on_result(job, ok)
+        return ok
+
+    async def run(self, jobs, on_result=None, claim=None):
+        in_flight = asyncio.Semaphore(self.limits['max_in_flight'])
+        # Slots are handed out in start order, so start the jobs round-robin across
+        # domains: a slot waiting on one domain's limit then rarely holds up the others
+        by_domain = {}
+        for i, job in enumerate(jobs):
+            by_domain.setdefault(get_domain(job['recipient']), []).append(i)
+        order = [i for turn in itertools.zip_longest(*by_domain.values()) for i in turn if i is not None]
+        results = await asyncio.gather(*(self._send_one(jobs[i], in_flight, on_result, claim) for i in order))
+        ordered = [None] * len(jobs)
+        for i, result in zip(order, results):
+            ordered[i] = result
+        return ordered
+
+    def send_all(self, jobs, on_result=None, claim=None):
+        # jobs: dicts with recipient, subject, body, attachment_path (+ any extra keys).
+        # on_result(job, ok) runs on the event loop thread, so callers can log without locks.
+        # claim(job), if given, runs on that thread once the rate limits let the job go;
+        # a job it returns False for is skipped (None in the results, no on_result).
+        # Returns a list of results in job order. Buckets carry over between calls.
+        return asyncio.run(self.run(jobs, on_result, claim))
+
+
+def send_all(transport, jobs, config, on_result=None):
+    return SendEngine(transport, config).send_all(jobs, on_result)
@@ -0,0 +1,204 @@
+import os
+import sys
+import time
+import sqlite3
+
+# Timestamped send ledger + follow-up scheduler.
+# Every cold send is recorded with its send time and the time its next
+# follow-up is due. due_at is indexed, so a run only touches rows that are due
+# now (O(due)), however many emails were ever sent.
+#
+# config.json:
+#   "follow_up_days": [4, 10]   # follow-up #1 on day 4, #2 on day 10 after the cold email
+#   "follow_up_cap": 30         # max follow-ups per run
+
+SEND_LEDGER_PATH = "send_ledger.db"
+DEFAULT_CADENCE_DAYS = (4, 10)
+DAY = 86400
+LEASE_TTL = 15 * 60 # A crashed worker's companies are up for grabs again after this
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sends (
+    email TEXT PRIMARY KEY,
+    sent_at REAL NOT NULL,
+    step INTEGER NOT NULL DEFAULT 0,
+    due_at REAL,
+    last_followup_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_sends_due ON sends(due_at) WHERE due_at IS NOT NULL;
+CREATE TABLE IF NOT EXISTS leases (
+    key TEXT PRIMARY KEY,
+    worker TEXT NOT NULL,
+    expires_at REAL,
+    email TEXT
+);
+"""
+
+class SendLedger:
+    def __init__(self, path=SEND_LEDGER_PATH, cadence_days=DEFAULT_CADENCE_DAYS, clock=time.time):
+        self.path = path
+        self.cadence = [float(d) * DAY for d in cadence_days]
+        self.clock = clock
+        # Several sending processes can share the file; wait for each other's writes
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+    def _due_at(self, sent_at, step):
+        # When follow-up number `step + 1` is due, or None once the cadence is done
+        return sent_at + self.cadence[step] if step < len(self.cadence) else None
+
+    def record_send(self, email, when=None):
+        when = self.clock() if when is None else when
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR IGNORE INTO sends (email, sent_at, step, due_at) VALUES (?, ?, 0, ?)",
+                (email, when, self._due_at(when, 0)),
+            )
+
+    def due(self, limit=None):
+        # [(email, step)] due now, oldest first; step is the number of follow-ups already sent
+        sql = "SELECT email, step FROM sends WHERE due_at IS NOT NULL AND due_at <= ? ORDER BY due_at"
+        params = [self.clock()]
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return self.conn.execute(sql, params).fetchall()
+
+    def due_count(self):
+        return self.conn.execute(
+            "SELECT COUNT(*) FROM sends WHERE due_at IS NOT NULL AND due_at <= ?", (self.clock(),)
+        ).fetchone()[0]
+
+    def record_followup(self, email, step):
+        # Advance to the next cadence step (or finish) after follow-up `step + 1` went out
+        now = self.clock()
+        row = self.conn.execute("SELECT sent_at FROM sends WHERE email = ?", (email,)).fetchone()
+        if row is None:
+            return
+        with self.conn:
+            self.conn.execute(
+                "UPDATE sends SET step = ?, due_at = ?, last_followup_at = ? WHERE email = ?",
+                (step + 1, self._due_at(row[0], step + 1), now, email),
+            )
+
+    def cancel(self, email):
+        # No more follow-ups (bounced, replied, opted out)
+        with self.conn:
+            self.conn.execute("UPDATE sends SET due_at = NULL WHERE email = ?", (email,))
+
+    def import_legacy(self, sent_emails, followed_up=(), sent_at=None):
+        # Seed from the old text ledgers. They carry no timestamps, so every
+        # address gets the same conservative send time (e.g. the file's mtime).
+        sent_at = self.clock() if sent_at is None else sent_at
+        followed = set(followed_up)
+        rows = []
+        for email in sent_emails:
+            step = 1 if email in followed else 0
+            rows.append((email, sent_at, step, self._due_at(sent_at, step)))
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO sends (email, sent_at, step, due_at) VALUES (?, ?, ?, ?)", rows
+            )
+        return len(rows)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class LeaseTable:
+    # Which sending process owns which company right now, shared by every sender
+    # through the same SQLite file. A key (canonical company ID) is claimed by one
+    # worker at a time; the claim becomes permanent once an email to that company
+    # has gone out (expires_at NULL), or lapses after the TTL if the worker dies,
+    # after which any worker can reclaim it.
+    def __init__(self, path=SEND_LEDGER_PATH, ttl=LEASE_TTL, clock=time.time):
+        self.path = path
+        self.ttl = ttl
+        self.clock = clock
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        self.reclaimed = 0
+
+    def claim(self, keys, worker):
+        # Takes every key that is free or whose lease has expired, atomically
+        # against other workers. Returns the set of keys now held by `worker`.
+        now = self.clock()
+        claimed = set()
+        self.conn.execute("BEGIN IMMEDIATE") # Write lock up front: check-and-take can't interleave
+        try:
+            expired = {key for (key,) in self.conn.execute(
+                "SELECT key FROM leases WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,))}
+            for key in keys:
+                cursor = self.conn.execute("""
+                    INSERT INTO leases (key, worker, expires_at) VALUES (?, ?, ?)
+                    ON CONFLICT(key) DO UPDATE SET worker = excluded.worker, expires_at = excluded.expires_at
+                    WHERE leases.expires_at IS NOT NULL AND leases.expires_at <= ?
+                """, (key, worker, now + self.ttl, now))
+                if cursor.rowcount:
+                    claimed.add(key)
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        self.reclaimed += len(claimed & expired)
+        return claimed
+
+    def renew(self, worker):
+        # Heartbeat: push back the expiry of everything `worker` still holds
+        with self.conn:
+            self.conn.execute("UPDATE leases SET expires_at = ? WHERE worker = ? AND expires_at IS NOT NULL",
+                              (self.clock() + self.ttl, worker))
+
+    def complete(self, key, worker, email=None):
+        # Sent: the company stays taken for good
+        with self.conn:
+            self.conn.execute("UPDATE leases SET expires_at = NULL, email = ? WHERE key = ? AND worker = ?",
+                              (email, key, worker))
+
+    def release(self, keys, worker):
+        # Hand back companies that weren't sent to (failed, or over the limit)
+        with self.conn:
+            self.conn.executemany("DELETE FROM leases WHERE key = ? AND worker = ? AND expires_at IS NOT NULL",
+                                  [(key, worker) for key in keys])
+
+    def held(self, worker):
+        return {key for (key,) in self.conn.execute(
+            "SELECT key FROM leases WHERE worker = ? AND expires_at IS NOT NULL", (worker,))}
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_send_ledger(config=None, path=SEND_LEDGER_PATH, clock=time.time, suppression=None):
+    # Opens the ledger with the configured cadence. On first use, seeds it from the
+    # sent/followed-up text ledgers so existing contacts keep their follow-ups.
+    config = config or {}
+    fresh = not os.path.exists(path)
+    ledger = SendLedger(path, config.get('follow_up_days', DEFAULT_CADENCE_DAYS), clock)
+    if fresh and suppression is not None:
+        sent = suppression['sent']
+        if os.path.exists(sent.ledger_path):
+            followed = set(suppression['followed_up'].emails())
+            count = ledger.import_legacy(sent.emails(), followed, os.path.getmtime(sent.ledger_path))
+            print(f"ℹ️  Seeded send ledger with {count} earlier sends from {sent.ledger_path}.")
+    return ledger
+
+if __name__ == "__main__":
+    with SendLedger() as ledger:
+        print(f"📊 Follow-ups due now: {ledger.due_count()}")
+        for email, step in ledger.due(int(sys.argv[1]) if len(sys.argv) > 1 else 20):
+            print(f"   {email} (follow-up #{step + 1})")
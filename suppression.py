@@ -0,0 +1,286 @@
+import os
+import sys
+import json
+import mmap
+import fcntl
+import bisect
+import hashlib
+from array import array
+
+# Shared suppression index: who must not get another cold email.
+#
+# Every category keeps its plain-text ledger (sent_emails.txt, followed_up.txt,
+# ...) as the append log. Everything up to a recorded byte offset has been
+# compacted into:
+#   suppression/<category>.idx    sorted 64-bit hashes, memory-mapped + binary search
+#   suppression/<category>.bloom  Bloom filter over the same hashes (memory-mapped)
+# Only the ledger tail written since the last compaction is read into memory,
+# so opening and checking costs the same after ten years of outreach as after one.
+
+SUPPRESSION_DIR = "suppression"
+
+CATEGORIES = {
+    "sent": "sent_emails.txt",
+    "followed_up": "followed_up.txt",
+    "bounced": "bounced.txt",
+    "opted_out": "opted_out.txt",
+    "replied": "replied.txt",
+}
+
+# Categories that block a new cold email
+BLOCKING = ("sent", "bounced", "opted_out")
+
+BLOOM_BITS_PER_ENTRY = 10
+BLOOM_HASHES = 7
+
+def normalize(email):
+    return str(email).strip().lower()
+
+def email_hash(email):
+    return int.from_bytes(hashlib.blake2b(normalize(email).encode(), digest_size=8).digest(), "little")
+
+def _bloom_positions(h, bits):
+    # Double hashing from the 64-bit email hash
+    h1, h2 = h & 0xFFFFFFFF, (h >> 32) | 1
+    return [(h1 + i * h2) % bits for i in range(BLOOM_HASHES)]
+
+def _map(path):
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return None
+    with open(path, "rb") as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class Ledger:
+    def __init__(self, name, ledger_path, index_dir=SUPPRESSION_DIR, flush_every=20, compact_after=10000):
+        self.name = name
+        self.ledger_path = ledger_path
+        self.index_dir = index_dir
+        self.flush_every = flush_every
+        self.compact_after = compact_after
+        self.pending = []
+        self._file = None
+        self._load()
+        if len(self.recent) > compact_after:
+            self.compact()
+
+    def _path(self, ext):
+        return os.path.join(self.index_dir, f"{self.name}.{ext}")
+
+    def _load(self):
+        meta_path = self._path("meta.json")
+        self.meta = {"offset": 0, "count": 0, "bloom_bits": 0}
+        if os.path.exists(meta_path):
+            with open(meta_path, "r") as f:
+                self.meta = json.load(f)
+
+        self._idx_map = _map(self._path("idx"))
+        self._bloom_map = _map(self._path("bloom"))
+        self.hashes = memoryview(self._idx_map).cast("Q") if self._idx_map else []
+
+        # Ledger tail not yet in the index
+        self.recent, _ = self._read_tail()
+
+    def _read_tail(self):
+        tail = set()
+        end = self.meta["offset"]
+        if os.path.exists(self.ledger_path):
+            with open(self.ledger_path, "rb") as f:
+                f.seek(end)
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break # Partial line still being written
+                    end += len(line)
+                    email = line.decode(errors="replace").strip()
+                    if email:
+                        tail.add(normalize(email))
+        return tail, end
+
+    def _in_index(self, h):
+        if not self.meta["count"]:
+            return False
+        if self._bloom_map:
+            bits = len(self._bloom_map) * 8
+            for pos in _bloom_positions(h, bits):
+                if not self._bloom_map[pos >> 3] & (1 << (pos & 7)):
+                    return False
+        i = bisect.bisect_left(self.hashes, h)
+        return i < len(self.hashes) and self.hashes[i] == h
+
+    def __len__(self):
+        # Indexed + recent entries (approximate if the tail repeats indexed ones)
+        return self.meta["count"] + len(self.recent)
+
+    def __contains__(self, email):
+        key = normalize(email)
+        return key in self.recent or self._in_index(email_hash(key))
+
+    def add(self, email):
+        key = normalize(email)
+        if key in self.recent:
+            return
+        self.recent.add(key)
+        self.pending.append(str(email).strip())
+        if len(self.pending) >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        # One buffered write + fsync for the whole batch of additions, under an
+        # exclusive lock so senders running side by side never interleave lines
+        if not self.pending:
+            return
+        if self._file is None:
+            self._file = open(self.ledger_path, "a+")
+        data = "".join(f"{email}\n" for email in self.pending)
+        fcntl.flock(self._file, fcntl.LOCK_EX)
+        try:
+            # Never glue an address onto a torn line left by an earlier crash
+            end = self._file.seek(0, os.SEEK_END)
+            if end > 0:
+                self._file.seek(end - 1)
+                if self._file.read(1) != "\n":
+                    data = "\n" + data
+            self._file.write(data)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        finally:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+        self.pending = []
+
+    def emails(self):
+        # Stream every address in the ledger (duplicates included), constant memory
+        self.flush()
+        if not os.path.exists(self.ledger_path):
+            return
+        with open(self.ledger_path, "r") as f:
+            for line in f:
+                email = line.strip()
+                if email:
+                    yield email
+
+    def compact(self):
+        # Fold the ledger tail into the sorted hash file and rebuild the Bloom filter
+        # Re-read the tail so lines appended by other processes are folded in too
+        self.flush()
+        tail, offset = self._read_tail()
+        new = [email_hash(e) for e in tail]
+        merged = _merge_sorted_unique(self.hashes, new)
+        os.makedirs(self.index_dir, exist_ok=True)
+
+        bloom = _build_bloom(merged)
+        bloom_bits = len(bloom) * 8
+
+        # Meta goes last: until it lands, the old offset keeps the tail in `recent`
+        self._release_maps()
+        _write_atomic(self._path("idx"), merged.tobytes())
+        _write_atomic(self._path("bloom"), bytes(bloom))
+        _write_atomic(self._path("meta.json"), json.dumps(
+            {"offset": offset, "count": len(merged), "bloom_bits": bloom_bits}
+        ).encode())
+        self._load()
+
+    def _release_maps(self):
+        if isinstance(self.hashes, memoryview):
+            self.hashes.release()
+        self.hashes = []
+        for m in (self._idx_map, self._bloom_map):
+            if m:
+                m.close()
+        self._idx_map = self._bloom_map = None
+
+    def close(self):
+        self.flush()
+        if self._file:
+            self._file.close()
+            self._file = None
+        self._release_maps()
+
+
+def _merge_sorted_unique(existing, new):
+    try:
+        import numpy as np
+        merged = np.unique(np.concatenate([
+            np.frombuffer(existing, dtype=np.uint64) if len(existing) else np.empty(0, dtype=np.uint64),
+            np.array(new, dtype=np.uint64),
+        ]))
+        return array("Q", merged.tobytes())
+    except ImportError:
+        return array("Q", sorted(set(existing) | set(new)))
+
+def _build_bloom(hashes):
+    bloom_bits = max(8 * 1024, len(hashes) * BLOOM_BITS_PER_ENTRY)
+    bloom_bits += -bloom_bits % 8
+    try:
+        import numpy as np
+        h = np.frombuffer(hashes, dtype=np.uint64)
+        h1, h2 = h & np.uint64(0xFFFFFFFF), (h >> np.uint64(32)) | np.uint64(1)
+        bits = np.zeros(bloom_bits, dtype=bool)
+        for i in range(BLOOM_HASHES):
+            bits[(h1 + np.uint64(i) * h2) % np.uint64(bloom_bits)] = True
+        return bytearray(np.packbits(bits, bitorder="little").tobytes())
+    except ImportError:
+        bloom = bytearray(bloom_bits // 8)
+        for h in hashes:
+            for pos in _bloom_positions(h, bloom_bits):
+                bloom[pos >> 3] |= 1 << (pos & 7)
+        return bloom
+
+def _write_atomic(path, data):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class Suppression:
+    def __init__(self, categories=CATEGORIES, index_dir=SUPPRESSION_DIR, **kwargs):
+        self.ledgers = {name: Ledger(name, path, index_dir, **kwargs) for name, path in categories.items()}
+
+    def __getitem__(self, category):
+        return self.ledgers[category]
+
+    def is_suppressed(self, email, categories=BLOCKING):
+        return any(email in self.ledgers[c] for c in categories)
+
+    def __contains__(self, email):
+        return self.is_suppressed(email)
+
+    def add(self, category, email):
+        self.ledgers[category].add(email)
+
+    def flush(self):
+        for ledger in self.ledgers.values():
+            ledger.flush()
+
+    def compact(self):
+        for ledger in self.ledgers.values():
+            ledger.compact()
+
+    def close(self):
+        for ledger in self.ledgers.values():
+            ledger.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def open_suppression(**kwargs):
+    return Suppression(**kwargs)
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "stats"
+    with open_suppression() as suppression:
+        if command == "compact":
+            suppression.compact()
+            print("✅ Suppression index compacted.")
+        elif command == "check" and len(sys.argv) > 2:
+            for email in sys.argv[2:]:
+                hits = [c for c, ledger in suppression.ledgers.items() if email in ledger]
+                print(f"{email}: {', '.join(hits) if hits else 'not suppressed'}")
+        else:
+            for name, ledger in suppression.ledgers.items():
+                print(f"📊 {name}: {ledger.meta['count']} indexed, {len(ledger.recent)} recent")
@@ -0,0 +1,47 @@
+import os
+import shutil
+
+import auto_drafter
+from clipboard_source import FakeClipboardSource, PollingSource, extract_emails, measure_polling
+from transport import Transport
+
+class DraftRecorder(Transport):
+    def __init__(self):
+        self.batches = []
+
+    def draft_many(self, drafts):
+        self.batches.append([recipient for recipient, _, _, _ in drafts])
+        return [True] * len(drafts)
+
+def test_extract_emails_dedupes_in_order():
+    blob = "Jane <jane@acme.com>, bob@globex.com; JANE@acme.com.\nno address here"
+    assert extract_emails(blob) == ["jane@acme.com", "bob@globex.com"]
+
+def test_each_copy_becomes_one_draft_batch(tmp_path, monkeypatch):
+    shutil.copy(os.path.join(os.path.dirname(__file__), "..", "config.json.template"), tmp_path / "config.json")
+    monkeypatch.chdir(tmp_path)
+    transport = DraftRecorder()
+    monkeypatch.setattr(auto_drafter, "get_transport", lambda config: transport)
+
+    source = FakeClipboardSource()
+    source.put("a@acme.com\nb@acme.com\nc@globex.com")
+    source.put("just some text")
+    source.put("Reach me at d@initech.com")
+    source.put(None)
+    auto_drafter.main(source)
+    assert transport.batches == [["a@acme.com", "b@acme.com", "c@globex.com"], ["d@initech.com"]]
+
+def test_polling_backs_off_while_idle_and_snaps_back_on_change():
+    reads = iter(["", "", "", "", "x@acme.com", "x@acme.com"])
+    sleeps = []
+    source = PollingSource(lambda: next(reads), min_interval=0.25, max_interval=1.0, sleep=sleeps.append)
+    changes = source.changes()
+    assert next(changes) == "x@acme.com"
+    assert sleeps == [0.25, 0.5, 1.0, 1.0]
+    assert source.interval == 0.25
+
+def test_measured_idle_cpu_and_latency():
+    stats = measure_polling(idle_seconds=0.5, copies=2, min_interval=0.01, max_interval=0.05)
+    # Detection within a couple of max intervals, even after idling
+    assert max(stats["latencies"]) < 0.5
+    assert stats["idle_cpu_seconds"] < 0.25
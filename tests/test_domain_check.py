@@ -0,0 +1,98 @@
+import socket
+import threading
+
+import pytest
+
+from domain_check import A, ERROR, MX, NEGATIVE_TTL, NONE, DomainCache, accepts_mail, get_resolver, verify_domains
+
+class Clock:
+    def __init__(self, now=1_700_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+class StubResolver:
+    # Stands in for DNS: fixed answers, counts lookups
+    def __init__(self, answers):
+        self.answers = answers
+        self.lookups = []
+        self.lock = threading.Lock()
+
+    def __call__(self, domain):
+        with self.lock:
+            self.lookups.append(domain)
+        return self.answers.get(domain, NONE)
+
+def test_each_domain_is_looked_up_once_across_runs(tmp_path):
+    clock = Clock()
+    path = str(tmp_path / "dns.json")
+    resolver = StubResolver({"acme.com": MX, "globex.com": A, "flaky.com": ERROR})
+    domains = ["acme.com", "globex.com", "nomail.com", "flaky.com", "acme.com"]
+
+    results = verify_domains(domains, resolver, DomainCache(path, clock=clock))
+    assert results == {"acme.com": MX, "globex.com": A, "nomail.com": NONE, "flaky.com": ERROR}
+    assert {d for d, result in results.items() if accepts_mail(result)} == {"acme.com", "globex.com"}
+    assert sorted(resolver.lookups) == ["acme.com", "flaky.com", "globex.com", "nomail.com"]
+
+    # Next run (fresh cache object from disk): only the failed lookup is retried
+    resolver.lookups.clear()
+    verify_domains(domains, resolver, DomainCache(path, clock=clock))
+    assert resolver.lookups == ["flaky.com"]
+
+    # Dead domains are re-checked once the negative TTL runs out
+    resolver.lookups.clear()
+    clock.now += NEGATIVE_TTL + 1
+    verify_domains(domains, resolver, DomainCache(path, clock=clock))
+    assert sorted(resolver.lookups) == ["flaky.com", "nomail.com"]
+
+ZONE = {
+    "acme.test": {"MX": "10 mail.acme.test."},
+    "globex.test": {"A": "127.0.0.1"},
+    "nullmx.test": {"MX": "0 ."},
+}
+
+@pytest.fixture
+def dns_server():
+    # Local stub DNS server over UDP answering from ZONE; anything else is NXDOMAIN
+    dns = pytest.importorskip("dns")
+    import dns.message
+    import dns.rcode
+    import dns.rdatatype
+    import dns.rrset
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(("127.0.0.1", 0))
+    sock.settimeout(0.1)
+    stop = threading.Event()
+
+    def serve():
+        while not stop.is_set():
+            try:
+                data, addr = sock.recvfrom(4096)
+            except socket.timeout:
+                continue
+            query = dns.message.from_wire(data)
+            response = dns.message.make_response(query)
+            question = query.question[0]
+            records = ZONE.get(question.name.to_text().rstrip("."))
+            rdtype = dns.rdatatype.to_text(question.rdtype)
+            if records is None:
+                response.set_rcode(dns.rcode.NXDOMAIN)
+            elif rdtype in records:
+                response.answer.append(dns.rrset.from_text(question.name, 300, "IN", rdtype, records[rdtype]))
+            sock.sendto(response.to_wire(), addr)
+
+    thread = threading.Thread(target=serve, daemon=True)
+    thread.start()
+    yield sock.getsockname()[1]
+    stop.set()
+    thread.join()
+    sock.close()
+
+def test_dnspython_resolver_against_a_stub_server(dns_server, tmp_path):
+    resolver = get_resolver(["127.0.0.1"], port=dns_server, timeout=2.0)
+    results = verify_domains(["acme.test", "globex.test", "nullmx.test", "missing.test"], resolver,
+                             DomainCache(str(tmp_path / "dns.json")))
+    # A null MX ("0 .") explicitly accepts no mail
+    assert results == {"acme.test": MX, "globex.test": A, "nullmx.test": NONE, "missing.test": NONE}
@@ -0,0 +1,28 @@
+import fetch_new_leads
+from company_resolver import CompanyResolver
+from domain_check import ERROR, MX
+
+class FakeTracker:
+    def __init__(self):
+        self.deferred = set()
+
+    def defer(self, companies):
+        self.deferred.update(companies)
+
+def test_known_companies_and_failed_lookups(tmp_path, monkeypatch):
+    monkeypatch.setattr(fetch_new_leads, "fetch_github_jobs", lambda tracker: ["Acme Inc", "Globex", "Globex LLC"])
+    monkeypatch.setattr(fetch_new_leads, "fetch_jobspy_jobs", lambda search_term: ["AT&T"])
+    monkeypatch.setattr(fetch_new_leads, "open_company_resolver",
+                        lambda: CompanyResolver(str(tmp_path / "companies.db")))
+    # globex.com couldn't be looked up this time
+    monkeypatch.setattr(fetch_new_leads, "verify_domains",
+                        lambda domains: {d: ERROR if d == "globex.com" else MX for d in domains})
+    tracker = FakeTracker()
+
+    candidates = fetch_new_leads.gather_candidates(tracker, known_companies={"ACME"})
+
+    # "Acme Inc" is ACME, already on the list: no second set of guessed addresses
+    assert set(candidates.values()) == {"AT&T"}
+    assert "careers@att.com" in candidates
+    # Every spelling of the deferred company is retried next run
+    assert tracker.deferred == {"Globex", "Globex LLC"}
@@ -0,0 +1,81 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("requests")
+
+from http_cache import fetch_all
+
+FIXTURES = {
+    "/a/README.md": "| Company | Role |\n| Acme | Data Analyst |\n",
+    "/b/README.md": "| Company | Role |\n| Globex | Data Analyst |\n",
+}
+
+class ReadmeServer(ThreadingHTTPServer):
+    # Serves FIXTURES (mutable) with an ETag per version and answers 304 to a
+    # matching If-None-Match
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), ReadmeHandler)
+        self.fixtures = dict(FIXTURES)
+        self.log = []
+
+    def url(self, path):
+        return f"http://127.0.0.1:{self.server_address[1]}{path}"
+
+class ReadmeHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = self.server.fixtures.get(self.path)
+        if body is None:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        etag = f'"{hash(body) & 0xffffffff:x}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.server.log.append((self.path, 304))
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        self.server.log.append((self.path, 200))
+        data = body.encode()
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def server():
+    server = ReadmeServer()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def test_unchanged_readmes_are_not_downloaded_or_parsed_again(server, tmp_path):
+    urls = [server.url("/a/README.md"), server.url("/b/README.md")]
+    parsed = []
+
+    def parse(text):
+        parsed.append(text)
+        return text.splitlines()[1]
+
+    first = fetch_all(urls, parse, cache_dir=str(tmp_path))
+    assert first == {urls[0]: ("| Acme | Data Analyst |", False), urls[1]: ("| Globex | Data Analyst |", False)}
+
+    server.fixtures["/b/README.md"] = "| Company | Role |\n| Initech | Data Analyst |\n"
+    server.log.clear()
+    second = fetch_all(urls, parse, cache_dir=str(tmp_path))
+    # a: 304, reused from the cache without parsing; b changed and is fetched again
+    assert second == {urls[0]: ("| Acme | Data Analyst |", True), urls[1]: ("| Initech | Data Analyst |", False)}
+    assert sorted(server.log) == [("/a/README.md", 304), ("/b/README.md", 200)]
+    assert len(parsed) == 3
+
+def test_a_failed_fetch_is_returned_not_raised(server, tmp_path):
+    results = fetch_all([server.url("/missing/README.md")], str, cache_dir=str(tmp_path))
+    assert isinstance(results[server.url("/missing/README.md")], Exception)
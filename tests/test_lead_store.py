@@ -0,0 +1,32 @@
+import random
+
+from lead_store import LeadStore
+
+def _reference(leads, n, per_company, exclude):
+    # Straight from the definition: priority order, contacted companies out
+    contacted = {lead["Company"] for lead in leads if lead["Status"] == "SENT"}
+    ranked = sorted(enumerate(leads), key=lambda item: (-item[1]["Priority Score"], item[0]))
+    picked = {}
+    for _, lead in ranked:
+        company = lead["Company"]
+        if lead["Status"] == "SENT" or company in contacted or lead["Email"] in exclude:
+            continue
+        if company not in picked and len(picked) >= n:
+            continue
+        emails = picked.setdefault(company, [])
+        if len(emails) < per_company:
+            emails.append(lead["Email"])
+    return picked
+
+def test_next_pending_matches_a_full_scan(tmp_path):
+    rng = random.Random(7)
+    leads = [{"Email": f"p{i}@c{i % 60}.com", "Company": f"Company {i % 60}",
+              "Status": "SENT" if rng.random() < 0.05 else "Pending", "Priority Score": rng.randint(0, 20)}
+             for i in range(1000)]
+    exclude = {lead["Email"] for lead in rng.sample(leads, 200)}
+    with LeadStore(str(tmp_path / "leads.db")) as store:
+        store.add_leads(leads)
+        for n, per_company in ((1, 1), (10, 3), (30, 5), (100, 3)):
+            got = store.next_pending(n, per_company=per_company, exclude_emails=exclude)
+            assert got == _reference(leads, n, per_company, exclude)
+            assert list(got) == list(_reference(leads, n, per_company, exclude))
@@ -0,0 +1,55 @@
+import os
+
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+pd = pytest.importorskip("pandas")
+
+import master_list as ml
+
+ROWS = 450
+
+def _csv(tmp_path):
+    path = os.path.join(tmp_path, "Master_Outreach_List.csv")
+    pd.DataFrame({
+        "Email": [f"careers@company{i}.com" for i in range(ROWS)],
+        "Company": [f"Company {i % 40}" for i in range(ROWS)],
+        "Job/Role": ["Data Analyst"] * ROWS,
+        "Status": ["Pending"] * ROWS,
+        "Key Tools": ["SQL"] * ROWS,
+        "Job Focus/Needs": ["Dashboards"] * ROWS,
+    }).to_csv(path, index=False)
+    return path
+
+@pytest.mark.parametrize("fmt", ["arrow", "parquet"])
+def test_append_and_compact_multi_chunk_list(tmp_path, fmt):
+    csv_path = _csv(tmp_path)
+    target = os.path.splitext(csv_path)[0] + "." + fmt
+    # Small chunks: the columnar file holds several batches / row groups
+    ml.write_master_chunks(ml.iter_master(csv_path, chunksize=150), target)
+    assert ml.master_file(csv_path) == target
+
+    df = ml.read_master(csv_path)
+    if fmt == "arrow":
+        # The case that broke dictionary encoding: a column converting to a ChunkedArray
+        assert isinstance(pa.array(df['Email'], type=pa.large_string(), from_pandas=True), pa.ChunkedArray)
+
+    # fetch_new_leads -> morning_batch_sender: append, journal a send, compact
+    ml.append_master(pd.DataFrame({"Email": ["new@lead.com"], "Company": ["Company 3"], "Status": ["Pending"]}), csv_path)
+    ml.record_status(csv_path, "new@lead.com", "SENT", "2026-01-01T09:00:00")
+    ml.record_status(csv_path, "careers@company7.com", "SENT", "2026-01-01T09:01:00")
+    # Chunks that straddle the file's batches slice into multi-chunk columns
+    assert ml.compact_master(csv_path, chunksize=200) == 2
+    assert ml.load_journal(csv_path) == {}
+
+    df = ml.read_master(csv_path)
+    assert len(df) == ROWS + 1
+    statuses = dict(zip(df['Email'], df['Status'].astype(object)))
+    assert statuses["new@lead.com"] == "SENT"
+    assert statuses["careers@company7.com"] == "SENT"
+    assert statuses["careers@company8.com"] == "Pending"
+    assert df['Company'].astype(object).tolist()[:3] == ["Company 0", "Company 1", "Company 2"]
+
+    # A streaming rewrite (as clean_master_list --stream does) of the compacted list
+    assert ml.write_master_chunks(ml.iter_master(csv_path, chunksize=200), csv_path) == ROWS + 1
+    assert ml.read_master(csv_path, columns=['Email', 'Status']).equals(df[['Email', 'Status']])
@@ -0,0 +1,18 @@
+import master_list as ml
+
+def test_partial_last_line_is_not_folded(tmp_path):
+    path = str(tmp_path / "Master_Outreach_List.csv")
+    ml.record_status(path, "a@acme.com", "SENT", when="2024-01-01T09:00:00")
+    # A record still being written (or torn by a crash) at the end of the journal
+    with open(ml.journal_path(path), "a") as f:
+        f.write('{"email": "b@acme.com", "sta')
+
+    updates, folded = ml.read_journal(path)
+    assert list(updates) == ["a@acme.com"]
+    ml.drop_folded(path, folded)
+    with open(ml.journal_path(path)) as f:
+        assert f.read() == '{"email": "b@acme.com", "sta'
+
+    # The next append starts on a fresh line, so nothing after the fragment is lost
+    ml.record_status(path, "c@acme.com", "SENT")
+    assert list(ml.load_journal(path)) == ["c@acme.com"]
@@ -0,0 +1,63 @@
+import json
+import os
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+import transport
+from morning_batch_sender import collect_candidates, send_batch
+from suppression import CATEGORIES, open_suppression
+
+def test_candidates_skip_past_a_run_of_suppressed_rows():
+    emails = [f"p{i}@acme.com" for i in range(10)] + ["jobs@beta.com"]
+    df = pd.DataFrame({"Email": emails, "Company": ["Acme"] * 10 + ["Beta"], "Status": ["Pending"] * 11})
+    suppressed = set(emails[:7])
+    _, candidates = collect_candidates(df, suppressed, n=2, per_company=2)
+    assert candidates == {"Acme": ["p7@acme.com", "p8@acme.com"], "Beta": ["jobs@beta.com"]}
+
+class RejectingTransport(transport.Transport):
+    # Rejects some addresses outright (SMTP 5xx), delivers the rest
+    def __init__(self, rejected):
+        self.rejected = rejected
+        self.sent = []
+
+    def send(self, recipient, subject, body, attachment_path=None):
+        self.sent.append(recipient)
+        if recipient in self.rejected:
+            return transport.SendFailure(f"550 {recipient}: user unknown", permanent=True)
+        return True
+
+class FakeLedger:
+    def __init__(self):
+        self.sends = []
+
+    def record_send(self, email):
+        self.sends.append(email)
+
+def test_dead_companies_fall_through_to_spares_and_are_not_picked_again(tmp_path, monkeypatch):
+    with open(os.path.join(os.path.dirname(__file__), "..", "config.json.template")) as f:
+        config = json.load(f)
+    config.update({"email": "me@example.com", "rate_limits": {"per_domain_per_minute": None},
+                   "outbox": {"path": str(tmp_path / "outbox.db")}})
+    fake = RejectingTransport({"a@acme.com", "b@acme.com"})
+    monkeypatch.setattr(transport, "get_transport", lambda config: fake)
+    suppression = open_suppression(categories={name: str(tmp_path / path) for name, path in CATEGORIES.items()},
+                                   index_dir=str(tmp_path / "suppression"))
+    sent, bounced = [], []
+
+    def run(candidates):
+        return send_batch(config, candidates, 1, None, suppression, FakeLedger(), sent.append,
+                          mark_bounced=bounced.append)
+
+    # Acme's addresses are all rejected, so the spare company takes its slot
+    assert run({"Acme": ["a@acme.com", "b@acme.com"], "Beta": ["jobs@beta.com"]}) == 1
+    assert sent == ["jobs@beta.com"]
+    assert bounced == ["a@acme.com", "b@acme.com"]
+    assert "a@acme.com" in suppression and "b@acme.com" in suppression
+
+    # Next run: Acme and Beta already have outbox groups and don't use up the slot
+    assert run({"Acme": ["a@acme.com"], "Beta": ["jobs@beta.com"], "Gamma": ["jobs@gamma.com"]}) == 1
+    assert sent == ["jobs@beta.com", "jobs@gamma.com"]
+    assert fake.sent == ["a@acme.com", "b@acme.com", "jobs@beta.com", "jobs@gamma.com"]
+    suppression.close()
@@ -0,0 +1,66 @@
+import smtplib
+import sqlite3
+
+import outbox as ob
+import transport
+from transport import SendFailure, is_permanent
+
+def _message(recipient):
+    return {"id": ob.message_id("cold", recipient), "recipient": recipient, "subject": "Hi", "body": "Hello"}
+
+class FakeTransport(transport.Transport):
+    def __init__(self, results=None, on_send=None):
+        self.results = results or {}
+        self.on_send = on_send
+        self.sent = []
+
+    def send(self, recipient, subject, body, attachment_path=None):
+        if self.on_send:
+            self.on_send(recipient)
+        self.sent.append(recipient)
+        return self.results.get(recipient, True)
+
+def _drain(monkeypatch, box, fake, **config):
+    monkeypatch.setattr(transport, "get_transport", lambda config: fake)
+    return ob.drain(box, dict({"email": "me@example.com"}, **config), wait=False)
+
+def test_permanent_failure_promotes_fallback_at_once(tmp_path, monkeypatch):
+    refused = smtplib.SMTPRecipientsRefused({"jobs@acme.com": (550, b"5.1.1 User unknown")})
+    assert is_permanent(refused)
+    assert not is_permanent(smtplib.SMTPRecipientsRefused({"jobs@acme.com": (450, b"Try again later")}))
+    fake = FakeTransport({"jobs@acme.com": SendFailure(refused, is_permanent(refused))})
+    with ob.Outbox(str(tmp_path / "outbox.db")) as box:
+        box.enqueue_groups({"acme": [_message("jobs@acme.com"), _message("careers@acme.com")]}, "cold", "me@example.com")
+        stats = _drain(monkeypatch, box, fake, delay_seconds=0)
+        # One attempt at the rejected address, then the fallback in the same drain
+        assert fake.sent == ["jobs@acme.com", "careers@acme.com"]
+        assert stats["sent"] == 1 and stats["retried"] == 0
+        assert box.dead() == [("cold:jobs@acme.com", 1, str(refused))]
+
+def test_transient_failure_is_retried_on_the_same_address(tmp_path, monkeypatch):
+    fake = FakeTransport({"jobs@acme.com": SendFailure("timed out")})
+    with ob.Outbox(str(tmp_path / "outbox.db")) as box:
+        box.enqueue_groups({"acme": [_message("jobs@acme.com"), _message("careers@acme.com")]}, "cold", "me@example.com")
+        stats = _drain(monkeypatch, box, fake, delay_seconds=0)
+        assert fake.sent == ["jobs@acme.com"]
+        assert stats["retried"] == 1
+        assert box.depth()["standby"] == 1
+
+def test_messages_waiting_on_rate_limits_are_not_claimed(tmp_path, monkeypatch):
+    recipients = [f"person{i}@acme.com" for i in range(3)]
+    path = str(tmp_path / "outbox.db")
+    with ob.Outbox(path) as box:
+        seen = []
+        def on_send(recipient):
+            # Only the message going out now is "sending"; the rest are still queued,
+            # so a concurrent drain's recover() can't mistake them for interrupted ones
+            with sqlite3.connect(path) as conn:
+                seen.append(dict(conn.execute("SELECT recipient, state FROM outbox")))
+        box.enqueue([_message(r) for r in recipients], "cold", "me@example.com")
+        fake = FakeTransport(on_send=on_send)
+        # One message per 0.05s to the shared domain
+        stats = _drain(monkeypatch, box, fake, rate_limits={"per_domain_per_minute": 1200})
+        assert stats["sent"] == 3
+        for recipient, states in zip(fake.sent, seen):
+            assert states[recipient] == "sending"
+            assert sum(state == "sending" for state in states.values()) == 1
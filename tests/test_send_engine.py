@@ -0,0 +1,37 @@
+import time
+
+from send_engine import SendEngine
+from transport import Transport
+
+class SlowTransport(Transport):
+    # Records when each recipient's send started; slow.com takes a while
+    def __init__(self):
+        self.started = []
+
+    def send(self, recipient, subject, body, attachment_path=None):
+        self.started.append((recipient, time.monotonic()))
+        if recipient.endswith("@slow.com"):
+            time.sleep(0.3)
+        return True
+
+def _job(recipient):
+    return {"recipient": recipient, "subject": "Hi", "body": "Hello"}
+
+def test_domain_rate_holds_when_jobs_queue_for_a_slot():
+    transport = SlowTransport()
+    # One slot; acme.com may get one message per 0.1s
+    engine = SendEngine(transport, {"rate_limits": {"per_domain_per_minute": 600, "max_in_flight": 1}})
+    jobs = [_job("a@slow.com")] + [_job(f"p{i}@acme.com") for i in range(3)]
+    assert engine.send_all(jobs) == [True] * 4
+    acme = [started for recipient, started in transport.started if recipient.endswith("@acme.com")]
+    # Waiting behind slow.com must not bank acme.com tokens for a burst afterwards
+    assert all(later - earlier >= 0.09 for earlier, later in zip(acme, acme[1:]))
+
+def test_results_keep_job_order_across_domains():
+    transport = SlowTransport()
+    engine = SendEngine(transport, {"rate_limits": {"per_domain_per_minute": None, "max_in_flight": 1}})
+    jobs = [_job("a@x.com"), _job("b@x.com"), _job("c@y.com"), _job("d@y.com")]
+    results = engine.send_all(jobs, claim=lambda job: job['recipient'] != "d@y.com")
+    assert results == [True, True, True, None]
+    # Started round-robin by domain
+    assert [recipient for recipient, _ in transport.started] == ["a@x.com", "c@y.com", "b@x.com"]
@@ -0,0 +1,43 @@
+from send_ledger import DAY, SendLedger
+
+class Clock:
+    def __init__(self, now=1_700_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+def test_follow_ups_follow_the_cadence(tmp_path):
+    clock = Clock()
+    with SendLedger(str(tmp_path / "ledger.db"), cadence_days=(4, 10), clock=clock) as ledger:
+        ledger.record_send("a@acme.com")
+        clock.now += 3.9 * DAY
+        assert ledger.due() == []
+
+        clock.now += 0.2 * DAY # Day 4.1
+        assert ledger.due() == [("a@acme.com", 0)]
+        ledger.record_followup("a@acme.com", 0)
+        assert ledger.due() == []
+
+        clock.now += 6 * DAY # Day 10.1, counted from the cold email
+        assert ledger.due() == [("a@acme.com", 1)]
+        ledger.record_followup("a@acme.com", 1)
+        clock.now += 365 * DAY
+        assert ledger.due() == [] # Cadence done
+
+def test_due_respects_the_cap_oldest_first_and_cancel(tmp_path):
+    clock = Clock()
+    with SendLedger(str(tmp_path / "ledger.db"), cadence_days=(4,), clock=clock) as ledger:
+        for i in range(5):
+            ledger.record_send(f"p{i}@acme.com", when=clock.now + i)
+        clock.now += 5 * DAY
+        ledger.cancel("p0@acme.com")
+        assert ledger.due(2) == [("p1@acme.com", 0), ("p2@acme.com", 0)]
+        assert ledger.due_count() == 4
+
+def test_due_reads_only_the_due_index(tmp_path):
+    with SendLedger(str(tmp_path / "ledger.db")) as ledger:
+        plan = ledger.conn.execute(
+            "EXPLAIN QUERY PLAN SELECT email, step FROM sends WHERE due_at IS NOT NULL AND due_at <= ? ORDER BY due_at",
+            (0,)).fetchall()
+    assert any("idx_sends_due" in row[-1] for row in plan)
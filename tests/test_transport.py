@@ -0,0 +1,61 @@
+import socket
+
+import pytest
+
+pytest.importorskip("aiosmtpd")
+from aiosmtpd.controller import Controller
+
+from transport import SMTPTransport
+
+class Sink:
+    # Local SMTP stand-in: keeps every message and the session it came in on,
+    # and rejects nobody@ addresses with a 550
+    def __init__(self):
+        self.messages = []
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address.startswith("nobody@"):
+            return "550 5.1.1 User unknown"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append((id(session), envelope.rcpt_tos[0], envelope.content))
+        return "250 OK"
+
+@pytest.fixture
+def sink():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    handler = Sink()
+    controller = Controller(handler, hostname="127.0.0.1", port=port)
+    controller.start()
+    handler.port = port
+    yield handler
+    controller.stop()
+
+def _transport(sink, **kwargs):
+    return SMTPTransport("127.0.0.1", sink.port, sender="me@example.com", starttls=False, **kwargs)
+
+def test_messages_share_pooled_sessions(sink, tmp_path):
+    resume = tmp_path / "resume.pdf"
+    resume.write_bytes(b"%PDF-1.4 resume")
+    with _transport(sink, max_messages_per_connection=2) as transport:
+        for i in range(5):
+            assert transport.send(f"p{i}@acme.com", "Hello", f"Body {i}", str(resume))
+    assert [recipient for _, recipient, _ in sink.messages] == [f"p{i}@acme.com" for i in range(5)]
+    # Two messages per session, then a fresh one
+    assert len({session for session, _, _ in sink.messages}) == 3
+    assert b"Body 4" in sink.messages[4][2]
+    assert b"JVBERi0xLjQgcmVzdW1l" in sink.messages[4][2] # The attachment, base64
+
+def test_rejected_recipient_is_permanent_and_keeps_the_session(sink):
+    with _transport(sink) as transport:
+        assert transport.send("a@acme.com", "Hello", "Body")
+        failure = transport.send("nobody@acme.com", "Hello", "Body")
+        assert not failure and failure.permanent
+        assert "User unknown" in str(failure)
+        assert transport.send("b@acme.com", "Hello", "Body")
+    assert [recipient for _, recipient, _ in sink.messages] == ["a@acme.com", "b@acme.com"]
+    assert sink.messages[0][0] == sink.messages[1][0]
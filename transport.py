@@ -0,0 +1,241 @@
+import os
+import queue
+import smtplib
+import subprocess
+import threading
+from message_builder import build_parts, dot_stuff
+from instrumentation import timer, count
+
+# Delivery backends shared by all senders.
+# Pick one in config.json with "transport": "applescript" (default) or "smtp".
+# For local testing, point SMTP at a sink such as:
+#   python -m aiosmtpd -n -l localhost:1025
+# with "smtp": {"host": "localhost", "port": 1025, "starttls": false}
+
+class SendFailure:
+    # What send() returns when a message didn't go out: falsy like False, plus why
+    # and whether retrying the same address is pointless (the server rejected it)
+    def __init__(self, error, permanent=False):
+        self.error = str(error)
+        self.permanent = permanent
+
+    def __bool__(self):
+        return False
+
+    def __str__(self):
+        return self.error
+
+def is_permanent(error):
+    # SMTP 5xx for this recipient (unknown user, rejected mailbox or content).
+    # A refused sender is our problem, not the address's.
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(code >= 500 for code, _ in error.recipients.values())
+    return isinstance(error, smtplib.SMTPDataError) and error.smtp_code >= 500
+
+
+class Transport:
+    def send(self, recipient, subject, body, attachment_path=None):
+        raise NotImplementedError
+
+    def draft(self, recipient, subject, body, attachment_path=None):
+        raise NotImplementedError
+
+    def draft_many(self, drafts):
+        # drafts: (recipient, subject, body, attachment_path) tuples -> list of bools
+        return [self.draft(*draft) for draft in drafts]
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _applescript_quote(text):
+    return text.replace('\\', '\\\\').replace('"', '\\"')
+
+class AppleScriptTransport(Transport):
+    # macOS Mail via osascript (one process per message, or per batch of drafts)
+    def _message_script(self, recipient, subject, body, attachment_path, visible, action):
+        attachment = ""
+        if attachment_path:
+            attachment = f'make new attachment with properties {{file name:POSIX file "{_applescript_quote(attachment_path)}"}} at after the last paragraph'
+        return f'''
+        set newMessage to make new outgoing message with properties {{subject:"{_applescript_quote(subject)}", content:"{_applescript_quote(body)}", visible:{visible}}}
+        tell newMessage
+            make new to recipient at end of to recipients with properties {{address:"{_applescript_quote(recipient)}"}}
+            {attachment}
+            {action}
+        end tell'''
+
+    def _run(self, messages, activate=""):
+        apple_script = f'''
+    tell application "Mail"{"".join(messages)}
+        {activate}
+    end tell
+    '''
+        count("osascript_spawns")
+        try:
+            with timer("osascript", histogram=True):
+                subprocess.run(["osascript", "-e", apple_script], check=True)
+            return True
+        except Exception as e:
+            print(f" Error: {e}")
+            return False
+
+    def send(self, recipient, subject, body, attachment_path=None):
+        return self._run([self._message_script(recipient, subject, body, attachment_path, "false", "send")])
+
+    def draft(self, recipient, subject, body, attachment_path=None):
+        return self._run([self._message_script(recipient, subject, body, attachment_path, "true", "")], "activate")
+
+    def draft_many(self, drafts):
+        # All drafts in a single osascript run
+        scripts = [self._message_script(*draft, visible="true", action="") for draft in drafts]
+        ok = self._run(scripts, "activate") if scripts else True
+        return [ok] * len(scripts)
+
+
+class SMTPTransport(Transport):
+    # Keeps a small pool of authenticated SMTP sessions open and reuses each one
+    # for many messages instead of paying a connect/TLS/login per email.
+    def __init__(self, host, port=587, username=None, password=None, sender=None,
+                 starttls=True, use_ssl=False, pool_size=2, max_messages_per_connection=100,
+                 timeout=30, drafts_dir="drafts"):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password or os.environ.get('SMTP_PASSWORD')
+        self.sender = sender or username
+        self.starttls = starttls
+        self.use_ssl = use_ssl
+        self.max_messages = max_messages_per_connection
+        self.timeout = timeout
+        self.drafts_dir = drafts_dir
+        self._idle = queue.LifoQueue()
+        self._slots = threading.Semaphore(pool_size)
+        self._sent_on = {}
+
+    def _connect(self):
+        if self.use_ssl:
+            conn = smtplib.SMTP_SSL(self.host, self.port, timeout=self.timeout)
+        else:
+            conn = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+            conn.ehlo()
+            if self.starttls:
+                conn.starttls()
+                conn.ehlo()
+        if self.username and self.password:
+            conn.login(self.username, self.password)
+        self._sent_on[id(conn)] = 0
+        return conn
+
+    def _acquire(self):
+        self._slots.acquire()
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            try:
+                return self._connect()
+            except Exception:
+                self._slots.release()
+                raise
+
+    def _release(self, conn, healthy=True):
+        try:
+            if healthy and self._sent_on.get(id(conn), 0) < self.max_messages:
+                self._idle.put(conn)
+            else:
+                self._discard(conn)
+        finally:
+            self._slots.release()
+
+    def _discard(self, conn):
+        self._sent_on.pop(id(conn), None)
+        try:
+            conn.quit()
+        except Exception:
+            conn.close()
+
+    def _deliver(self, conn, recipient, parts):
+        # MAIL/RCPT/DATA by hand so the message goes out chunk by chunk: the shared
+        # encoded attachment is written to the socket as-is, never copied per message.
+        code, resp = conn.mail(self.sender)
+        if code != 250:
+            raise smtplib.SMTPSenderRefused(code, resp, self.sender)
+        code, resp = conn.rcpt(recipient)
+        if code not in (250, 251):
+            raise smtplib.SMTPRecipientsRefused({recipient: (code, resp)})
+        code, resp = conn.docmd("data")
+        if code != 354:
+            raise smtplib.SMTPDataError(code, resp)
+        for part in parts:
+            conn.send(dot_stuff(part))
+        conn.send(b".\r\n")
+        code, resp = conn.getreply()
+        if code != 250:
+            raise smtplib.SMTPDataError(code, resp)
+
+    def send_parts(self, recipient, parts):
+        # One reconnect attempt covers servers that drop idle sessions
+        for attempt in range(2):
+            conn = self._acquire()
+            try:
+                conn.ehlo_or_helo_if_needed()
+                self._deliver(conn, recipient, parts)
+            except smtplib.SMTPServerDisconnected:
+                self._release(conn, healthy=False)
+                if attempt:
+                    raise
+                continue
+            except (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused):
+                # The session is still fine, only this message was rejected
+                try:
+                    conn.rset()
+                    self._release(conn)
+                except smtplib.SMTPException:
+                    self._release(conn, healthy=False)
+                raise
+            except Exception:
+                self._release(conn, healthy=False)
+                raise
+            self._sent_on[id(conn)] = self._sent_on.get(id(conn), 0) + 1
+            self._release(conn)
+            return
+
+    def send(self, recipient, subject, body, attachment_path=None):
+        try:
+            self.send_parts(recipient, build_parts(self.sender, recipient, subject, body, attachment_path))
+            return True
+        except Exception as e:
+            print(f" Error: {e}")
+            return SendFailure(e, is_permanent(e))
+
+    def draft(self, recipient, subject, body, attachment_path=None):
+        # SMTP has no drafts folder; write an .eml any mail client can open
+        os.makedirs(self.drafts_dir, exist_ok=True)
+        path = os.path.join(self.drafts_dir, f"{recipient}.eml")
+        with open(path, 'wb') as f:
+            f.writelines(build_parts(self.sender, recipient, subject, body, attachment_path))
+        return True
+
+    def close(self):
+        while True:
+            try:
+                self._discard(self._idle.get_nowait())
+            except queue.Empty:
+                break
+
+
+def get_transport(config):
+    kind = config.get('transport', 'applescript')
+    if kind == 'applescript':
+        return AppleScriptTransport()
+    if kind == 'smtp':
+        smtp = dict(config.get('smtp', {}))
+        smtp.setdefault('sender', config.get('email'))
+        return SMTPTransport(**smtp)
+    raise ValueError(f"Unknown transport: {kind}")